@@ -2,10 +2,15 @@
 Album API Endpoints
 Medien-Verwaltung
 """
-from fastapi import APIRouter, HTTPException
+import mimetypes
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
-from ..services.dwarf_client import DwarfHTTPClient
+from ..lib.dwarfii_cache import response_cache
+from ..services.album_index import album_index
+from ..services.dwarf_client import http_clients
+from ..services.thumbnail_cache import thumbnail_cache
+from ..services.thumbnail_generator import thumbnail_generator
 from ..utils.constants import *
 
 router = APIRouter()
@@ -18,8 +23,9 @@ router = APIRouter()
 class MediaListRequest(BaseModel):
     """Medien-Liste Request"""
     media_type: int = 0  # 0: Alle, 1: Foto, 2: Video, etc.
-    page_index: int = 0
+    page_index: int = 0  # nur ohne cursor (OFFSET)
     page_size: int = 20
+    cursor: Optional[str] = None  # next_cursor der vorigen Seite
 
 
 class MediaDeleteItem(BaseModel):
@@ -39,39 +45,103 @@ class MediaDeleteRequest(BaseModel):
 # ============================================================================
 
 @router.get("/counts")
-async def get_media_counts(ip: str):
+async def get_media_counts(ip: str, fresh: bool = False):
     """
     Anzahl Medien pro Typ abrufen
+    Aus dem lokalen Album-Index; fresh=1 gleicht vorher mit dem Gerät ab
     """
-    client = DwarfHTTPClient(ip)
-    
     try:
-        counts = await client.get_media_counts()
-        return counts
+        await album_index.ensure_synced(ip, fresh=fresh)
+        return {"code": 0, "data": await album_index.counts(ip)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.post("/list")
-async def get_media_list(ip: str, request: MediaListRequest):
+async def get_media_list(ip: str, request: MediaListRequest, fresh: bool = False):
     """
-    Medien-Liste abrufen mit Paginierung
+    Medien-Liste abrufen mit Paginierung (neueste zuerst)
+    Aus dem lokalen Album-Index: Folgeseiten über next_cursor (Keyset),
+    page_index wird ohne cursor weiterhin unterstützt
     """
-    client = DwarfHTTPClient(ip)
-    
+    if not 0 < request.page_size <= ALBUM_LIST_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size muss zwischen 1 und {ALBUM_LIST_MAX_PAGE_SIZE} liegen")
     try:
-        media_list = await client.get_media_list(
+        await album_index.ensure_synced(ip, fresh=fresh)
+        items, next_cursor = await album_index.list_page(
+            ip,
             media_type=request.media_type,
-            page_index=request.page_index,
-            page_size=request.page_size
+            page_size=request.page_size,
+            cursor=request.cursor,
+            page_index=request.page_index
         )
-        return media_list
+        await thumbnail_generator.prioritize(ip, items)
+        return {"code": 0, "data": items, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
+
+
+@router.get("/index")
+async def get_album_index_stats(ip: str):
+    """Album-Index: Abgleiche, Geräte-Abfragen, Alter"""
+    return album_index.get_stats(ip)
+
+
+@router.get("/thumbnail")
+async def get_thumbnail(ip: str, path: str, http_request: Request, generate: bool = False):
+    """
+    Thumbnail (thumbnailPath aus der Medien-Liste) über den Platten-Cache
+    Nur der erste Abruf geht ans Gerät; danach ETag + Cache-Control, der
+    Browser fragt höchstens per If-None-Match nach (304).
+    generate=1: path ist das Originalbild eines Eintrags ohne Geräte-Thumbnail
+    (Serienaufnahmen), die Vorschau wird lokal erzeugt
+    """
+    if not path.startswith("/") or ".." in path.split("/"):
+        raise HTTPException(status_code=400, detail="Ungültiger Pfad")
+    if generate and not thumbnail_generator.available:
+        raise HTTPException(status_code=501, detail="Lokale Vorschauen nicht verfügbar (Pillow fehlt oder DWARF_THUMBNAIL_WORKERS=0)")
+
+    headers = {"Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    variant = THUMBNAIL_GENERATED_VARIANT if generate else ""
+    digest = await thumbnail_cache.lookup(ip, path, variant)
+    if digest is not None:
+        etag = f'"{digest}"'
+        if_none_match = http_request.headers.get("if-none-match", "")
+        if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers={**headers, "ETag": etag})
+
+    async def fetch() -> bytes:
+        response = await http_clients.get(ip).get_file(path, HTTP_CLASS_METADATA)
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Thumbnail nicht gefunden")
+        if response.status_code != 200:
+            raise HTTPException(status_code=502, detail=f"Gerät antwortet mit {response.status_code}")
+        return response.content
+
+    try:
+        if generate:
+            digest, content = await thumbnail_generator.get(ip, path)
+        else:
+            digest, content = await thumbnail_cache.get(ip, path, fetch)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Datei nicht gefunden")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return Response(
+        content,
+        media_type="image/jpeg" if generate else mimetypes.guess_type(path)[0] or "image/jpeg",
+        headers={**headers, "ETag": f'"{digest}"'}
+    )
+
+
+@router.get("/thumbnail/stats")
+async def get_thumbnail_cache_stats():
+    """Thumbnail-Cache: Treffer, Downloads, Belegung; generator: lokale Vorschauen"""
+    return {**thumbnail_cache.get_stats(), "generator": thumbnail_generator.get_stats()}
 
 
 @router.post("/delete")
@@ -79,7 +149,7 @@ async def delete_media(ip: str, request: MediaDeleteRequest):
     """
     Medien löschen
     """
-    client = DwarfHTTPClient(ip)
+    client = http_clients.get(ip)
     
     try:
         # In DWARF II Format konvertieren
@@ -93,25 +163,22 @@ async def delete_media(ip: str, request: MediaDeleteRequest):
         ]
         
         result = await client.delete_media(media_list)
+        if result.get("code") == 0:
+            await album_index.remove(ip, [item.file_path for item in request.items])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.get("/config")
-async def get_default_params_config(ip: str):
+async def get_default_params_config(ip: str, fresh: bool = False):
     """
     Standard-Parameter-Konfiguration abrufen
-    (params_config.json)
+    (params_config.json) - aus dem Antwort-Cache, fresh=1 fragt das Gerät
     """
-    client = DwarfHTTPClient(ip)
-    
     try:
-        config = await client.get_default_params_config()
-        return config
+        return await response_cache.get_http(
+            ip, "getDefaultParamsConfig", lambda client: client.get_default_params_config(), fresh
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
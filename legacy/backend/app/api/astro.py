@@ -2,12 +2,13 @@
 Astro API Endpoints
 Astronomie-Funktionen: Kalibrierung, GOTO, Stacking
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import astro_pb2, base_pb2
+from ..lib.dwarf_connection import connection_manager
+from ..services.proto import astro_pb2
 from ..utils.constants import *
+from ..utils.http import resolve_stop_on_disconnect, wait_disconnected
 
 router = APIRouter()
 
@@ -76,70 +77,56 @@ class EqSolvingRequest(BaseModel):
 @router.post("/calibration/start")
 async def start_calibration(ip: str):
     """Kalibrierung starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStartCalibration()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_CALIBRATION,
             req.SerializeToString(),
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/calibration/stop")
 async def stop_calibration(ip: str):
     """Kalibrierung stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopCalibration()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_CALIBRATION,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -149,114 +136,93 @@ async def stop_calibration(ip: str):
 @router.post("/goto/dso")
 async def goto_dso(ip: str, request: GotoDSORequest):
     """GOTO Deep-Sky-Objekt"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqGotoDSO()
         req.ra = request.ra
         req.dec = request.dec
         req.target_name = request.target_name
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_GOTO_DSO,
             req.SerializeToString(),
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "target": request.target_name
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/goto/solar")
 async def goto_solar(ip: str, request: GotoSolarRequest):
     """GOTO Sonnensystem-Objekt"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqGotoSolarSystem()
         req.index = request.index
         req.lon = request.lon
         req.lat = request.lat
         req.target_name = request.target_name
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_GOTO_SOLAR_SYSTEM,
             req.SerializeToString(),
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "target": request.target_name
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/goto/stop")
 async def stop_goto(ip: str):
     """GOTO stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopGoto()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_GOTO,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -264,33 +230,32 @@ async def stop_goto(ip: str):
 # ============================================================================
 
 @router.post("/goto/one-click/dso")
-async def one_click_goto_dso(ip: str, request: GotoDSORequest):
+async def one_click_goto_dso(ip: str, request: GotoDSORequest, http_request: Request, stop_on_disconnect: Optional[bool] = None):
     """Ein-Klick GOTO Deep-Sky-Objekt (mit Auto-Fokus und Kalibrierung)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqOneClickGotoDSO()
         req.ra = request.ra
         req.dec = request.dec
         req.target_name = request.target_name
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute_cancellable(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_ONE_CLICK_GOTO_DSO,
             req.SerializeToString(),
-            wait_response=True,
-            timeout=15.0
+            timeout=15.0,
+            gone=wait_disconnected(http_request),
+            send_stop=resolve_stop_on_disconnect(stop_on_disconnect)
         )
         
         if response:
-            res = astro_pb2.ResOneClickGoto()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "step": res.step,
                 "all_end": res.all_end,
                 "target": request.target_name
@@ -298,41 +263,40 @@ async def one_click_goto_dso(ip: str, request: GotoDSORequest):
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/goto/one-click/solar")
-async def one_click_goto_solar(ip: str, request: GotoSolarRequest):
+async def one_click_goto_solar(ip: str, request: GotoSolarRequest, http_request: Request, stop_on_disconnect: Optional[bool] = None):
     """Ein-Klick GOTO Sonnensystem"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqOneClickGotoSolarSystem()
         req.index = request.index
         req.lon = request.lon
         req.lat = request.lat
         req.target_name = request.target_name
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute_cancellable(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_ONE_CLICK_GOTO_SOLAR_SYSTEM,
             req.SerializeToString(),
-            wait_response=True,
-            timeout=15.0
+            timeout=15.0,
+            gone=wait_disconnected(http_request),
+            send_stop=resolve_stop_on_disconnect(stop_on_disconnect)
         )
         
         if response:
-            res = astro_pb2.ResOneClickGoto()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "step": res.step,
                 "all_end": res.all_end,
                 "target": request.target_name
@@ -340,44 +304,37 @@ async def one_click_goto_solar(ip: str, request: GotoSolarRequest):
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/goto/one-click/stop")
 async def stop_one_click_goto(ip: str):
     """Ein-Klick GOTO stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopOneClickGoto()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_ONE_CLICK_GOTO,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -387,139 +344,111 @@ async def stop_one_click_goto(ip: str):
 @router.post("/stacking/start")
 async def start_stacking(ip: str):
     """Live-Stacking starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqCaptureRawLiveStacking()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING,
             req.SerializeToString(),
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stacking/stop")
 async def stop_stacking(ip: str):
     """Live-Stacking stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopCaptureRawLiveStacking()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_CAPTURE_RAW_LIVE_STACKING,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stacking/wide/start")
 async def start_wide_stacking(ip: str):
     """Weitwinkel Live-Stacking starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqCaptureWideRawLiveStacking()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_WIDE_CAPTURE_LIVE_STACKING,
             req.SerializeToString(),
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stacking/wide/stop")
 async def stop_wide_stacking(ip: str):
     """Weitwinkel Live-Stacking stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopCaptureWideRawLiveStacking()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_WIDE_CAPTURE_LIVE_STACKING,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -529,75 +458,62 @@ async def stop_wide_stacking(ip: str):
 @router.post("/track/special/start")
 async def start_special_tracking(ip: str, request: TrackSpecialRequest):
     """Sonne/Mond Tracking starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqTrackSpecialTarget()
         req.index = request.index
         req.lon = request.lon
         req.lat = request.lat
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_TRACK_SPECIAL_TARGET,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             target = "Sonne" if request.index == 0 else "Mond"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "target": target
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/track/special/stop")
 async def stop_special_tracking(ip: str):
     """Sonne/Mond Tracking stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopTrackSpecialTarget()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_TRACK_SPECIAL_TARGET,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -605,130 +521,127 @@ async def stop_special_tracking(ip: str):
 # ============================================================================
 
 @router.post("/darkframe/capture")
-async def capture_darkframe(ip: str, request: DarkFrameRequest):
+async def capture_darkframe(ip: str, request: DarkFrameRequest, http_request: Request, stop_on_disconnect: Optional[bool] = None):
     """Darkframe aufnehmen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqCaptureDarkFrame()
         req.reshoot = request.reshoot
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute_cancellable(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_CAPTURE_RAW_DARK,
             req.SerializeToString(),
-            wait_response=True,
-            timeout=30.0
+            timeout=30.0,
+            gone=wait_disconnected(http_request),
+            send_stop=resolve_stop_on_disconnect(stop_on_disconnect)
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/darkframe/stop")
 async def stop_darkframe(ip: str):
     """Darkframe-Aufnahme stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopCaptureDarkFrame()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_CAPTURE_RAW_DARK,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.get("/darkframe/check")
-async def check_darkframe(ip: str):
-    """Darkframe-Status prüfen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
+async def check_darkframe(ip: str, fresh: bool = False):
+    """
+    Darkframe-Status prüfen
+    Antwortet aus dem Gerätezustand; fresh=1 erzwingt eine Abfrage am Gerät
+    """
     try:
-        await ws_client.connect()
+        state = await connection_manager.get_state(ip)
         
-        req = astro_pb2.ReqCheckDarkFrame()
+        if not fresh and state.darkframe is not None:
+            return {
+                "status": "success",
+                **state.darkframe,
+                "cached": True,
+                "age": state.age("darkframe")
+            }
         
-        response = await ws_client.send_command(
+        result = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_CHECK_GOT_DARK,
-            req.SerializeToString(),
-            wait_response=True
+            astro_pb2.ReqCheckDarkFrame().SerializeToString()
         )
+        if result is None:
+            return {"status": "no_response"}
         
-        if response:
-            res = astro_pb2.ResCheckDarkFrame()
-            res.ParseFromString(response.data)
-            
-            return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
-                "progress": res.progress / 100.0  # 0-100%
-            }
+        state.apply(result)
+        res = result.message
         
-        return {"status": "no_response"}
+        return {
+            "status": "success" if response.code == 0 else "error",
+            "code": response.code,
+            "progress": res.progress / 100.0,  # 0-100%
+            "cached": False
+        }
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.get("/darkframe/list")
-async def get_darkframe_list(ip: str):
-    """Darkframe-Liste abrufen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
+async def get_darkframe_list(ip: str, fresh: bool = False):
+    """
+    Darkframe-Liste abrufen
+    Aus dem Antwort-Cache, bis neue Darks aufgenommen oder gelöscht werden;
+    fresh=1 erzwingt eine Abfrage am Gerät
+    """
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqGetDarkFrameList()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_GET_DARK_FRAME_LIST,
             req.SerializeToString(),
-            wait_response=True
+            fresh=fresh
         )
         
         if response:
-            res = astro_pb2.ResGetDarkFrameInfoList()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             frames = [
                 {
@@ -740,17 +653,17 @@ async def get_darkframe_list(ip: str):
             ]
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "frames": frames
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -758,76 +671,68 @@ async def get_darkframe_list(ip: str):
 # ============================================================================
 
 @router.post("/eq-solving/start")
-async def start_eq_solving(ip: str, request: EqSolvingRequest):
+async def start_eq_solving(ip: str, request: EqSolvingRequest, http_request: Request, stop_on_disconnect: Optional[bool] = None):
     """EQ-Verifizierung starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStartEqSolving()
         req.lon = request.lon
         req.lat = request.lat
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute_cancellable(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_START_EQ_SOLVING,
             req.SerializeToString(),
-            wait_response=True,
-            timeout=30.0
+            timeout=30.0,
+            gone=wait_disconnected(http_request),
+            send_stop=resolve_stop_on_disconnect(stop_on_disconnect)
         )
         
         if response:
-            res = astro_pb2.ResStartEqSolving()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "azi_err": res.azi_err,  # Azimut-Fehler
                 "alt_err": res.alt_err   # Höhen-Fehler
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/eq-solving/stop")
 async def stop_eq_solving(ip: str):
     """EQ-Verifizierung stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqStopEqSolving()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_STOP_EQ_SOLVING,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -837,32 +742,25 @@ async def stop_eq_solving(ip: str):
 @router.post("/go-live")
 async def go_live(ip: str):
     """GO LIVE - Zurück zum Live-View"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = astro_pb2.ReqGoLive()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_ASTRO,
             CMD_ASTRO_GO_LIVE,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
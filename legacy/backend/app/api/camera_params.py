@@ -5,8 +5,7 @@ Erweiterte Kamera-Einstellungen: Exposure, Gain, White Balance, IR Cut, Bildqual
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Literal
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import base_pb2
+from ..lib.dwarf_connection import connection_manager
 from ..utils.constants import *
 
 router = APIRouter()
@@ -89,65 +88,54 @@ def _create_single_int_message(value: int) -> bytes:
 @router.post("/exposure/mode")
 async def set_exposure_mode(ip: str, request: SetExposureModeRequest):
     """Belichtungsmodus setzen (Auto/Manual)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.mode)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_EXP_MODE if request.camera == "tele" else CMD_CAMERA_WIDE_SET_EXP_MODE
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             mode_str = "Auto" if request.mode == 0 else "Manual"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": mode_str,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/exposure/value")
 async def set_exposure(ip: str, request: SetExposureRequest):
     """Belichtungszeit setzen (in Mikrosekunden)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_EXP if request.camera == "tele" else CMD_CAMERA_WIDE_SET_EXP
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value_us": request.value,
                 "value_s": request.value / 1_000_000,
                 "camera": request.camera
@@ -155,10 +143,10 @@ async def set_exposure(ip: str, request: SetExposureRequest):
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -168,75 +156,64 @@ async def set_exposure(ip: str, request: SetExposureRequest):
 @router.post("/gain/mode")
 async def set_gain_mode(ip: str, request: SetGainModeRequest):
     """Gain-Modus setzen (Auto/Manual)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.mode)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_GAIN_MODE if request.camera == "tele" else CMD_CAMERA_WIDE_SET_GAIN
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             mode_str = "Auto" if request.mode == 0 else "Manual"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": mode_str,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/gain/value")
 async def set_gain(ip: str, request: SetGainRequest):
     """Gain-Wert setzen (0-300 typisch)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_GAIN if request.camera == "tele" else CMD_CAMERA_WIDE_SET_GAIN
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value": request.value,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -246,39 +223,34 @@ async def set_gain(ip: str, request: SetGainRequest):
 @router.post("/wb/mode")
 async def set_wb_mode(ip: str, request: SetWBModeRequest):
     """Weißabgleich-Modus setzen (Auto/Manual)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.mode)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_WB_MODE if request.camera == "tele" else CMD_CAMERA_WIDE_SET_WB_MODE
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             mode_str = "Auto" if request.mode == 0 else "Manual"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": mode_str,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -288,38 +260,32 @@ async def set_wb_mode(ip: str, request: SetWBModeRequest):
 @router.post("/ircut")
 async def set_ircut(ip: str, request: SetIRCutRequest):
     """IR-Filter setzen (nur Tele-Kamera)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.mode)
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_CAMERA_TELE,
             CMD_CAMERA_TELE_SET_IRCUT,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             mode_str = "Cut (Normal)" if request.mode == 0 else "Pass (Astro)"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": mode_str
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -329,142 +295,118 @@ async def set_ircut(ip: str, request: SetIRCutRequest):
 @router.post("/brightness")
 async def set_brightness(ip: str, request: SetImageQualityRequest):
     """Helligkeit setzen (0-255)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_BRIGHTNESS if request.camera == "tele" else CMD_CAMERA_WIDE_SET_BRIGHTNESS
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value": request.value,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/contrast")
 async def set_contrast(ip: str, request: SetImageQualityRequest):
     """Kontrast setzen (0-255)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_CONTRAST if request.camera == "tele" else CMD_CAMERA_WIDE_SET_CONTRAST
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value": request.value,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/saturation")
 async def set_saturation(ip: str, request: SetImageQualityRequest):
     """Sättigung setzen (0-255)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_SATURATION if request.camera == "tele" else CMD_CAMERA_WIDE_SET_SATURATION
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value": request.value,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/sharpness")
 async def set_sharpness(ip: str, request: SetImageQualityRequest):
     """Schärfe setzen (0-255)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_single_int_message(request.value)
         
         module = MODULE_CAMERA_TELE if request.camera == "tele" else MODULE_CAMERA_WIDE
         cmd = CMD_CAMERA_TELE_SET_SHARPNESS if request.camera == "tele" else CMD_CAMERA_WIDE_SET_SHARPNESS
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             module, cmd, req_data, wait_response=True
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "value": request.value,
                 "camera": request.camera
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
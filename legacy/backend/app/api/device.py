@@ -2,18 +2,30 @@
 Device API Endpoints
 Geräte-Verwaltung und Informationen
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from ..config import settings
 from ..database import get_db
 from ..models import Device
-from ..services.dwarf_client import DwarfHTTPClient
+from ..services.dwarf_client import http_clients
+from ..lib.dwarf_connection import connection_manager
+from ..lib.dwarfii_cache import response_cache
+from ..lib.dwarfii_events import POLICY_COALESCE_LATEST
+from ..lib.dwarfii_metrics import process_stats
 from sqlalchemy import select
 from datetime import datetime
 
 router = APIRouter()
 
+# SSE-Kommentarzeile, damit Proxies/Browser die Verbindung nicht schließen
+EVENTS_KEEPALIVE_INTERVAL = 15.0
+
 
 # ============================================================================
 # Schemas
@@ -35,6 +47,22 @@ class DeviceInfo(BaseModel):
     is_connected: bool
 
 
+class BatchCommand(BaseModel):
+    """Ein Befehl im Batch"""
+    module_id: int
+    cmd: int
+    payload: str = ""  # Serialisierte Request-Message als Hex
+    timeout: Optional[float] = None
+    after: List[int] = []  # Indizes früherer Befehle, deren Antwort abgewartet wird
+    barrier: bool = False  # Wartet auf alle vorherigen, alle späteren warten auf ihn
+
+
+class BatchRequest(BaseModel):
+    """Geordnete Befehlsliste"""
+    commands: List[BatchCommand]
+    skip_on_error: bool = True  # Abhängige Befehle überspringen, wenn eine Abhängigkeit fehlschlägt
+
+
 class DeviceNamePassword(BaseModel):
     """Name/Passwort ändern"""
     mode: int  # 0: Passwort, 1: Name
@@ -54,7 +82,7 @@ async def connect_device(
     """
     Gerät verbinden und in Datenbank speichern
     """
-    client = DwarfHTTPClient(device.ip, device.port)
+    client = http_clients.get(device.ip, device.port)
     
     try:
         # Geräte-Info abrufen
@@ -104,40 +132,226 @@ async def connect_device(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.get("/info")
-async def get_device_info(ip: str):
+async def get_device_info(ip: str, fresh: bool = False):
     """
-    Geräte-Informationen direkt vom DWARF II abrufen
+    Geräte-Informationen vom DWARF II abrufen
+    Antwortet aus dem Gerätezustand, solange eine WebSocket-Verbindung besteht
+    (Verbindungswechsel verwerfen ihn); sonst und mit fresh=1 fragt es das Gerät
     """
-    client = DwarfHTTPClient(ip)
+    state = await connection_manager.get_state(ip, connect=False)
+    if not fresh and state.attached and state.device_info is not None:
+        return state.device_info
+    
+    client = http_clients.get(ip)
     
     try:
         info = await client.get_device_info()
+        if info.get("code") == 0 and state.attached:
+            state.set_device_info(info)
         return info
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.get("/firmware")
-async def get_firmware_version(ip: str):
+async def get_firmware_version(ip: str, fresh: bool = False):
     """
     Firmware-Version abrufen
+    Aus dem Antwort-Cache (bis zum nächsten Reconnect); fresh=1 fragt das Gerät
     """
-    client = DwarfHTTPClient(ip)
-    
     try:
-        version = await client.get_firmware_version()
-        return version
+        return await response_cache.get_http(ip, "firmwareVersion", lambda client: client.get_firmware_version(), fresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    Antwort-Cache: Treffer/Fehlgriffe/Invalidierungen pro Befehl und aktuelle Einträge
+    """
+    return response_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache(ip: str):
+    """Alle Cache-Einträge eines Geräts verwerfen"""
+    return {"status": "success", "invalidated": response_cache.invalidate(ip)}
+
+
+@router.get("/connection")
+async def get_connection_metrics(ip: Optional[str] = None):
+    """
+    Verbindungs-Metriken (Ausfälle, Reconnect-Zeiten, Queue)
+    Ohne ip: alle Geräte im Pool
+    """
+    metrics = connection_manager.get_metrics()
+    if ip is None:
+        return metrics
+    if ip not in metrics:
+        raise HTTPException(status_code=404, detail="Keine Verbindung zu diesem Gerät")
+    return metrics[ip]
+
+
+@router.get("/diagnostics")
+async def get_diagnostics(ip: Optional[str] = None, objects: bool = False):
+    """
+    Leck-Diagnose: lebende Callbacks, Bus-Abonnenten und wartende Befehle pro
+    Gerät sowie Speicher/Tasks des Prozesses. objects=1 zählt zusätzlich alle
+    GC-Objekte (teuer, nur zur Fehlersuche).
+    """
+    counts = connection_manager.get_resource_counts()
+    if ip is not None:
+        if ip not in counts:
+            raise HTTPException(status_code=404, detail="Keine Verbindung zu diesem Gerät")
+        counts = {ip: counts[ip]}
+    return {
+        "process": process_stats(count_objects=objects),
+        "devices": counts,
+        "http_clients": http_clients.get_stats()
+    }
+
+
+@router.get("/trace")
+async def get_packet_trace(
+    ip: str,
+    limit: Optional[int] = None,
+    module_id: Optional[int] = None,
+    cmd: Optional[int] = None
+):
+    """
+    Zuletzt gesendete/empfangene Paket-Header (Ringpuffer, älteste zuerst)
+    Optional gefiltert nach module_id/cmd und auf die letzten limit begrenzt
+    """
+    trace = connection_manager.get_trace(ip)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Keine Verbindung zu diesem Gerät")
+    return {
+        **trace.summary(),
+        "packets": trace.dump(limit=limit, module_id=module_id, cmd=cmd)
+    }
+
+
+@router.get("/state")
+async def get_device_state(ip: str):
+    """
+    Zuletzt bekannter Gerätezustand (aus Notifications, ohne Geräte-Roundtrip)
+    """
+    state = await connection_manager.get_state(ip)
+    return state.to_dict()
+
+
+@router.get("/events")
+async def device_events(
+    ip: str,
+    request: Request,
+    cmds: Optional[str] = None,
+    notifications_only: bool = False,
+    max_rate: Optional[float] = None
+):
+    """
+    Live-Stream dekodierter Notifications und Befehlsantworten (Server-Sent Events)
+
+    Jedes Event: "event: notify" bzw. "event: response" mit kompaktem JSON
+    {"module", "cmd", "type", "msg"}. Pro Client höchstens max_rate Events/s;
+    dazwischen wird pro (module, cmd) nur der neueste Stand behalten.
+
+    Args:
+        ip: Geräte-IP
+        cmds: Kommagetrennte Befehls-IDs (leer: alle)
+        notifications_only: Nur Notifications senden
+        max_rate: Max. Events pro Sekunde (Default: settings.dwarf_events_max_rate)
+    """
+    ws_handler = await connection_manager.get_connection(ip)
+    if not ws_handler.is_connected():
+        raise HTTPException(status_code=503, detail="Verbindung fehlgeschlagen")
+
+    try:
+        cmd_filter = [int(cmd) for cmd in cmds.split(",") if cmd] if cmds else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cmds: kommagetrennte Zahlen erwartet")
+
+    rate = settings.dwarf_events_max_rate if max_rate is None else max_rate
+    min_interval = 1.0 / rate if rate > 0 else 0.0
+
+    name = f"sse:{request.client.host if request.client else '?'}"
+
+    async def event_generator():
+        # Abonnement erst beim Streamen anlegen: ein nie gestarteter Generator
+        # würde sein finally nicht ausführen und das Abonnement zurücklassen
+        with ws_handler.events.subscribe(
+            cmds=cmd_filter,
+            notifications_only=notifications_only,
+            policy=POLICY_COALESCE_LATEST,
+            name=name
+        ) as subscription:
+            while True:
+                try:
+                    packet = await asyncio.wait_for(subscription.get(), timeout=EVENTS_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+
+                if packet is None:
+                    break
+
+                event = "notify" if packet.is_notification else "response"
+                payload = json.dumps(packet.to_dict(), separators=(",", ":"))
+                yield f"event: {event}\ndata: {payload}\n\n"
+
+                # Rate-Limit: in der Pause sammelt die Subscription nur den neuesten Stand
+                if min_interval:
+                    await asyncio.sleep(min_interval)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/batch")
+async def execute_batch(ip: str, batch: BatchRequest):
+    """
+    Mehrere Gerätebefehle in einem HTTP-Call
+
+    Befehle ohne after/barrier werden in Listenreihenfolge gesendet und
+    überlappen auf der persistenten Verbindung (Pipelining); die Antwort
+    enthält die Ergebnisse aller Befehle in derselben Reihenfolge.
+    """
+    try:
+        commands = [
+            {
+                "module_id": command.module_id,
+                "cmd": command.cmd,
+                "payload": bytes.fromhex(command.payload),
+                "timeout": command.timeout,
+                "after": command.after,
+                "barrier": command.barrier,
+            }
+            for command in batch.commands
+        ]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="payload: Hex-String erwartet")
+
+    start = time.perf_counter()
+    try:
+        results = await connection_manager.execute_batch(ip, commands, skip_on_error=batch.skip_on_error)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "status": "success" if all(result["status"] == "success" for result in results) else "error",
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 2)
+    }
 
 
 @router.post("/name-password")
@@ -146,7 +360,7 @@ async def set_name_password(ip: str, data: DeviceNamePassword):
     Gerätename oder Passwort ändern
     mode: 0 = Passwort, 1 = Name
     """
-    client = DwarfHTTPClient(ip)
+    client = http_clients.get(ip)
     
     try:
         result = await client.set_device_name_and_password(
@@ -154,11 +368,10 @@ async def set_name_password(ip: str, data: DeviceNamePassword):
             old_value=data.old_value,
             new_value=data.new_value
         )
+        (await connection_manager.get_state(ip, connect=False)).clear_device_info()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.post("/reset")
@@ -166,15 +379,14 @@ async def reset_device(ip: str):
     """
     Gerät auf Werkseinstellungen zurücksetzen
     """
-    client = DwarfHTTPClient(ip)
+    client = http_clients.get(ip)
     
     try:
         result = await client.reset_device_info()
+        (await connection_manager.get_state(ip, connect=False)).clear_device_info()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 @router.get("/list")
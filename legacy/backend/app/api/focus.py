@@ -2,12 +2,13 @@
 Focus API Endpoints
 Fokus-Steuerung: Auto, Manual, Astro
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import focus_pb2, base_pb2
+from ..lib.dwarf_connection import connection_manager
+from ..services.proto import focus_pb2
 from ..utils.constants import *
+from ..utils.http import wait_disconnected
 
 router = APIRouter()
 
@@ -43,45 +44,42 @@ class ManualContinuRequest(BaseModel):
 # ============================================================================
 
 @router.post("/auto")
-async def auto_focus(ip: str, request: AutoFocusRequest):
+async def auto_focus(ip: str, request: AutoFocusRequest, http_request: Request):
     """
     Normal-Autofokus
     mode: 0 = Global, 1 = Bereich (mit center_x, center_y)
+    Trennt der Client die Verbindung, endet nur das Warten: das Protokoll hat
+    keinen Stopp-Befehl für den Normal-Autofokus (nur für den Astro-Autofokus),
+    daher gibt es hier kein stop_on_disconnect.
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqNormalAutoFocus()
         req.mode = request.mode
         req.center_x = request.center_x
         req.center_y = request.center_y
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute_cancellable(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_AUTO_FOCUS,
             req.SerializeToString(),
-            wait_response=True,
-            timeout=30.0
+            timeout=30.0,
+            gone=wait_disconnected(http_request)
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": "global" if request.mode == 0 else "region"
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -94,72 +92,58 @@ async def start_astro_autofocus(ip: str, request: AstroAutoFocusRequest):
     Astro-Autofokus starten
     mode: 0 = Langsam (präzise), 1 = Schnell
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqAstroAutoFocus()
         req.mode = request.mode
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_START_ASTRO_AUTO_FOCUS,
             req.SerializeToString(),
-            wait_response=True,
             timeout=60.0  # Astro-Fokus kann länger dauern
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": "slow" if request.mode == 0 else "fast"
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/astro/stop")
 async def stop_astro_autofocus(ip: str):
     """Astro-Autofokus stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqStopAstroAutoFocus()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_STOP_ASTRO_AUTO_FOCUS,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -172,37 +156,30 @@ async def manual_step_focus(ip: str, request: ManualStepRequest):
     Manueller Einzelschritt
     direction: 0 = Fern, 1 = Nah
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqManualSingleStepFocus()
         req.direction = request.direction
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_MANUAL_SINGLE_STEP_FOCUS,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "direction": "far" if request.direction == 0 else "near"
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/manual/continuous/start")
@@ -211,68 +188,54 @@ async def start_manual_continuous_focus(ip: str, request: ManualContinuRequest):
     Manueller Dauerfokus starten
     direction: 0 = Fern, 1 = Nah
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqStartManualContinuFocus()
         req.direction = request.direction
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_START_MANUAL_CONTINU_FOCUS,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "direction": "far" if request.direction == 0 else "near"
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/manual/continuous/stop")
 async def stop_manual_continuous_focus(ip: str):
     """Manueller Dauerfokus stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = focus_pb2.ReqStopManualContinuFocus()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_FOCUS,
             CMD_FOCUS_STOP_MANUAL_CONTINU_FOCUS,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
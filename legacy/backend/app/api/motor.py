@@ -5,8 +5,8 @@ Motor-Steuerung: Rotation, Pitch, Joystick
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import motor_pb2, base_pb2
+from ..lib.dwarf_connection import connection_manager
+from ..services.proto import motor_pb2
 from ..utils.constants import *
 
 router = APIRouter()
@@ -61,11 +61,7 @@ async def run_motor(ip: str, request: MotorRunRequest):
     motor_id: 0 = Rotation (Azimut), 1 = Pitch (Höhe)
     direction: False = links/unten, True = rechts/oben
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqMotorRun()
         req.id = request.motor_id
         req.speed = request.speed
@@ -73,23 +69,24 @@ async def run_motor(ip: str, request: MotorRunRequest):
         req.speed_ramping = request.speed_ramping
         req.resolution_level = request.resolution_level
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_RUN,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            res = motor_pb2.ResMotor()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             motor_name = "Rotation" if request.motor_id == 0 else "Pitch"
             direction_name = "rechts/oben" if request.direction else "links/unten"
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "motor": motor_name,
                 "direction": direction_name,
                 "speed": request.speed
@@ -97,10 +94,10 @@ async def run_motor(ip: str, request: MotorRunRequest):
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stop")
@@ -109,39 +106,36 @@ async def stop_motor(ip: str, request: MotorStopRequest):
     Motor stoppen
     motor_id: 0 = Rotation, 1 = Pitch
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqMotorStop()
         req.id = request.motor_id
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_STOP,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            res = motor_pb2.ResMotor()
-            res.ParseFromString(response.data)
+            res = response.message
+            if res is None:
+                return {"status": "error", "code": None, "message": "Antwort nicht dekodierbar"}
             
             motor_name = "Rotation" if request.motor_id == 0 else "Pitch"
             
             return {
-                "status": "success" if res.code == 0 else "error",
-                "code": res.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "motor": motor_name
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -156,30 +150,23 @@ async def start_joystick(ip: str, request: JoystickRequest):
     vector_length: 0-1 (Intensität)
     speed: 0.1-30 °/s
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqMotorServiceJoystick()
         req.vector_angle = request.vector_angle
         req.vector_length = request.vector_length
         req.speed = request.speed
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_SERVICE_JOYSTICK,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "angle": request.vector_angle,
                 "length": request.vector_length,
                 "speed": request.speed
@@ -187,10 +174,10 @@ async def start_joystick(ip: str, request: JoystickRequest):
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/joystick/fixed-angle")
@@ -199,73 +186,59 @@ async def joystick_fixed_angle(ip: str, request: JoystickFixedAngleRequest):
     Joystick Fixed Angle
     Bewegung in fester Richtung
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqMotorServiceJoystickFixedAngle()
         req.vector_angle = request.vector_angle
         req.vector_length = request.vector_length
         req.speed = request.speed
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_SERVICE_JOYSTICK_FIXED_ANGLE,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "angle": request.vector_angle
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/joystick/stop")
 async def stop_joystick(ip: str):
     """Joystick-Steuerung stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqMotorServiceJoystickStop()
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_SERVICE_JOYSTICK_STOP,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -278,36 +251,29 @@ async def dual_camera_linkage(ip: str, request: DualCameraLinkageRequest):
     Dual-Kamera-Linkage
     Synchronisierte Bewegung beider Kameras
     """
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req = motor_pb2.ReqDualCameraLinkage()
         req.x = request.x
         req.y = request.y
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_MOTOR,
             CMD_STEP_MOTOR_SERVICE_DUAL_CAMERA_LINKAGE,
-            req.SerializeToString(),
-            wait_response=True
+            req.SerializeToString()
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "x": request.x,
                 "y": request.y
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
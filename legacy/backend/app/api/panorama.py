@@ -4,8 +4,7 @@ Panorama-Aufnahmen
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import base_pb2
+from ..lib.dwarf_connection import connection_manager
 from ..utils.constants import *
 
 router = APIRouter()
@@ -56,70 +55,56 @@ def _create_req_start_panorama(rows: int, cols: int) -> bytes:
 @router.post("/start")
 async def start_panorama(ip: str, request: StartPanoramaRequest):
     """Panorama-Aufnahme starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_req_start_panorama(request.rows, request.cols)
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_PANORAMA,
             CMD_PANORAMA_START_GRID,
             req_data,
-            wait_response=True,
             timeout=10.0
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "grid": {"rows": request.rows, "cols": request.cols},
                 "total_images": request.rows * request.cols
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stop")
 async def stop_panorama(ip: str):
     """Panorama-Aufnahme stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         # Empty message
         req_data = b""
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_PANORAMA,
             CMD_PANORAMA_STOP,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
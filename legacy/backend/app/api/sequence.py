@@ -0,0 +1,99 @@
+"""
+Sequence API Endpoints
+Mehrschrittige Abläufe auf dem Server: starten, Fortschritt, Abbruch
+"""
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from ..lib.dwarfii_sequence import sequence_manager, SEQUENCE_ACTIONS
+
+router = APIRouter()
+
+
+# ============================================================================
+# Schemas
+# ============================================================================
+
+class SequenceStepRequest(BaseModel):
+    """Ein Schritt: Aktion mit Parametern oder roher Befehl"""
+    name: Optional[str] = None
+    action: Optional[str] = None  # z.B. "open_tele_camera", "goto_dso" (siehe /actions)
+    params: Dict[str, Any] = {}
+    module_id: Optional[int] = None
+    cmd: Optional[int] = None
+    payload: str = ""  # Serialisierte Request-Message als Hex (nur ohne action)
+    timeout: Optional[float] = None
+    notify_cmd: Optional[int] = None  # Abschluss-Notification (überschreibt den Default)
+    done_states: List[int] = []
+    fail_states: List[int] = []
+    ok_codes: List[int] = []
+
+
+class SequenceRequest(BaseModel):
+    """Sequenz"""
+    name: str = ""
+    steps: List[SequenceStepRequest]
+
+
+# ============================================================================
+# Endpoints
+# ============================================================================
+
+@router.get("/actions")
+async def list_actions():
+    """Verfügbare Aktionen für Schritte"""
+    return {
+        name: {"module_id": module_id, "cmd": cmd}
+        for name, (module_id, cmd, _) in SEQUENCE_ACTIONS.items()
+    }
+
+
+@router.post("/start")
+async def start_sequence(ip: str, request: SequenceRequest):
+    """
+    Sequenz starten
+    Läuft im Hintergrund; Fortschritt über GET /api/sequence/{id}
+    """
+    try:
+        specs = []
+        for step in request.steps:
+            spec = step.model_dump()
+            spec["payload"] = bytes.fromhex(step.payload)
+            specs.append(spec)
+        sequence = sequence_manager.start(ip, specs, request.name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return sequence.to_dict()
+
+
+@router.get("/list")
+async def list_sequences(ip: Optional[str] = None):
+    """Laufende und zuletzt beendete Sequenzen"""
+    return [sequence.to_dict() for sequence in sequence_manager.list(ip)]
+
+
+@router.get("/{sequence_id}")
+async def get_sequence(sequence_id: int):
+    """Fortschritt einer Sequenz"""
+    sequence = sequence_manager.get(sequence_id)
+    if sequence is None:
+        raise HTTPException(status_code=404, detail="Sequenz nicht gefunden")
+    return sequence.to_dict()
+
+
+@router.post("/{sequence_id}/cancel")
+async def cancel_sequence(sequence_id: int, send_stop: bool = True):
+    """
+    Sequenz abbrechen
+    send_stop: Stopp-Befehl für den laufenden Schritt senden (z.B. GOTO stoppen)
+    """
+    sequence = sequence_manager.get(sequence_id)
+    if sequence is None:
+        raise HTTPException(status_code=404, detail="Sequenz nicht gefunden")
+    if not sequence.cancel(send_stop=send_stop):
+        return {"status": "error", "message": f"Sequenz ist bereits beendet ({sequence.status})"}
+    await sequence.wait()
+    return sequence.to_dict()
@@ -4,8 +4,7 @@ Objekt-Verfolgung, Sentry-Modus, Multi-Object Tracking
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from ..services.dwarf_ws import DwarfWebSocketClient
-from ..services.proto import base_pb2
+from ..lib.dwarf_connection import connection_manager
 from ..utils.constants import *
 
 router = APIRouter()
@@ -80,73 +79,59 @@ def _create_req_mot_track_one(target_id: int) -> bytes:
 @router.post("/start")
 async def start_tracking(ip: str, request: StartTrackingRequest):
     """Objekt-Tracking starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_req_start_track(
             request.x, request.y, request.w, request.h
         )
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_TRACK_START_TRACK,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "box": {"x": request.x, "y": request.y, "w": request.w, "h": request.h}
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/stop")
 async def stop_tracking(ip: str):
     """Objekt-Tracking stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         # Empty message
         req_data = b""
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_TRACK_STOP_TRACK,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -156,73 +141,60 @@ async def stop_tracking(ip: str):
 @router.post("/sentry/start")
 async def start_sentry_mode(ip: str, request: StartSentryRequest):
     """Sentry-Modus starten (Wächter-Modus)"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_req_start_sentry(request.mode)
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_SENTRY_MODE_START,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
             
             mode_str = "UFO" if request.mode == 1 else "Normal"
             
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "mode": mode_str
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/sentry/stop")
 async def stop_sentry_mode(ip: str):
     """Sentry-Modus stoppen"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         # Empty message
         req_data = b""
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_SENTRY_MODE_STOP,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 # ============================================================================
@@ -232,68 +204,54 @@ async def stop_sentry_mode(ip: str):
 @router.post("/mot/start")
 async def start_mot(ip: str):
     """Multi-Object Tracking starten"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         # Empty message
         req_data = b""
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_MOT_START,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
 
 
 @router.post("/mot/track-one")
 async def mot_track_one(ip: str, request: MOTTrackOneRequest):
     """MOT: Spezifisches Objekt tracken"""
-    ws_client = DwarfWebSocketClient(ip)
-    
     try:
-        await ws_client.connect()
-        
         req_data = _create_req_mot_track_one(request.target_id)
         
-        response = await ws_client.send_command(
+        response = await connection_manager.execute(
+            ip,
             MODULE_TRACK,
             CMD_MOT_TRACK_ONE,
-            req_data,
-            wait_response=True
+            req_data
         )
         
         if response:
-            com_response = base_pb2.ComResponse()
-            com_response.ParseFromString(response.data)
-            
             return {
-                "status": "success" if com_response.code == 0 else "error",
-                "code": com_response.code,
+                "status": "success" if response.code == 0 else "error",
+                "code": response.code,
                 "target_id": request.target_id
             }
         
         return {"status": "no_response"}
         
+    except ConnectionError:
+        return {"status": "error", "message": "Verbindung fehlgeschlagen"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await ws_client.disconnect()
@@ -12,6 +12,29 @@ class Settings(BaseSettings):
     dwarf_http_port: int = 8082
     dwarf_jpg_port: int = 8092
     dwarf_ws_port: int = 9900
+    dwarf_pipeline_depth: int = 4  # max. unbeantwortete Befehle pro Gerät (1 = seriell)
+    dwarf_reconnect_attempts: int = 0  # 0 = unbegrenzt
+    dwarf_reconnect_delay_min: float = 0.5  # Sekunden, verdoppelt pro Versuch
+    dwarf_reconnect_delay_max: float = 30.0
+    dwarf_reconnect_wait: float = 5.0  # Endpoints warten so lange auf einen laufenden Reconnect
+    # Heartbeat: tot nach ca. timeout * misses ohne jedes Paket (Standard ~15 s, WLAN-Aussetzer
+    # des Geräte-APs überstehen). Schnelle Erkennung nur bei stabilem Netz, z.B. 0.5 / 0.4 / 2
+    dwarf_heartbeat_interval: float = 10.0  # Sekunden zwischen Pings (0 = aus)
+    dwarf_heartbeat_timeout: float = 5.0  # Sekunden bis ein Ping als verfehlt gilt
+    dwarf_heartbeat_misses: int = 3  # verfehlte Pings in Folge bis Verbindung als tot gilt
+    dwarf_pool_max_connections: int = 8  # max. gleichzeitig offene Geräteverbindungen
+    dwarf_pool_idle_timeout: float = 600.0  # Sekunden ohne Nutzung bis eine Verbindung geschlossen wird
+    dwarf_pool_health_interval: float = 30.0  # Sekunden zwischen Health-Checks (0 = aus)
+    dwarf_pool_drain_timeout: float = 5.0  # Sekunden für laufende Befehle beim Shutdown
+    dwarf_packet_trace_size: int = 512  # letzte Paket-Header pro Verbindung (/api/device/trace)
+    dwarf_packet_log_sample: int = 0  # jedes N-te Paket auf INFO loggen (0 = nur DEBUG)
+    dwarf_http_keepalive_expiry: float = 30.0  # Sekunden, die eine ungenutzte HTTP-Verbindung offen bleibt
+    dwarf_album_sync: bool = True  # Album-Metadaten lokal spiegeln (/api/album/list und /counts)
+    dwarf_thumbnail_cache_dir: str = "./database/thumbnails"
+    dwarf_thumbnail_cache_max_mb: float = 256.0  # Größenlimit, darüber werden die am längsten ungenutzten verworfen
+    dwarf_thumbnail_workers: int = 2  # Prozesse für lokal erzeugte Vorschauen (0 = aus, braucht Pillow)
+    dwarf_stop_on_disconnect: bool = False  # Stopp-Befehl senden, wenn der Client lange Befehle verlässt
+    dwarf_events_max_rate: float = 10.0  # max. Events/s pro /api/device/events-Client
     
     # API-Einstellungen
     api_title: str = "DWARF II Control API"
@@ -29,7 +29,22 @@ async def get_db():
             await session.close()
 
 
+def _drop_stale_media_table(connection):
+    """
+    media-Tabelle aus Versionen ohne Album-Index (ohne device_ip) verwerfen
+    Sie wurde vorher nie befüllt und wird beim nächsten Abgleich neu aufgebaut
+    """
+    from sqlalchemy import inspect
+    inspector = inspect(connection)
+    if "media" in inspector.get_table_names():
+        columns = {column["name"] for column in inspector.get_columns("media")}
+        if "device_ip" not in columns:
+            Base.metadata.tables["media"].drop(connection)
+
+
 async def init_db():
     """Datenbank initialisieren"""
+    from . import models  # noqa: F401 - Modelle an Base.metadata registrieren
     async with engine.begin() as conn:
+        await conn.run_sync(_drop_stale_media_table)
         await conn.run_sync(Base.metadata.create_all)
@@ -4,8 +4,16 @@ Verwaltet persistente WebSocket-Verbindungen
 """
 import asyncio
 import logging
-from typing import Dict, Optional
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 from .dwarfii_api import WebSocketHandler
+from .dwarfii_cache import response_cache
+from .dwarfii_packet import DwarfPacket
+from .dwarfii_state import DwarfDeviceState
+from .dwarfii_trace import PacketTrace
+from ..config import settings
+from ..services.album_index import album_index
+from ..utils.constants import STOP_COMMANDS, STOP_COMMAND_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +22,19 @@ class DwarfConnectionManager:
     """
     Singleton Connection Manager für DWARF II
     Hält WebSocket-Verbindungen offen und wiederverwendet sie
+
+    - Single-Flight: gleichzeitige Requests für ein neues Gerät teilen sich
+      einen Verbindungsaufbau
+    - max_connections: bei vollem Pool wird die am längsten ungenutzte,
+      untätige Verbindung geschlossen
+    - Health-Check im Hintergrund: untätige Verbindungen nach idle_timeout
+      schließen, aufgegebene (Reconnect erfolglos) entfernen
+    - drain(): beim Shutdown laufende Befehle abwarten, dann schließen
     """
     
     _instance = None
     _connections: Dict[str, WebSocketHandler] = {}
+    _states: Dict[str, DwarfDeviceState] = {}
     
     def __new__(cls):
         if cls._instance is None:
@@ -27,6 +44,15 @@ class DwarfConnectionManager:
     def __init__(self):
         if not hasattr(self, '_initialized'):
             self._connections = {}
+            self._states = {}
+            self._connecting: Dict[str, asyncio.Task] = {}
+            self._last_used: Dict[str, float] = {}
+            self._health_task: Optional[asyncio.Task] = None
+            self._draining = False
+            self.max_connections = settings.dwarf_pool_max_connections
+            self.idle_timeout = settings.dwarf_pool_idle_timeout
+            self.health_interval = settings.dwarf_pool_health_interval
+            self.pool_stats = {"created": 0, "reused": 0, "joined": 0, "failed": 0, "evicted_idle": 0, "evicted_lru": 0, "removed_dead": 0, "client_cancelled": 0}
             self._initialized = True
             logger.info("DwarfConnectionManager initialized")
     
@@ -35,41 +61,399 @@ class DwarfConnectionManager:
         Hole oder erstelle WebSocket-Verbindung für IP
         Wiederverwendet bestehende Verbindungen
         """
+        if self._draining:
+            raise RuntimeError("Connection-Pool wird heruntergefahren")
+        
+        self._last_used[ip] = time.monotonic()
+        
         # Prüfe ob Verbindung existiert und noch offen ist
-        if ip in self._connections:
-            ws_handler = self._connections[ip]
+        ws_handler = self._connections.get(ip)
+        if ws_handler is not None:
             if ws_handler.is_connected():
-                logger.info(f"♻️ Wiederverwendung bestehender Verbindung für {ip}")
+                logger.debug(f"♻️ Wiederverwendung bestehender Verbindung für {ip}")
+                self.pool_stats["reused"] += 1
                 return ws_handler
+            
+            if ws_handler.is_reconnecting:
+                # Reconnect läuft bereits - kurz warten statt neu zu verbinden
+                logger.info(f"⏳ Warte auf Reconnect für {ip}")
+                await ws_handler.wait_connected(settings.dwarf_reconnect_wait)
+                return ws_handler
+        
+        # Single-Flight: läuft bereits ein Verbindungsaufbau, darauf warten
+        task = self._connecting.get(ip)
+        if task is not None:
+            self.pool_stats["joined"] += 1
+            return await asyncio.shield(task)
+        
+        task = asyncio.create_task(self._connect(ip, ws_handler))
+        self._connecting[ip] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._connecting.pop(ip, None)
             else:
-                logger.info(f"🔄 Alte Verbindung geschlossen, erstelle neue für {ip}")
-                del self._connections[ip]
+                task.add_done_callback(lambda _: self._connecting.pop(ip, None))
+    
+    async def _connect(self, ip: str, ws_handler: Optional[WebSocketHandler]) -> WebSocketHandler:
+        """Verbindung aufbauen (genau ein Aufruf pro IP gleichzeitig)"""
+        if ws_handler is not None:
+            # Reconnect aufgegeben: selben Handler neu öffnen (Abonnenten bleiben erhalten)
+            logger.info(f"🔄 Verbindung für {ip} geschlossen, öffne neu")
+            ws_handler.keep_connection = True
+            await ws_handler.open()
+            return ws_handler
+        
+        if len(self._connections) >= self.max_connections:
+            await self._evict_lru()
         
         # Erstelle neue Verbindung
         logger.info(f"🆕 Erstelle neue Verbindung für {ip}")
         ws_handler = WebSocketHandler(ip)
+        ws_handler.max_in_flight = settings.dwarf_pipeline_depth
+        ws_handler.nb_reconnect_default = settings.dwarf_reconnect_attempts
+        ws_handler.reconnect_delay_min = settings.dwarf_reconnect_delay_min
+        ws_handler.reconnect_delay_max = settings.dwarf_reconnect_delay_max
+        ws_handler.trace.resize(settings.dwarf_packet_trace_size)
+        ws_handler.trace.sample_every = settings.dwarf_packet_log_sample
         await ws_handler.open()
         
         if ws_handler.is_connected():
+            ws_handler.keep_connection = True
             self._connections[ip] = ws_handler
+            self.pool_stats["created"] += 1
             logger.info(f"✅ Verbindung für {ip} erstellt und gespeichert")
+            
+            # Gerätezustand an die neue Verbindung hängen (einmal abfragen, dann Notifications)
+            state = self._states.get(ip)
+            if state is None:
+                state = self._states[ip] = DwarfDeviceState(ip)
+            state.attach(ws_handler)
+            response_cache.attach(ip, ws_handler)
+            album_index.attach(ip, ws_handler)
+            self._start_health_check()
         else:
+            self.pool_stats["failed"] += 1
             logger.error(f"❌ Verbindung für {ip} fehlgeschlagen")
         
         return ws_handler
     
+    def _is_busy(self, ip: str) -> bool:
+        """Laufende Befehle oder externe Abonnenten (z.B. Event-Stream)?"""
+        ws_handler = self._connections[ip]
+        if ws_handler.in_flight or ws_handler.sending_queue:
+            return True
+        state = self._states.get(ip)
+        own = {
+            state.subscription() if state is not None else None,
+            response_cache.subscription(ip),
+            album_index.subscription(ip)
+        }
+        return any(subscription not in own for subscription in ws_handler.events.subscriptions)
+    
+    async def _evict_lru(self):
+        """Pool voll: am längsten ungenutzte, untätige Verbindung schließen"""
+        idle = [ip for ip in self._connections if not self._is_busy(ip)]
+        if not idle:
+            raise RuntimeError(f"Connection-Pool voll ({self.max_connections} aktive Verbindungen)")
+        ip = min(idle, key=lambda candidate: self._last_used.get(candidate, 0.0))
+        logger.info(f"♻️ Pool voll - schließe am längsten ungenutzte Verbindung {ip}")
+        self.pool_stats["evicted_lru"] += 1
+        await self.close_connection(ip)
+    
+    def _start_health_check(self):
+        if self.health_interval > 0 and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def _health_loop(self):
+        while self._connections:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Pool health check failed: {e}")
+    
+    async def check_health(self):
+        """
+        Untätige Verbindungen nach idle_timeout schließen und
+        Verbindungen entfernen, deren Reconnect aufgegeben wurde
+        """
+        now = time.monotonic()
+        for ip in list(self._connections):
+            ws_handler = self._connections[ip]
+            if not ws_handler.is_connected() and not ws_handler.is_reconnecting and ip not in self._connecting:
+                logger.info(f"🧹 Entferne tote Verbindung {ip}")
+                self.pool_stats["removed_dead"] += 1
+                await self.close_connection(ip)
+            elif now - self._last_used.get(ip, now) > self.idle_timeout and not self._is_busy(ip):
+                logger.info(f"💤 Schließe untätige Verbindung {ip}")
+                self.pool_stats["evicted_idle"] += 1
+                await self.close_connection(ip)
+    
+    async def execute(
+        self,
+        ip: str,
+        module_id: int,
+        cmd: int,
+        payload: bytes = b"",
+        timeout: Optional[float] = None,
+        fresh: bool = False
+    ) -> Optional[DwarfPacket]:
+        """
+        Befehl über die gepoolte Verbindung senden und auf die Antwort warten
+        Gemeinsamer Request/Response-Weg für alle Router
+        Lesebefehle aus CACHE_TTL werden aus dem Antwort-Cache beantwortet
+        (fresh=True fragt trotzdem am Gerät ab)
+
+        Returns:
+            Antwort-Paket (DwarfPacket) oder None bei Timeout
+
+        Raises:
+            ConnectionError: Gerät nicht erreichbar
+        """
+        response, _ = await self.execute_cached(ip, module_id, cmd, payload, timeout=timeout, fresh=fresh)
+        return response
+
+    async def execute_cached(
+        self,
+        ip: str,
+        module_id: int,
+        cmd: int,
+        payload: bytes = b"",
+        timeout: Optional[float] = None,
+        fresh: bool = False
+    ) -> Tuple[Optional[DwarfPacket], bool]:
+        """
+        Wie execute(), liefert zusätzlich, ob die Antwort aus dem Antwort-Cache kam
+
+        Returns:
+            (Antwort-Paket oder None, aus dem Cache?)
+
+        Raises:
+            ConnectionError: Gerät nicht erreichbar
+        """
+        ws_handler = await self.get_connection(ip)
+        if not ws_handler.is_connected():
+            raise ConnectionError(f"Verbindung zu {ip} fehlgeschlagen")
+
+        async def fetch():
+            try:
+                return await ws_handler.send_command(module_id, cmd, payload, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ Keine Antwort von {ip} auf {module_id}/{cmd}")
+                return None
+
+        response, cached = await response_cache.get_or_fetch(ip, module_id, cmd, payload, fetch, fresh=fresh)
+        if response is not None and not cached:
+            # Eigene Set-Befehle verwerfen betroffene Einträge sofort (nicht erst über den Bus)
+            response_cache.on_packet(ip, response)
+        return response, cached
+
+    async def execute_cancellable(
+        self,
+        ip: str,
+        module_id: int,
+        cmd: int,
+        payload: bytes = b"",
+        timeout: Optional[float] = None,
+        gone: Optional[Awaitable] = None,
+        send_stop: bool = False
+    ) -> Optional[DwarfPacket]:
+        """
+        Wie execute(), aber das Warten endet vorzeitig, sobald gone fertig ist
+        (z.B. wait_disconnected(request): der HTTP-Client hat die Seite verlassen)
+
+        Der wartende Befehl wird dann abgebrochen - Future, pending_commands und
+        in_flight werden sofort frei statt erst nach dem Timeout. Mit send_stop
+        wird zusätzlich der passende Stopp-Befehl aus STOP_COMMANDS gesendet.
+
+        Returns:
+            Antwort-Paket, None bei Timeout oder Client-Abbruch
+
+        Raises:
+            ConnectionError: Gerät nicht erreichbar
+        """
+        if gone is None:
+            return await self.execute(ip, module_id, cmd, payload, timeout=timeout)
+
+        command = asyncio.ensure_future(self.execute(ip, module_id, cmd, payload, timeout=timeout))
+        watcher = asyncio.ensure_future(gone)
+        try:
+            await asyncio.wait((command, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Auch wenn der Endpoint selbst abgebrochen wird: nichts weiterlaufen lassen
+            watcher.cancel()
+            if not command.done():
+                command.cancel()
+
+        if command.done() and not command.cancelled():
+            return command.result()
+
+        logger.info(f"🚪 Client getrennt - warte nicht mehr auf {module_id}/{cmd} von {ip}")
+        self.pool_stats["client_cancelled"] += 1
+        stop_cmd = STOP_COMMANDS.get((module_id, cmd))
+        if send_stop and stop_cmd is not None:
+            try:
+                await self.execute(ip, module_id, stop_cmd, b"", timeout=STOP_COMMAND_TIMEOUT)
+                logger.info(f"🛑 Stopp-Befehl {module_id}/{stop_cmd} an {ip} gesendet")
+            except ConnectionError as e:
+                logger.warning(f"⚠️ Stopp-Befehl an {ip} fehlgeschlagen: {e}")
+        return None
+
+    async def execute_batch(
+        self,
+        ip: str,
+        commands: List[Dict[str, Any]],
+        skip_on_error: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Befehlsliste in einem Durchgang über die gepoolte Verbindung senden
+
+        Befehle ohne Abhängigkeit werden sofort (in Listenreihenfolge)
+        eingereiht und überlappen im Pipeline-Fenster. Ein Befehl mit
+        "after" wartet auf die Antworten der genannten (früheren) Indizes,
+        ein "barrier"-Befehl auf alle vorherigen - und alle späteren auf ihn.
+
+        Args:
+            ip: Geräte-IP
+            commands: Dicts mit module_id, cmd, payload (bytes) und optional
+                timeout, after (Liste früherer Indizes), barrier (bool)
+            skip_on_error: Befehle überspringen, deren Abhängigkeit fehlschlug
+
+        Returns:
+            Ergebnis pro Befehl (gleiche Reihenfolge): status, code, elapsed_ms
+
+        Raises:
+            ValueError: Abhängigkeit auf keinen früheren Index
+            ConnectionError: Gerät nicht erreichbar
+        """
+        dependencies = []
+        last_barrier = None
+        for index, command in enumerate(commands):
+            after = set(command.get("after") or ())
+            if any(not 0 <= dep < index for dep in after):
+                raise ValueError(f"Befehl {index}: 'after' darf nur frühere Befehle nennen")
+            if command.get("barrier"):
+                after.update(range(index))
+            elif last_barrier is not None:
+                after.add(last_barrier)
+            if command.get("barrier"):
+                last_barrier = index
+            dependencies.append(sorted(after))
+
+        ws_handler = await self.get_connection(ip)
+        if not ws_handler.is_connected():
+            raise ConnectionError(f"Verbindung zu {ip} fehlgeschlagen")
+
+        start = time.perf_counter()
+        results: List[Dict[str, Any]] = [None] * len(commands)
+        done = [asyncio.Event() for _ in commands]
+
+        async def run(index: int, command: Dict[str, Any], future: Optional[asyncio.Future]):
+            result = results[index] = {"index": index, "module_id": command["module_id"], "cmd": command["cmd"]}
+            try:
+                if future is None:
+                    for dep in dependencies[index]:
+                        await done[dep].wait()
+                    failed = [dep for dep in dependencies[index] if results[dep]["status"] != "success"]
+                    if failed and skip_on_error:
+                        result.update(status="skipped", code=None, failed_dependencies=failed)
+                        return
+                    future = ws_handler.send_command(
+                        command["module_id"], command["cmd"], command.get("payload", b""),
+                        timeout=command.get("timeout"), coalesce=False
+                    )
+                try:
+                    packet = await future
+                except asyncio.TimeoutError:
+                    result.update(status="no_response", code=None)
+                except ConnectionError as e:
+                    result.update(status="error", code=None, message=str(e))
+                else:
+                    response_cache.on_packet(ip, packet)
+                    code = packet.code
+                    result.update(status="success" if code == 0 else "error", code=code)
+            finally:
+                result["elapsed_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+                done[index].set()
+
+        # Unabhängige Befehle synchron einreihen, damit die Sendereihenfolge der Liste entspricht
+        tasks = []
+        for index, command in enumerate(commands):
+            future = None
+            if not dependencies[index]:
+                future = ws_handler.send_command(
+                    command["module_id"], command["cmd"], command.get("payload", b""),
+                    timeout=command.get("timeout"), coalesce=False
+                )
+            tasks.append(asyncio.create_task(run(index, command, future)))
+        await asyncio.gather(*tasks)
+        return results
+
+    def get_metrics(self) -> Dict[str, dict]:
+        """Verbindungs-Metriken aller Geräte"""
+        return {ip: ws_handler.connection_metrics() for ip, ws_handler in self._connections.items()}
+
+    def get_resource_counts(self) -> Dict[str, dict]:
+        """Callbacks, Abonnenten und wartende Befehle aller Geräte"""
+        return {ip: ws_handler.resource_counts() for ip, ws_handler in self._connections.items()}
+    
+    def get_trace(self, ip: str) -> Optional[PacketTrace]:
+        """Paket-Trace (Ringpuffer) einer bestehenden Verbindung"""
+        ws_handler = self._connections.get(ip)
+        return ws_handler.trace if ws_handler is not None else None
+    
+    async def get_state(self, ip: str, connect: bool = True) -> DwarfDeviceState:
+        """
+        Gerätezustand für IP (verbindet bei Bedarf)
+        Ohne Verbindung wird der zuletzt bekannte Zustand geliefert
+        """
+        if connect:
+            await self.get_connection(ip)
+        state = self._states.get(ip)
+        if state is None:
+            state = self._states[ip] = DwarfDeviceState(ip)
+        return state
+    
     async def close_connection(self, ip: str):
         """Schließe Verbindung für IP"""
-        if ip in self._connections:
-            await self._connections[ip].close()
-            del self._connections[ip]
+        if ip in self._states:
+            self._states[ip].detach()
+        response_cache.detach(ip)
+        album_index.detach(ip)
+        ws_handler = self._connections.pop(ip, None)
+        self._last_used.pop(ip, None)
+        if ws_handler is not None:
+            await ws_handler.close()
             logger.info(f"🔌 Verbindung für {ip} geschlossen")
     
     async def close_all(self):
         """Schließe alle Verbindungen"""
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+        self._health_task = None
         for ip in list(self._connections.keys()):
             await self.close_connection(ip)
         logger.info("🔌 Alle Verbindungen geschlossen")
+    
+    async def drain(self, timeout: float):
+        """
+        Shutdown: keine neuen Verbindungen mehr, laufende Befehle bis
+        timeout Sekunden abwarten, dann alle Verbindungen schließen
+        """
+        self._draining = True
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline and any(
+                ws_handler.in_flight or ws_handler.sending_queue
+                for ws_handler in self._connections.values()
+                if ws_handler.is_connected()
+            ):
+                await asyncio.sleep(0.05)
+            await self.close_all()
+        finally:
+            self._draining = False
 
 
 # Globale Instanz
@@ -6,12 +6,20 @@ Basierend auf: https://github.com/stevejcl/dwarfii_api
 """
 import asyncio
 import logging
-from typing import Optional, Dict, Any, Callable
+import random
+import time
+from typing import Optional, Dict, Any, Callable, Tuple
 from collections import deque
+from contextlib import contextmanager
 import websockets
 
-from ..services.proto import base_pb2
+from ..config import settings
 from ..utils.constants import *
+from .dwarfii_packet import DwarfPacket
+from .dwarfii_codec import encode_packet, unpack_packet
+from .dwarfii_events import NotificationBus
+from .dwarfii_metrics import LatencyWindow
+from .dwarfii_trace import PacketTrace
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +64,88 @@ IR_PASS = 1
 # WebSocket Handler (aus websocket_class.js)
 # ============================================================================
 
+def _copy_future_result(source: asyncio.Future, target: asyncio.Future):
+    """Ergebnis eines Futures auf ein anderes übertragen"""
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class OutgoingPacket:
+    """
+    Eintrag in der Sende-Queue: serialisiertes WsPacket plus Header-Infos
+    future ist gesetzt, wenn der Befehl über send_command() auf Antwort wartet
+    """
+
+    __slots__ = ("module_id", "cmd", "data", "future", "lane", "enqueued_at", "coalesce_class")
+
+    def __init__(self, module_id: int, cmd: int, data: bytes, future: Optional[asyncio.Future] = None):
+        self.module_id = module_id
+        self.cmd = cmd
+        self.data = data
+        self.future = future
+        self.lane = SEND_LANE_DEFAULT
+        self.enqueued_at = 0.0
+        self.coalesce_class: Optional[str] = None
+
+
+class SendQueue:
+    """
+    Sende-Queue mit Prioritäts-Lanes (SEND_LANES, höchste zuerst)
+    Innerhalb einer Lane FIFO; peek()/popleft() liefern den Kopf der
+    höchsten nicht-leeren Lane
+    """
+
+    def __init__(self, lanes: Tuple[str, ...] = SEND_LANES):
+        self.lanes: Dict[str, deque] = {lane: deque() for lane in lanes}
+
+    def append(self, entry: OutgoingPacket):
+        self.lanes[entry.lane].append(entry)
+
+    def appendleft(self, entry: OutgoingPacket):
+        self.lanes[entry.lane].appendleft(entry)
+
+    def extendleft(self, entries):
+        """Einträge in ihrer Reihenfolge vorne einreihen (je Lane)"""
+        for entry in reversed(list(entries)):
+            self.appendleft(entry)
+
+    def peek(self) -> OutgoingPacket:
+        for lane in self.lanes.values():
+            if lane:
+                return lane[0]
+        raise IndexError("peek from an empty SendQueue")
+
+    def popleft(self) -> OutgoingPacket:
+        for lane in self.lanes.values():
+            if lane:
+                return lane.popleft()
+        raise IndexError("pop from an empty SendQueue")
+
+    def filter(self, keep: Callable[[OutgoingPacket], bool]):
+        """Nur Einträge behalten, für die keep(entry) True liefert"""
+        for name, lane in self.lanes.items():
+            self.lanes[name] = deque(entry for entry in lane if keep(entry))
+
+    def lengths(self) -> Dict[str, int]:
+        return {name: len(lane) for name, lane in self.lanes.items()}
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def __bool__(self) -> bool:
+        return any(self.lanes.values())
+
+    def __iter__(self):
+        for lane in self.lanes.values():
+            yield from lane
+
+
 class WebSocketHandler:
     """
     WebSocket Handler für DWARF II
@@ -87,6 +177,9 @@ class WebSocketHandler:
         self.is_callback_connect_states = False
         self.packet_callback_connect_states = {}
         self.callback_reconnect_function = None
+
+        # Pub/Sub: Abonnenten mit eigener, begrenzter Queue (siehe dwarfii_events)
+        self.events = NotificationBus()
         
         # Timers
         self.close_socket_timer = None
@@ -102,19 +195,81 @@ class WebSocketHandler:
         self.is_buffered = False
         
         # Queue
-        self.sending_queue = deque()
+        self.sending_queue = SendQueue()
+        self._send_wakeup = asyncio.Event()
+        self._send_task = None
+        self._receive_task = None
+        self._heartbeat_task = None
+
+        # Request/Response-Korrelation: (module_id, cmd) -> wartende Futures (FIFO)
+        self.pending_commands: Dict[Tuple[int, int], deque] = {}
+        self.default_command_timeout = 10.0
+
+        # Pipelining: max. Anzahl gesendeter, noch unbeantworteter Befehle
+        # (1 = strikt seriell). Befehle in serial_commands laufen immer allein.
+        self.max_in_flight = PIPELINE_DEPTH_DEFAULT
+        self.serial_commands = set(PIPELINE_SERIAL_COMMANDS)
+        self.in_flight: Dict[asyncio.Future, OutgoingPacket] = {}
+        self.serial_in_flight = None
+
+        # Coalescing: (module_id, cmd) -> Klasse; pro Schlüssel höchstens ein
+        # ungesendeter Eintrag, neue Werte ersetzen dessen Daten (latest wins)
+        self.coalesce_commands: Dict[Tuple[int, int], str] = {
+            key: name for name, keys in COALESCE_CLASSES.items() for key in keys
+        }
+        self.coalesce_max_rate: Dict[str, float] = dict(COALESCE_MAX_RATE)
+        self._coalesce_queued: Dict[Tuple[int, int], OutgoingPacket] = {}
+        self._coalesce_last_sent: Dict[str, float] = {}
+        self.coalesce_stats: Dict[str, int] = {name: 0 for name in COALESCE_CLASSES}
+
+        # Pacing: Pause nach dem Senden pro (module_id, cmd)
+        # Das JS-Original wartet fest 100 ms nach jedem Paket - hier optional
+        self.default_send_pacing = SEND_PACING_DEFAULT
+        self.send_pacing: Dict[Tuple[int, int], float] = dict(SEND_PACING)
+        self._pace_until = 0.0
+
+        # Lanes: (module_id, cmd) -> Lane, Wartezeit in der Queue pro Lane
+        self.command_lanes: Dict[Tuple[int, int], str] = dict(SEND_LANE_COMMANDS)
+        self.lane_wait: Dict[str, LatencyWindow] = {lane: LatencyWindow() for lane in SEND_LANES}
         
-        # Ping/Pong
+        # Ping/Pong: Heartbeat mit Text "ping"; nach nb_ping_error_default
+        # verfehlten Pings in Folge (ohne sonstigen Empfang) gilt die Verbindung als tot.
+        # Defaults aus settings.dwarf_heartbeat_* (eine Quelle für Pool und Einzel-Handler)
         self.is_pong_received = False
         self.is_ping_stopped = True
         self.signal_ping_stop = False
-        self.ping_interval = 10
+        self.ping_interval = settings.dwarf_heartbeat_interval
+        self.ping_timeout = settings.dwarf_heartbeat_timeout
+        self._pong_event = asyncio.Event()
+        self.last_receive_time = 0.0
+        self.rtt = LatencyWindow()
+        # Letzte Paket-Header (Ringpuffer) und gesampeltes Paket-Logging
+        self.trace = PacketTrace()
+        self.heartbeat_stats = {"pings": 0, "pongs": 0, "misses": 0, "dead_links": 0}
         
-        # Reconnect
+        # Reconnect: mit keep_connection=True startet nach einem Abbruch ein
+        # Reconnect-Loop (Backoff mit Jitter); nb_reconnect_default=0: unbegrenzt
         self.nb_reconnect_default = 3
         self.nb_reconnect = 3
-        self.nb_ping_error_default = 10
-        self.nb_ping_error = 10
+        self.reconnect_delay_min = RECONNECT_DELAY_MIN
+        self.reconnect_delay_max = RECONNECT_DELAY_MAX
+        self.replay_policy = dict(REPLAY_POLICY)
+        self.connected_event = asyncio.Event()
+        self._reconnect_task = None
+        self._outage_start = None
+        self.reconnect_stats = {
+            "outages": 0,
+            "reconnects": 0,
+            "attempts": 0,
+            "gave_up": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "last_reconnect_time": None,
+            "max_reconnect_time": 0.0,
+            "total_outage_time": 0.0,
+        }
+        self.nb_ping_error_default = settings.dwarf_heartbeat_misses
+        self.nb_ping_error = self.nb_ping_error_default
         
         # Protocol
         self.major_version = 2
@@ -165,6 +320,11 @@ class WebSocketHandler:
     def is_connected(self) -> bool:
         """Check if connected"""
         return self.is_opened and self.socket is not None
+
+    @property
+    def is_reconnecting(self) -> bool:
+        """Läuft gerade ein Reconnect-Loop?"""
+        return self._reconnect_task is not None and not self._reconnect_task.done()
     
     async def open(self):
         """
@@ -207,10 +367,14 @@ class WebSocketHandler:
             else:
                 logger.debug(f"websocket_class: open... on IP: {self.ip_dwarf} using proxy: {self.proxy_url}")
             
-            # Start tasks
+            # Start tasks (Vollduplex: Senden und Empfangen unabhängig)
             self.is_running = True
-            asyncio.create_task(self._receive_loop())
-            asyncio.create_task(self._send_loop())
+            self.is_stopping = False
+            self._receive_task = asyncio.create_task(self._receive_loop())
+            self._send_task = asyncio.create_task(self._send_loop())
+            if self.ping_interval and self.ping_interval > 0:
+                self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            self.connected_event.set()
             
             # Callback
             if self.is_callback_connect_states:
@@ -229,8 +393,20 @@ class WebSocketHandler:
         """Close WebSocket connection"""
         logger.info("Closing WebSocket")
         
+        self.keep_connection = False
         self.is_running = False
         self.is_stopping = True
+        self.connected_event.clear()
+        self._send_wakeup.set()
+        
+        current = asyncio.current_task()
+        for task in (self._send_task, self._receive_task, self._heartbeat_task, self._reconnect_task):
+            if task and task is not current and not task.done():
+                task.cancel()
+        self._send_task = None
+        self._receive_task = None
+        self._heartbeat_task = None
+        self._reconnect_task = None
         
         if self.socket:
             await self.socket.close()
@@ -247,34 +423,32 @@ class WebSocketHandler:
     async def _receive_loop(self):
         """
         Receive loop
-        1:1 Port der onmessage Handler
+        1:1 Port der onmessage Handler - wartet blockierend auf das nächste Paket,
+        unabhängig vom Send-Loop (kein Polling)
         """
         logger.info("📡 Receive loop started")
         
-        while self.is_running and self.socket:
+        socket = self.socket
+        while self.is_running and socket is self.socket:
             try:
-                # Wait while sending or buffered
-                while self.is_sending or self.is_buffered:
-                    await asyncio.sleep(0.01)
-                
-                logger.debug("websocket_class: onmessage function starting...")
+                data = await socket.recv()
                 
                 self.is_receiving = True
-                
-                # Receive message
-                data = await self.socket.recv()
+                self.last_receive_time = time.monotonic()
                 
                 if isinstance(data, bytes):
                     await self._handle_message(data)
                 elif isinstance(data, str) and data == "pong":
                     logger.debug("Pong received")
                     self.is_pong_received = True
+                    self._pong_event.set()
                 
                 self.is_receiving = False
                 
-                logger.debug("websocket_class: onmessage function ending...")
-                
             except websockets.exceptions.ConnectionClosed as exc:
+                if self.is_stopping or socket is not self.socket:
+                    # close() oder Heartbeat hat die Verbindung bereits abgebaut
+                    break
                 logger.warning(
                     "WebSocket connection closed (code=%s, reason=%s)",
                     getattr(exc, "code", "?"),
@@ -285,61 +459,206 @@ class WebSocketHandler:
                     getattr(exc, "reason", None)
                 )
                 break
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in receive loop: {e}")
                 break
         
-        self.is_running = False
+        self.is_receiving = False
         logger.info("📡 Receive loop ended")
 
     async def _send_loop(self):
         """
         Send loop
-        1:1 Port der send() Funktion
+        Wartet auf neue Pakete statt zu pollen. Bedient die Lanes nach Priorität;
+        Befehle der Emergency-Lane ignorieren Pacing, Rate-Limit und Pipeline-Fenster
         """
-        await asyncio.sleep(0.25)  # Initial delay wie in JS
-        
-        while not self.is_running:
-            await asyncio.sleep(0.01)
-        
         logger.debug("websocket_class: send function...")
         
         self.is_sending = False
         
-        while not self.is_stopping:
-            await asyncio.sleep(0.01)
+        while self.is_running:
+            if not self.sending_queue or not self.is_connected():
+                self._send_wakeup.clear()
+                await self._send_wakeup.wait()
+                continue
             
-            if (not self.is_buffered and 
-                not self.is_sending and 
-                len(self.sending_queue) > 0 and 
-                self.is_connected()):
-                
-                logger.debug("websocket_class: send function starting...")
-                self.is_sending = True
-                
-                self.ws_packet = self.sending_queue.popleft()
-                
-                # Send command
-                if self.ws_packet:
+            entry = self.sending_queue.peek()
+            key = (entry.module_id, entry.cmd)
+            if entry.future is not None and entry.future.done():
+                # Timeout/Abbruch noch vor dem Senden - verwerfen
+                self.sending_queue.popleft()
+                self._coalesce_forget(entry)
+                continue
+            
+            coalesce_class = entry.coalesce_class
+            if entry.lane != SEND_LANE_EMERGENCY:
+                remaining = self._send_delay(coalesce_class)
+                if remaining > 0:
+                    # Pacing/Rate-Limit: bis dahin neue Werte in denselben Eintrag
+                    # übernehmen; ein Stopp weckt den Loop sofort
+                    self._send_wakeup.clear()
                     try:
-                        await self.socket.send(self.ws_packet)
-                        logger.info(f"websocket_class: sending buffer = {len(self.ws_packet)} bytes")
-                        await asyncio.sleep(0.1)  # Delay wie in JS
-                    except websockets.exceptions.ConnectionClosed as exc:
-                        logger.error(
-                            "Send failed - connection closed (code=%s, reason=%s)",
-                            getattr(exc, "code", "?"),
-                            getattr(exc, "reason", "?")
-                        )
-                        await self._handle_connection_closed(
-                            getattr(exc, "code", None),
-                            getattr(exc, "reason", None)
-                        )
-                        break
-                else:
-                    logger.error(f"websocket_class: sending buffer empty")
+                        await asyncio.wait_for(self._send_wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
+                if entry.future is not None and not self._window_open(entry):
+                    # Warten bis eine Antwort das Fenster wieder freigibt
+                    self._send_wakeup.clear()
+                    await self._send_wakeup.wait()
+                    continue
+            
+            self.sending_queue.popleft()
+            # Ab jetzt nicht mehr ersetzbar (Senden läuft)
+            self._coalesce_forget(entry)
+            now = time.monotonic()
+            if coalesce_class is not None:
+                self._coalesce_last_sent[coalesce_class] = now
+            self.lane_wait[entry.lane].add(now - entry.enqueued_at)
+            self.ws_packet = entry.data
+            self.is_sending = True
+            
+            try:
+                await self.socket.send(entry.data)
+                self.trace.record(TRACE_TX, entry.module_id, entry.cmd, MESSAGE_TYPE_REQUEST, len(entry.data))
+            except websockets.exceptions.ConnectionClosed as exc:
+                # Paket nicht verlieren - bleibt vorne in der Queue
+                self.sending_queue.appendleft(entry)
                 self.is_sending = False
+                logger.error(
+                    "Send failed - connection closed (code=%s, reason=%s)",
+                    getattr(exc, "code", "?"),
+                    getattr(exc, "reason", "?")
+                )
+                await self._handle_connection_closed(
+                    getattr(exc, "code", None),
+                    getattr(exc, "reason", None)
+                )
+                break
+            
+            self.is_sending = False
+            
+            if entry.future is not None and not entry.future.done():
+                self.in_flight[entry.future] = entry
+                if key in self.serial_commands:
+                    self.serial_in_flight = entry.future
+            
+            delay = self.send_pacing.get(key, self.default_send_pacing)
+            self._pace_until = time.monotonic() + delay if delay > 0 else 0.0
+
+    def _send_delay(self, coalesce_class: Optional[str]) -> float:
+        """Sekunden bis der nächste (nicht-Emergency) Befehl gesendet werden darf"""
+        remaining = self._pace_until - time.monotonic() if self._pace_until else 0.0
+        if coalesce_class is not None:
+            remaining = max(remaining, self._coalesce_wait(coalesce_class))
+        return remaining
+
+    async def _heartbeat_loop(self):
+        """
+        Heartbeat: alle ping_interval Sekunden "ping" senden und RTT messen
+        Nach einem verfehlten Ping wird sofort erneut gepingt, damit eine tote
+        Verbindung nach nb_ping_error_default * ping_timeout erkannt wird
+        """
+        logger.debug("💓 Heartbeat started")
+        self.is_ping_stopped = False
+        self.nb_ping_error = self.nb_ping_error_default
+        socket = self.socket
+
+        try:
+            while self.is_running and socket is self.socket:
+                self._pong_event.clear()
+                self.is_pong_received = False
+                sent_at = time.monotonic()
+                self.heartbeat_stats["pings"] += 1
+
+                try:
+                    await socket.send("ping")
+                    await asyncio.wait_for(self._pong_event.wait(), self.ping_timeout)
+                except asyncio.TimeoutError:
+                    if self.last_receive_time > sent_at:
+                        # Gerät antwortet (nur kein Pong) - Verbindung lebt
+                        self.nb_ping_error = self.nb_ping_error_default
+                        await asyncio.sleep(self.ping_interval)
+                        continue
+
+                    self.heartbeat_stats["misses"] += 1
+                    self.nb_ping_error -= 1
+                    logger.warning(f"💔 Ping ohne Antwort von {self.ip_dwarf} ({self.nb_ping_error} verbleibend)")
+                    if self.nb_ping_error <= 0:
+                        self.heartbeat_stats["dead_links"] += 1
+                        logger.error(f"💀 Verbindung zu {self.ip_dwarf} tot (Heartbeat)")
+                        self._abort_socket()
+                        await self._handle_connection_closed(None, "heartbeat timeout")
+                        break
+                    continue
+                except websockets.exceptions.ConnectionClosed:
+                    # Receive-/Send-Loop behandelt den Abbruch
+                    break
+
+                self.rtt.add(time.monotonic() - sent_at)
+                self.heartbeat_stats["pongs"] += 1
+                self.nb_ping_error = self.nb_ping_error_default
+                await asyncio.sleep(self.ping_interval)
+        finally:
+            self.is_ping_stopped = True
+            logger.debug("💓 Heartbeat ended")
+
+    def _abort_socket(self):
+        """Tote Verbindung sofort abbauen (ohne Close-Handshake, der erst nach Timeout endet)"""
+        transport = getattr(self.socket, "transport", None)
+        if transport is not None:
+            transport.abort()
+
+    def _coalesce_wait(self, coalesce_class: str) -> float:
+        """Sekunden bis die Klasse wieder senden darf (max. Senderate)"""
+        rate = self.coalesce_max_rate.get(coalesce_class, 0.0)
+        last_sent = self._coalesce_last_sent.get(coalesce_class)
+        if not rate or last_sent is None:
+            return 0.0
+        return last_sent + 1.0 / rate - time.monotonic()
+
+    def _coalesce_forget(self, entry: OutgoingPacket):
+        """Eintrag verlässt die Queue: nicht mehr als Ersetzungsziel führen"""
+        key = (entry.module_id, entry.cmd)
+        if self._coalesce_queued.get(key) is entry:
+            del self._coalesce_queued[key]
+
+    def _supersede(self, queued: OutgoingPacket, entry: OutgoingPacket):
+        """
+        Ungesendeten Eintrag durch neueren Wert ersetzen (Position bleibt)
+        Der Aufrufer des ersetzten Befehls bekommt dasselbe Ergebnis wie der neue
+        """
+        old_future = queued.future
+        queued.data = entry.data
+        if entry.future is not None:
+            queued.future = entry.future
+            if old_future is not None and not old_future.done():
+                # Nur noch das neue Future wartet auf die Antwort (FIFO-Zuordnung)
+                self._forget_command((queued.module_id, queued.cmd), old_future)
+                entry.future.add_done_callback(lambda done: _copy_future_result(done, old_future))
+        self.coalesce_stats[queued.coalesce_class] += 1
+
+    def set_coalesce_rate(self, coalesce_class: str, rate: float):
+        """Max. Senderate (Befehle/s) einer Coalescing-Klasse, 0 = unbegrenzt"""
+        self.coalesce_max_rate[coalesce_class] = rate
+
+    def _window_open(self, entry: OutgoingPacket) -> bool:
+        """Darf der nächste wartende Befehl jetzt gesendet werden?"""
+        if self.serial_in_flight is not None:
+            return False
+        if (entry.module_id, entry.cmd) in self.serial_commands:
+            return not self.in_flight
+        return len(self.in_flight) < self.max_in_flight
+
+    def _release_in_flight(self, future: asyncio.Future):
+        """Antwort/Timeout: Platz im Pipeline-Fenster freigeben"""
+        if self.in_flight.pop(future, None) is not None:
+            if self.serial_in_flight is future:
+                self.serial_in_flight = None
+            self._send_wakeup.set()
 
     async def _handle_connection_closed(self, code=None, reason=None):
         """Reset state when socket is closed"""
@@ -351,6 +670,9 @@ class WebSocketHandler:
         self.is_sending = False
         self.is_receiving = False
         self.is_stopping = False
+        self.connected_event.clear()
+        self._requeue_in_flight()
+        self._send_wakeup.set()
         if self.socket:
             try:
                 await self.socket.close()
@@ -360,6 +682,9 @@ class WebSocketHandler:
         # Queue bleiben, aber nicht senden solange keine Verbindung besteht
         logger.debug("Connection marked as closed")
 
+        if self.keep_connection and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
         if self.is_callback_errors:
             for callback in self.packet_callback_errors.values():
                 try:
@@ -367,40 +692,162 @@ class WebSocketHandler:
                 except Exception as exc:
                     logger.error(f"Error callback failed: {exc}")
 
+    def _get_replay_policy(self, entry: OutgoingPacket) -> str:
+        return self.replay_policy.get((entry.module_id, entry.cmd), REPLAY_POLICY_DEFAULT)
+
+    def _drop_entry(self, entry: OutgoingPacket, reason: str):
+        """Befehl verwerfen; wartender send_command()-Aufruf bekommt ConnectionError"""
+        self.reconnect_stats["dropped"] += 1
+        if entry.future is not None and not entry.future.done():
+            entry.future.set_exception(ConnectionError(
+                f"Module={entry.module_id}, CMD={entry.cmd} {reason}"
+            ))
+
+    def _requeue_in_flight(self):
+        """
+        Verbindungsabbruch: gesendete, unbeantwortete Befehle
+        REPLAY_ALWAYS kommt wieder vorne in die Queue (alte Reihenfolge),
+        alles andere endet mit ConnectionError (Antwort ging verloren)
+        """
+        entries = list(self.in_flight.values())
+        self.in_flight.clear()
+        self.serial_in_flight = None
+
+        replay = []
+        for entry in entries:
+            if self.keep_connection and self._get_replay_policy(entry) == REPLAY_ALWAYS:
+                replay.append(entry)
+            else:
+                self._drop_entry(entry, "ohne Antwort - Verbindung unterbrochen")
+        self.sending_queue.extendleft(replay)
+
+    def _apply_replay_policy(self):
+        """Nach dem Reconnect: REPLAY_DROP-Befehle aus der Queue entfernen"""
+        def keep(entry: OutgoingPacket) -> bool:
+            if entry.future is not None and entry.future.done():
+                self._coalesce_forget(entry)
+                return False
+            if self._get_replay_policy(entry) == REPLAY_DROP:
+                self._coalesce_forget(entry)
+                self._drop_entry(entry, "verworfen - während Verbindungsabbruch eingereiht")
+                return False
+            return True
+
+        self.sending_queue.filter(keep)
+        self.reconnect_stats["replayed"] += len(self.sending_queue)
+
+    def _fail_queue(self, reason: str):
+        """Alle wartenden Befehle mit ConnectionError beenden"""
+        while self.sending_queue:
+            self._drop_entry(self.sending_queue.popleft(), reason)
+        self._coalesce_queued.clear()
+
+    def _reconnect_delay(self, attempt: int) -> float:
+        """Exponentieller Backoff mit Jitter (halbe Basis + Zufall)"""
+        delay = min(self.reconnect_delay_max, self.reconnect_delay_min * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _reconnect_loop(self):
+        """
+        Reconnect nach Verbindungsabbruch
+        Versucht bis zu nb_reconnect_default mal (0: unbegrenzt) neu zu verbinden
+        """
+        self._outage_start = time.monotonic()
+        self.reconnect_stats["outages"] += 1
+        self.nb_reconnect = self.nb_reconnect_default
+        attempt = 0
+
+        logger.warning(f"🔄 Verbindung zu {self.ip_dwarf} verloren - Reconnect")
+
+        try:
+            while self.keep_connection and not self.is_connected():
+                await asyncio.sleep(self._reconnect_delay(attempt))
+                if not self.keep_connection:
+                    break
+
+                attempt += 1
+                self.reconnect_stats["attempts"] += 1
+                await self.open()
+
+                if self.is_connected():
+                    # open() hat die Loops nur angelegt - sie laufen erst nach
+                    # dem nächsten await, die Queue wird also vorher gefiltert
+                    self._apply_replay_policy()
+
+                    outage = time.monotonic() - self._outage_start
+                    self.reconnect_stats["reconnects"] += 1
+                    self.reconnect_stats["last_reconnect_time"] = outage
+                    self.reconnect_stats["max_reconnect_time"] = max(self.reconnect_stats["max_reconnect_time"], outage)
+                    self.reconnect_stats["total_outage_time"] += outage
+                    logger.info(f"✅ Reconnect zu {self.ip_dwarf} nach {outage:.2f}s ({attempt} Versuche)")
+
+                    if self.callback_reconnect_function:
+                        try:
+                            self.callback_reconnect_function()
+                        except Exception as e:
+                            logger.error(f"Reconnect callback failed: {e}")
+                    break
+
+                if self.nb_reconnect_default:
+                    self.nb_reconnect -= 1
+                    if self.nb_reconnect <= 0:
+                        self.reconnect_stats["gave_up"] += 1
+                        self.reconnect_stats["total_outage_time"] += time.monotonic() - self._outage_start
+                        logger.error(f"❌ Reconnect zu {self.ip_dwarf} nach {attempt} Versuchen aufgegeben")
+                        self.keep_connection = False
+                        self._fail_queue("verworfen - Reconnect aufgegeben")
+                        break
+        finally:
+            self._outage_start = None
+
+    def connection_metrics(self) -> Dict[str, Any]:
+        """Verbindungs-Metriken (Ausfälle, Reconnect-Zeiten, Queue)"""
+        return {
+            "connected": self.is_connected(),
+            "reconnecting": self._outage_start is not None,
+            "current_outage": (time.monotonic() - self._outage_start) if self._outage_start is not None else None,
+            "queued": len(self.sending_queue),
+            "lanes": {
+                lane: {"queued": queued, "wait": self.lane_wait[lane].summary()}
+                for lane, queued in self.sending_queue.lengths().items()
+            },
+            "in_flight": len(self.in_flight),
+            **self.reconnect_stats,
+            "coalesced": dict(self.coalesce_stats),
+            "heartbeat": dict(self.heartbeat_stats),
+            "rtt": self.rtt.summary(),
+        }
+
+    async def wait_connected(self, timeout: float) -> bool:
+        """Auf (Re-)Connect warten; True wenn verbunden"""
+        if self.is_connected():
+            return True
+        try:
+            await asyncio.wait_for(self.connected_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.is_connected()
+
     async def _handle_message(self, data: bytes):
         """
         Handle received message
         1:1 Port der handleMessage Funktion
         """
         try:
-            # Parse WsPacket
-            packet = base_pb2.WsPacket()
-            packet.ParseFromString(data)
+            # Rahmen zerlegen; data wird erst bei Bedarf dekodiert (DwarfPacket.message)
+            result_data = DwarfPacket(*unpack_packet(data))
+            self.trace.record(TRACE_RX, result_data.module_id, result_data.cmd, result_data.type, len(data))
             
-            logger.info(
-                f"📦 Packet received: Module={packet.module_id}, "
-                f"CMD={packet.cmd}, Type={packet.type}"
-            )
+            # Wartenden send_command()-Aufruf auflösen (ein Dict-Lookup pro Paket)
+            if not result_data.is_notification:
+                waiters = self.pending_commands.get((result_data.module_id, result_data.cmd))
+                if waiters:
+                    future = waiters.popleft()
+                    if not future.done():
+                        future.set_result(result_data)
             
-            # Analyze packet (würde normalerweise analyzePacket aufrufen)
-            result_data = {
-                "module_id": packet.module_id,
-                "cmd": packet.cmd,
-                "type": packet.type,
-                "data": packet.data
-            }
-            
-            # Parse ComResponse für alle Types (nicht nur Type=1)
-            try:
-                com_response = base_pb2.ComResponse()
-                com_response.ParseFromString(packet.data)
-                result_data["code"] = com_response.code
-                logger.debug(f"ComResponse parsed: code={com_response.code}")
-            except Exception as e:
-                logger.debug(f"Could not parse as ComResponse: {e}")
-            
-            # Log result
-            logger.info(f"📨 Result: Module={result_data['module_id']}, CMD={result_data['cmd']}, Type={result_data['type']}, Code={result_data.get('code', 'N/A')}")
+            # An Abonnenten verteilen (nicht blockierend)
+            self.events.publish(result_data)
             
             # Callback für ALLE Nachrichten (nicht nur Type=1)
             if self.is_callback_messages:
@@ -414,8 +861,109 @@ class WebSocketHandler:
         """
         Add packet to sending queue
         """
-        self.sending_queue.append(packet_data)
-        logger.debug(f"Packet added to queue. Queue length: {len(self.sending_queue)}")
+        module_id, cmd, _, _ = unpack_packet(packet_data)
+        self._enqueue(OutgoingPacket(module_id, cmd, packet_data))
+    
+    def _enqueue(self, entry: OutgoingPacket, coalesce: bool = True):
+        """
+        Eintrag in seine Lane der Sende-Queue hängen und Send-Loop wecken
+        coalesce=False: weder ersetzen noch ersetzt werden, kein Rate-Limit
+        """
+        key = (entry.module_id, entry.cmd)
+        entry.lane = self.command_lanes.get(key, SEND_LANE_DEFAULT)
+        entry.enqueued_at = time.monotonic()
+        entry.coalesce_class = self.coalesce_commands.get(key) if coalesce else None
+        if entry.coalesce_class is not None:
+            queued = self._coalesce_queued.get(key)
+            if queued is not None:
+                self._supersede(queued, entry)
+                return
+            self._coalesce_queued[key] = entry
+        elif self._coalesce_queued:
+            # Anderer Befehl desselben Moduls (z.B. Stopp) ist eine Barriere:
+            # spätere Werte dürfen nicht an ihm vorbei nach vorne rutschen
+            for queued_key in [k for k in self._coalesce_queued if k[0] == entry.module_id]:
+                del self._coalesce_queued[queued_key]
+        self.sending_queue.append(entry)
+        self._send_wakeup.set()
+        logger.debug("Packet added to queue. Queue length: %d", len(self.sending_queue))
+    
+    def send_command(
+        self,
+        module_id: int,
+        cmd: int,
+        payload: bytes = b"",
+        timeout: Optional[float] = None,
+        coalesce: bool = True
+    ) -> asyncio.Future:
+        """
+        Befehl senden und Future für die Antwort zurückgeben
+        
+        Das Future wird mit dem DwarfPacket der passenden Antwort
+        (gleiche module_id/cmd) aufgelöst oder nach `timeout` Sekunden
+        mit asyncio.TimeoutError beendet.
+        
+        Args:
+            module_id: Modul-ID
+            cmd: Befehl
+            payload: Serialisierte Request-Message
+            timeout: Sekunden bis zum Timeout (None: default_command_timeout)
+            coalesce: False für Einzelbefehle, die weder ersetzt noch
+                gedrosselt werden sollen (z.B. Batch), auch wenn der Befehl
+                in coalesce_commands steht
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (module_id, cmd)
+        
+        waiters = self.pending_commands.get(key)
+        if waiters is None:
+            waiters = self.pending_commands[key] = deque()
+        waiters.append(future)
+        
+        if timeout is None:
+            timeout = self.default_command_timeout
+        timer = loop.call_later(timeout, self._expire_command, future, module_id, cmd, timeout)
+        
+        def on_done(done_future):
+            timer.cancel()
+            self._forget_command(key, done_future)
+            self._release_in_flight(done_future)
+        
+        future.add_done_callback(on_done)
+        
+        packet = self.create_packet(module_id, cmd, payload)
+        self._enqueue(OutgoingPacket(module_id, cmd, packet, future), coalesce)
+        return future
+    
+    def _expire_command(self, future: asyncio.Future, module_id: int, cmd: int, timeout: float):
+        """Timeout für einen wartenden Befehl"""
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError(
+                f"Keine Antwort auf Module={module_id}, CMD={cmd} nach {timeout}s"
+            ))
+    
+    def _forget_command(self, key: Tuple[int, int], future: asyncio.Future):
+        """Future aus der Dispatch-Tabelle entfernen (Timeout/Abbruch)"""
+        waiters = self.pending_commands.get(key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self.pending_commands[key]
+    
+    def set_send_pacing(self, module_id: int, cmd: int, delay: Optional[float]):
+        """
+        Pause (Sekunden) nach dem Senden eines Befehls festlegen
+        delay=None entfernt den Eintrag (dann gilt default_send_pacing)
+        """
+        if delay is None:
+            self.send_pacing.pop((module_id, cmd), None)
+        else:
+            self.send_pacing[(module_id, cmd)] = delay
     
     def create_packet(
         self,
@@ -426,23 +974,19 @@ class WebSocketHandler:
         """
         Create WsPacket
         1:1 Port der createPacket Funktion
+        Header-Präfix pro (device_id, Version, Modul, Befehl) vorkodiert (dwarfii_codec)
         """
-        packet = base_pb2.WsPacket()
-        packet.major_version = self.major_version
-        packet.minor_version = self.minor_version
-        packet.device_id = self.device_id
-        packet.module_id = module_id
-        packet.cmd = cmd
-        packet.type = 0  # TYPE_REQUEST
-        packet.data = data
-        packet.client_id = self.client_id
-        
-        serialized = packet.SerializeToString()
-        
-        logger.debug(f"Packet created: Module={module_id}, CMD={cmd}")
-        logger.debug(f"Packet details: major_v={self.major_version}, minor_v={self.minor_version}, device_id={self.device_id}")
-        logger.debug(f"Packet data length: {len(data)} bytes")
-        logger.debug(f"Serialized packet: {serialized.hex()} ({len(serialized)} bytes)")
+        serialized = encode_packet(
+            self.major_version, self.minor_version, self.device_id,
+            module_id, cmd, data, self.client_id
+        )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Packet created: Module={module_id}, CMD={cmd}, "
+                f"major_v={self.major_version}, minor_v={self.minor_version}, device_id={self.device_id}, "
+                f"data={len(data)} bytes, packet={serialized.hex()} ({len(serialized)} bytes)"
+            )
         
         return serialized
     
@@ -463,7 +1007,75 @@ class WebSocketHandler:
         self.is_callback_errors = True
         self.packet_callback_errors[name] = callback
     
+    def unregister_error_callback(self, name: str):
+        """Unregister error callback"""
+        if name in self.packet_callback_errors:
+            del self.packet_callback_errors[name]
+        if len(self.packet_callback_errors) == 0:
+            self.is_callback_errors = False
+    
     def register_connect_callback(self, name: str, callback: Callable):
         """Register callback for connection state"""
         self.is_callback_connect_states = True
         self.packet_callback_connect_states[name] = callback
+    
+    def unregister_connect_callback(self, name: str):
+        """Unregister connection state callback"""
+        if name in self.packet_callback_connect_states:
+            del self.packet_callback_connect_states[name]
+        if len(self.packet_callback_connect_states) == 0:
+            self.is_callback_connect_states = False
+    
+    # ========================================================================
+    # Scoped Callbacks: auf jedem Weg aus dem Block wieder entfernt
+    # (Rückgabe, Timeout, Exception, Abbruch des Tasks)
+    # ========================================================================
+    
+    @contextmanager
+    def message_callback(self, name: str, callback: Callable):
+        """
+        Message-Callback für die Dauer eines with-Blocks
+        
+            with ws_handler.message_callback("photo", on_message):
+                await asyncio.wait_for(done.wait(), 5.0)
+        """
+        self.register_message_callback(name, callback)
+        try:
+            yield callback
+        finally:
+            if self.packet_callback_messages.get(name) is callback:
+                self.unregister_message_callback(name)
+    
+    @contextmanager
+    def error_callback(self, name: str, callback: Callable):
+        """Error-Callback für die Dauer eines with-Blocks"""
+        self.register_error_callback(name, callback)
+        try:
+            yield callback
+        finally:
+            if self.packet_callback_errors.get(name) is callback:
+                self.unregister_error_callback(name)
+    
+    @contextmanager
+    def connect_callback(self, name: str, callback: Callable):
+        """Verbindungsstatus-Callback für die Dauer eines with-Blocks"""
+        self.register_connect_callback(name, callback)
+        try:
+            yield callback
+        finally:
+            if self.packet_callback_connect_states.get(name) is callback:
+                self.unregister_connect_callback(name)
+    
+    def resource_counts(self) -> Dict[str, Any]:
+        """Lebende Callbacks, Abonnenten und wartende Befehle (Leck-Diagnose)"""
+        return {
+            "message_callbacks": len(self.packet_callback_messages),
+            "error_callbacks": len(self.packet_callback_errors),
+            "connect_callbacks": len(self.packet_callback_connect_states),
+            "subscriptions": len(self.events.subscriptions),
+            "subscribers": sorted(subscription.name for subscription in self.events.subscriptions),
+            "pending_commands": sum(len(waiters) for waiters in self.pending_commands.values()),
+            "in_flight": len(self.in_flight),
+            "queued": len(self.sending_queue),
+            "coalesce_queued": len(self._coalesce_queued),
+        }
@@ -0,0 +1,246 @@
+"""
+DWARF II Response Cache
+Antworten auf Lesebefehle (Kamera-Parameter, Darkframe-Liste, HTTP-Konfiguration,
+Firmware-Version) ändern sich selten. Sie werden pro Gerät zwischengespeichert:
+Schlüssel (ip, module_id, cmd, Payload-Hash), Gültigkeit aus CACHE_TTL.
+Passende Notifications und Antworten auf eigene Set-Befehle (CACHE_INVALIDATED_BY)
+verwerfen Einträge sofort, ein Reconnect verwirft alle Einträge des Geräts.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from ..services.dwarf_client import http_clients
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+
+def _payload_hash(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+
+def _cacheable(value: Any) -> bool:
+    """Nur erfolgreiche Antworten (DwarfPacket bzw. HTTP-JSON mit code 0)"""
+    if value is None:
+        return False
+    if isinstance(value, dict):
+        return value.get("code", 0) == 0
+    return getattr(value, "code", 0) == 0
+
+
+def _label(module_id, cmd) -> str:
+    return f"{module_id}/{cmd}"
+
+
+class ResponseCache:
+    """
+    TTL-Cache für Geräteantworten mit Invalidierung über den Event-Bus
+
+    - get_or_fetch(): Treffer aus dem Cache, sonst genau eine Abfrage am
+      Gerät (gleichzeitige Fehlgriffe teilen sich die Abfrage)
+    - Gespeichert werden nur erfolgreiche Antworten (code 0 bzw. HTTP-Antwort)
+    - attach()/detach(): Invalidierung an eine Geräteverbindung hängen
+    """
+
+    def __init__(self):
+        # (ip, module_id, cmd, hash) -> (gültig bis, Wert)
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._fetching: Dict[Tuple, asyncio.Future] = {}
+        self._subscriptions: Dict[str, Any] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._handlers: Dict[str, Any] = {}
+        # ip -> Zähler der Invalidierungen (Antworten aus der Zeit davor nicht speichern)
+        self._generation: Dict[str, int] = {}
+        # "module/cmd" -> Zähler
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, module_id, cmd, name: str, amount: int = 1):
+        counter = self.counters.setdefault(
+            _label(module_id, cmd), {"hits": 0, "misses": 0, "joined": 0, "fresh": 0, "invalidations": 0}
+        )
+        counter[name] += amount
+
+    # ========================================================================
+    # Abfragen
+    # ========================================================================
+
+    async def get_or_fetch(
+        self,
+        ip: str,
+        module_id,
+        cmd,
+        payload: bytes,
+        fetch: Callable[[], Awaitable[Any]],
+        fresh: bool = False
+    ) -> Tuple[Any, bool]:
+        """
+        Antwort aus dem Cache oder über fetch() holen
+
+        Args:
+            fetch: Abfrage am Gerät (Rückgabe None = keine Antwort)
+            fresh: Cache umgehen und Eintrag erneuern
+
+        Returns:
+            (Wert, aus dem Cache?)
+        """
+        ttl = CACHE_TTL.get((module_id, cmd))
+        if not ttl:
+            return await fetch(), False
+
+        key = (ip, module_id, cmd, _payload_hash(payload))
+        if not fresh:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._count(module_id, cmd, "hits")
+                    return entry[1], True
+                del self._entries[key]
+
+            pending = self._fetching.get(key)
+            if pending is not None:
+                self._count(module_id, cmd, "joined")
+                return await asyncio.shield(pending), False
+
+        self._count(module_id, cmd, "fresh" if fresh else "misses")
+        generation = self._generation.get(ip, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._fetching[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            # Abbruch gilt nur dem Aufrufer - Mitwartende bekommen keine Antwort
+            if not future.done():
+                future.set_result(None)
+            raise
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # nicht abgeholte Exception nicht loggen
+            raise
+        finally:
+            if self._fetching.get(key) is future:
+                del self._fetching[key]
+
+        if _cacheable(value) and self._generation.get(ip, 0) == generation:
+            self._entries[key] = (time.monotonic() + ttl, value)
+        future.set_result(value)
+        return value, False
+
+    async def get_http(self, ip: str, path: str, fetch: Callable[[Any], Awaitable[Any]], fresh: bool = False) -> Any:
+        """
+        HTTP-Abfrage (Port 8082) über den Cache
+
+        Args:
+            path: Schlüssel wie in CACHE_TTL unter CACHE_MODULE_HTTP
+            fetch: Abfrage mit dem HTTP-Client des Geräts, z.B.
+                lambda client: client.get_firmware_version()
+        """
+        async def fetch_once():
+            return await fetch(http_clients.get(ip))
+
+        value, _ = await self.get_or_fetch(ip, CACHE_MODULE_HTTP, path, b"", fetch_once, fresh=fresh)
+        return value
+
+    # ========================================================================
+    # Invalidierung
+    # ========================================================================
+
+    def invalidate(self, ip: str, module_id=None, cmd=None) -> int:
+        """
+        Einträge eines Geräts verwerfen (optional nur ein Befehl)
+
+        Returns:
+            Anzahl verworfener Einträge
+        """
+        self._generation[ip] = self._generation.get(ip, 0) + 1
+        keys = [
+            key for key in self._entries
+            if key[0] == ip
+            and (module_id is None or key[1] == module_id)
+            and (cmd is None or key[2] == cmd)
+        ]
+        for key in keys:
+            del self._entries[key]
+            self._count(key[1], key[2], "invalidations")
+        return len(keys)
+
+    def on_packet(self, ip: str, packet):
+        """Notification oder Set-Antwort: betroffene Einträge verwerfen"""
+        targets = CACHE_INVALIDATED_BY.get((packet.module_id, packet.cmd))
+        if not targets:
+            return
+        for module_id, cmd in targets:
+            if self.invalidate(ip, module_id, cmd):
+                logger.debug(f"🗑️ Cache {ip} {_label(module_id, cmd)} verworfen durch {_label(packet.module_id, packet.cmd)}")
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    def attach(self, ip: str, ws_handler):
+        """Invalidierung an eine (neue) Verbindung hängen"""
+        self.detach(ip)
+        subscription = ws_handler.events.subscribe(
+            cmds={cmd for _, cmd in CACHE_INVALIDATED_BY},
+            maxsize=1024,
+            name=f"cache:{ip}"
+        )
+        self._subscriptions[ip] = subscription
+        self._tasks[ip] = asyncio.create_task(self._consume(ip, subscription))
+
+        # Während eines Ausfalls verpasste Notifications: alles verwerfen
+        def on_connect_cache(connected: bool):
+            if connected:
+                self.invalidate(ip)
+
+        ws_handler.register_connect_callback(f"cache:{ip}", on_connect_cache)
+        self._handlers[ip] = ws_handler
+
+    def detach(self, ip: str):
+        """Von der Verbindung lösen; ohne Invalidierung sind Einträge nicht mehr verlässlich"""
+        ws_handler = self._handlers.pop(ip, None)
+        if ws_handler is not None:
+            ws_handler.unregister_connect_callback(f"cache:{ip}")
+        subscription = self._subscriptions.pop(ip, None)
+        if subscription is not None:
+            subscription.close()
+        task = self._tasks.pop(ip, None)
+        if task is not None and not task.done():
+            task.cancel()
+        self.invalidate(ip)
+
+    def subscription(self, ip: str):
+        """Eigenes Bus-Abonnement (zählt nicht als externer Abonnent)"""
+        return self._subscriptions.get(ip)
+
+    async def _consume(self, ip: str, subscription):
+        async for packet in subscription:
+            self.on_packet(ip, packet)
+
+    # ========================================================================
+    # Diagnose
+    # ========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Treffer/Fehlgriffe pro Befehl und aktuelle Einträge"""
+        hits = sum(counter["hits"] for counter in self.counters.values())
+        misses = sum(counter["misses"] for counter in self.counters.values())
+        now = time.monotonic()
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "commands": self.counters,
+            "cached": [
+                {"ip": key[0], "command": _label(key[1], key[2]), "expires_in": round(expires - now, 1)}
+                for key, (expires, _) in self._entries.items()
+            ],
+        }
+
+
+# Globale Instanz
+response_cache = ResponseCache()
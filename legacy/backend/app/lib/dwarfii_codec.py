@@ -0,0 +1,218 @@
+"""
+DWARF II WsPacket Codec
+Kodiert und dekodiert den WsPacket-Rahmen (base.proto) direkt auf Byte-Ebene.
+
+Senden: Felder 1-6 (Version, Geräte-ID, Modul, Befehl, Typ) sind pro
+(device_id, Version, Modul, Befehl) konstant. Dieser Header-Präfix wird einmal
+kodiert und gecacht; pro Befehl werden nur noch Payload und client_id angehängt.
+Befehle ohne Payload sind komplett vorkodiert.
+
+Empfangen: peek_packet() liest module_id/cmd/type und die Lage von data aus
+dem Rahmen, ohne base_pb2.WsPacket zu bauen. Mit der nativen Protobuf-Runtime
+(upb/cpp) ist deren C-Parser für den kleinen Rahmen aber schneller als jeder
+Python-Code; unpack_packet() nimmt daher den schnelleren Weg der aktiven
+Runtime (siehe benchmarks/bench_codec.py). Die Payload selbst wird wie bisher
+erst bei Bedarf dekodiert (DwarfPacket.message).
+
+Die Ausgabe ist byte-identisch zu base_pb2.WsPacket.SerializeToString()
+(proto3: Felder in Nummernfolge, Default-Werte weggelassen).
+"""
+from typing import Dict, Tuple
+
+from google.protobuf.internal import api_implementation
+
+from ..services.proto import base_pb2
+
+# Tags (Feldnummer << 3 | Wire-Typ) aus base.proto
+_TAG_MAJOR_VERSION = 0x08
+_TAG_MINOR_VERSION = 0x10
+_TAG_DEVICE_ID = 0x18
+_TAG_MODULE_ID = 0x20
+_TAG_CMD = 0x28
+_TAG_TYPE = 0x30
+_TAG_DATA = 0x3A
+_TAG_CLIENT_ID = 0x42
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH = 2
+_WIRE_FIXED32 = 5
+
+_HEADER_CACHE_MAX = 4096  # Einträge; in der Praxis wenige Hundert, bei Überlauf neu aufbauen
+
+# (major, minor, device_id, module_id, cmd, type) -> kodierte Felder 1-6
+_header_cache: Dict[Tuple[int, ...], bytes] = {}
+# (Header-Schlüssel, client_id) -> (Paket ohne Payload, Präfix, Suffix)
+_frame_cache: Dict[Tuple, Tuple[bytes, bytes, bytes]] = {}
+
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)]
+
+# Reine Python-Runtime: WsPacket.ParseFromString ist ~6x langsamer als peek_packet
+NATIVE_PROTOBUF = api_implementation.Type() != "python"
+
+
+def encode_varint(value: int) -> bytes:
+    """uint32/uint64 als Protobuf-Varint"""
+    if value < 0x80:
+        return _SMALL_VARINTS[value]
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _encode_header(key: Tuple[int, ...]) -> bytes:
+    header = bytearray()
+    for tag, value in zip(
+        (_TAG_MAJOR_VERSION, _TAG_MINOR_VERSION, _TAG_DEVICE_ID, _TAG_MODULE_ID, _TAG_CMD, _TAG_TYPE), key
+    ):
+        if value:
+            header.append(tag)
+            header += encode_varint(value)
+    return bytes(header)
+
+
+def _header(key: Tuple[int, ...]) -> bytes:
+    header = _header_cache.get(key)
+    if header is None:
+        header = _encode_header(key)
+        if len(_header_cache) >= _HEADER_CACHE_MAX:
+            _header_cache.clear()
+        _header_cache[key] = header
+    return header
+
+
+def _client_id_field(client_id: str) -> bytes:
+    if not client_id:
+        return b""
+    encoded = client_id.encode("utf-8")
+    return bytes((_TAG_CLIENT_ID,)) + encode_varint(len(encoded)) + encoded
+
+
+def _frame(key: Tuple[int, ...], client_id: str) -> Tuple[bytes, bytes, bytes]:
+    """(Paket ohne Payload, Präfix bis zum data-Tag, Suffix mit client_id)"""
+    frame = _frame_cache.get((key, client_id))
+    if frame is None:
+        header = _header(key)
+        suffix = _client_id_field(client_id)
+        frame = (header + suffix, header + bytes((_TAG_DATA,)), suffix)
+        if len(_frame_cache) >= _HEADER_CACHE_MAX:
+            _frame_cache.clear()
+        _frame_cache[(key, client_id)] = frame
+    return frame
+
+
+def encode_packet(
+    major_version: int,
+    minor_version: int,
+    device_id: int,
+    module_id: int,
+    cmd: int,
+    data: bytes = b"",
+    client_id: str = "",
+    msg_type: int = 0
+) -> bytes:
+    """
+    WsPacket kodieren (wie base_pb2.WsPacket(...).SerializeToString())
+
+    Args:
+        data: Serialisierte Request-Message (leer: vorkodiertes Paket)
+        msg_type: WsPacket.type (0: Request)
+    """
+    empty, prefix, suffix = _frame((major_version, minor_version, device_id, module_id, cmd, msg_type), client_id)
+    if not data:
+        return empty
+    length = len(data)
+    return prefix + (_SMALL_VARINTS[length] if length < 0x80 else encode_varint(length)) + data + suffix
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Varint zu lang")
+
+
+def peek_packet(data) -> Tuple[int, int, int, int, int]:
+    """
+    Rahmen eines empfangenen WsPacket lesen, ohne ihn komplett zu parsen
+    Arbeitet auf bytes oder memoryview, ohne zu kopieren; Tags und Werte
+    unter 128 (der Normalfall) werden ohne Varint-Schleife gelesen
+
+    Returns:
+        (module_id, cmd, type, Start, Ende) - data[Start:Ende] ist WsPacket.data
+
+    Raises:
+        ValueError: kein gültiger WsPacket-Rahmen
+    """
+    end = len(data)
+    module_id = cmd = msg_type = 0
+    data_start = data_end = 0
+    pos = 0
+    try:
+        while pos < end:
+            tag = data[pos]
+            if tag < 0x80:
+                pos += 1
+            else:
+                tag, pos = _read_varint(data, pos)
+            wire_type = tag & 0x07
+            if wire_type == _WIRE_VARINT:
+                value = data[pos]
+                if value < 0x80:
+                    pos += 1
+                else:
+                    value, pos = _read_varint(data, pos)
+                if tag == _TAG_MODULE_ID:
+                    module_id = value
+                elif tag == _TAG_CMD:
+                    cmd = value
+                elif tag == _TAG_TYPE:
+                    msg_type = value
+            elif wire_type == _WIRE_LENGTH:
+                length = data[pos]
+                if length < 0x80:
+                    pos += 1
+                else:
+                    length, pos = _read_varint(data, pos)
+                if tag == _TAG_DATA:
+                    data_start, data_end = pos, pos + length
+                pos += length
+            elif wire_type == _WIRE_FIXED64:
+                pos += 8
+            elif wire_type == _WIRE_FIXED32:
+                pos += 4
+            else:
+                raise ValueError(f"Unbekannter Wire-Typ {wire_type}")
+    except IndexError:
+        raise ValueError("WsPacket abgeschnitten") from None
+    if pos != end:
+        raise ValueError("WsPacket abgeschnitten")
+    return module_id, cmd, msg_type, data_start, data_end
+
+
+def unpack_packet(data: bytes) -> Tuple[int, int, int, bytes]:
+    """
+    Empfangenes WsPacket zerlegen (schnellster Weg der aktiven Protobuf-Runtime)
+
+    Returns:
+        (module_id, cmd, type, data)
+
+    Raises:
+        ValueError / DecodeError: kein gültiges WsPacket
+    """
+    if NATIVE_PROTOBUF:
+        packet = base_pb2.WsPacket()
+        packet.ParseFromString(data)
+        return packet.module_id, packet.cmd, packet.type, packet.data
+    module_id, cmd, msg_type, start, end = peek_packet(data)
+    return module_id, cmd, msg_type, data[start:end]
@@ -0,0 +1,207 @@
+"""
+DWARF II Notification Bus
+In-Process Pub/Sub für empfangene Pakete mit begrenzten Queues pro Abonnent
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Iterable, Set
+
+from .dwarfii_packet import DwarfPacket
+
+logger = logging.getLogger(__name__)
+
+
+# Verhalten bei voller Queue
+POLICY_DROP_OLDEST = "drop_oldest"          # ältestes Paket verwerfen
+POLICY_COALESCE_LATEST = "coalesce_latest"  # pro (module_id, cmd) nur das neueste behalten
+
+SUBSCRIPTION_MAXSIZE_DEFAULT = 256
+
+
+class Subscription:
+    """
+    Abonnement auf dem NotificationBus
+
+    publish() blockiert nie: bei voller Queue wird je nach Policy das älteste
+    Paket verworfen oder ein noch nicht abgeholtes Paket derselben
+    (module_id, cmd) durch das neue ersetzt.
+    """
+
+    def __init__(
+        self,
+        bus: "NotificationBus",
+        modules: Optional[Iterable[int]] = None,
+        cmds: Optional[Iterable[int]] = None,
+        notifications_only: bool = False,
+        maxsize: int = SUBSCRIPTION_MAXSIZE_DEFAULT,
+        policy: str = POLICY_DROP_OLDEST,
+        name: str = ""
+    ):
+        if policy not in (POLICY_DROP_OLDEST, POLICY_COALESCE_LATEST):
+            raise ValueError(f"Unbekannte Policy: {policy}")
+
+        self.bus = bus
+        self.modules: Optional[Set[int]] = set(modules) if modules is not None else None
+        self.cmds: Optional[Set[int]] = set(cmds) if cmds is not None else None
+        self.notifications_only = notifications_only
+        self.maxsize = maxsize
+        self.policy = policy
+        self.name = name
+
+        # Schlüssel: laufende Nummer (drop_oldest) bzw. (module_id, cmd) (coalesce)
+        self._queue: "OrderedDict[object, DwarfPacket]" = OrderedDict()
+        self._seq = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        # Statistik
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def matches(self, packet: DwarfPacket) -> bool:
+        """Filter nach Modul, Befehl und Typ"""
+        if self.modules is not None and packet.module_id not in self.modules:
+            return False
+        if self.cmds is not None and packet.cmd not in self.cmds:
+            return False
+        if self.notifications_only and not packet.is_notification:
+            return False
+        return True
+
+    def put(self, packet: DwarfPacket):
+        """Paket einreihen (nicht blockierend)"""
+        if self.closed:
+            return
+
+        if self.policy == POLICY_COALESCE_LATEST:
+            key: object = (packet.module_id, packet.cmd)
+            if key in self._queue:
+                self._queue[key] = packet
+                self.coalesced += 1
+                return
+        else:
+            key = self._seq
+            self._seq += 1
+
+        if len(self._queue) >= self.maxsize:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+
+        self._queue[key] = packet
+        self._ready.set()
+
+    def get_nowait(self) -> Optional[DwarfPacket]:
+        """Nächstes Paket oder None"""
+        if not self._queue:
+            return None
+        _, packet = self._queue.popitem(last=False)
+        self.delivered += 1
+        return packet
+
+    async def get(self) -> Optional[DwarfPacket]:
+        """Auf nächstes Paket warten (None nach close())"""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        return len(self._queue)
+
+    def close(self):
+        """Abonnement beenden und wartende get() aufwecken"""
+        if self.closed:
+            return
+        self.closed = True
+        self.bus.unsubscribe(self)
+        self._ready.set()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> DwarfPacket:
+        packet = await self.get()
+        if packet is None:
+            raise StopAsyncIteration
+        return packet
+
+
+class NotificationBus:
+    """
+    Verteilt empfangene Pakete an Abonnenten
+
+    Wird vom Receive-Loop synchron aufgerufen; langsame Abonnenten verlieren
+    höchstens Pakete aus ihrer eigenen Queue und bremsen den Socket nie.
+    """
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self.published = 0
+
+    def subscribe(
+        self,
+        modules: Optional[Iterable[int]] = None,
+        cmds: Optional[Iterable[int]] = None,
+        notifications_only: bool = False,
+        maxsize: int = SUBSCRIPTION_MAXSIZE_DEFAULT,
+        policy: str = POLICY_DROP_OLDEST,
+        name: str = ""
+    ) -> Subscription:
+        """
+        Neues Abonnement anlegen
+
+        Args:
+            modules: Nur diese Modul-IDs (None: alle)
+            cmds: Nur diese Befehle (None: alle)
+            notifications_only: Nur Notifications, keine Befehlsantworten
+            maxsize: Max. Anzahl ungelesener Pakete
+            policy: POLICY_DROP_OLDEST oder POLICY_COALESCE_LATEST
+            name: Bezeichnung für Diagnose
+        """
+        subscription = Subscription(
+            self, modules, cmds, notifications_only, maxsize, policy, name
+        )
+        self.subscriptions.add(subscription)
+        logger.debug(f"Subscription added: {name or id(subscription)} ({len(self.subscriptions)} total)")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def publish(self, packet: DwarfPacket):
+        """Paket an alle passenden Abonnenten verteilen"""
+        self.published += 1
+        for subscription in self.subscriptions:
+            if subscription.matches(packet):
+                subscription.put(packet)
+
+    def close(self):
+        """Alle Abonnements beenden"""
+        for subscription in list(self.subscriptions):
+            subscription.close()
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "subscriptions": [
+                {
+                    "name": subscription.name,
+                    "policy": subscription.policy,
+                    "queued": subscription.qsize(),
+                    "delivered": subscription.delivered,
+                    "dropped": subscription.dropped,
+                    "coalesced": subscription.coalesced,
+                }
+                for subscription in self.subscriptions
+            ],
+        }
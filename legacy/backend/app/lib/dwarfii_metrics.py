@@ -0,0 +1,100 @@
+"""
+DWARF II Metrics
+Rollierende Latenz-Statistik (Perzentile und Histogramm) und Prozess-Kennzahlen
+"""
+import asyncio
+import gc
+import math
+import os
+import tracemalloc
+from collections import deque
+from typing import Dict, Any, Optional
+
+from ..utils.constants import LATENCY_WINDOW_SIZE, LATENCY_BUCKETS_MS
+
+
+class LatencyWindow:
+    """
+    Die letzten N Messwerte (Sekunden) mit p50/p95/p99 und Histogramm
+
+    Perzentile werden erst bei summary() berechnet; add() ist O(1) und
+    kann im Hot-Path aufgerufen werden.
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.last = value
+
+    def percentile(self, p: float, ordered=None) -> Optional[float]:
+        """Perzentil (nearest rank), p in 0..100"""
+        if ordered is None:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+        return ordered[rank - 1]
+
+    def histogram(self) -> Dict[str, int]:
+        """Anzahl Werte je Bucket (Obergrenze in ms, '+Inf' für den Rest)"""
+        counts = {str(bound): 0 for bound in LATENCY_BUCKETS_MS}
+        counts["+Inf"] = 0
+        for value in self.samples:
+            ms = value * 1000.0
+            for bound in LATENCY_BUCKETS_MS:
+                if ms <= bound:
+                    counts[str(bound)] += 1
+                    break
+            else:
+                counts["+Inf"] += 1
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """Kennzahlen in Millisekunden"""
+        ordered = sorted(self.samples)
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000.0, 2)
+
+        return {
+            "count": self.count,
+            "window": len(ordered),
+            "last_ms": ms(self.last),
+            "min_ms": ms(ordered[0] if ordered else None),
+            "p50_ms": ms(self.percentile(50, ordered)),
+            "p95_ms": ms(self.percentile(95, ordered)),
+            "p99_ms": ms(self.percentile(99, ordered)),
+            "max_ms": ms(ordered[-1] if ordered else None),
+            "histogram": self.histogram(),
+        }
+
+
+def process_stats(count_objects: bool = True) -> Dict[str, Any]:
+    """
+    Speicher- und Task-Kennzahlen des Server-Prozesses (Leck-Diagnose)
+    RSS nur unter Linux (/proc), tracemalloc nur wenn aktiviert
+    """
+    rss = None
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        tasks = len(asyncio.all_tasks())
+    except RuntimeError:
+        tasks = None
+    stats = {
+        "rss_bytes": rss,
+        "tasks": tasks,
+        "gc_objects": len(gc.get_objects()) if count_objects else None,
+        "traced_bytes": None,
+    }
+    if tracemalloc.is_tracing():
+        stats["traced_bytes"], stats["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+    return stats
@@ -0,0 +1,198 @@
+"""
+DWARF II Packet Decoding
+Registry (module_id, cmd, type) -> pb2-Klasse und lazy dekodierte Pakete
+"""
+import logging
+from typing import Optional, Dict, Tuple, Any
+
+from google.protobuf import json_format
+
+from ..services.proto import base_pb2, camera_pb2, astro_pb2, motor_pb2, notify_pb2
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Decoder Registry
+# ============================================================================
+
+# (module_id, cmd, type) -> pb2-Klasse; type=None gilt für alle Typen
+DECODERS: Dict[Tuple[int, int, Optional[int]], Any] = {}
+
+
+def register_decoder(module_id: int, cmd: int, message_class, msg_type: Optional[int] = None):
+    """
+    pb2-Klasse für ein Paket registrieren
+
+    Args:
+        module_id: Modul-ID
+        cmd: Befehl
+        message_class: pb2-Message-Klasse für packet.data
+        msg_type: WsPacket.type (None: alle Typen)
+    """
+    DECODERS[(module_id, cmd, msg_type)] = message_class
+
+
+def get_decoder(module_id: int, cmd: int, msg_type: int):
+    """
+    pb2-Klasse für ein Paket suchen
+    Antworten ohne eigenen Eintrag sind ComResponse, unbekannte Notifications None
+    """
+    message_class = DECODERS.get((module_id, cmd, msg_type))
+    if message_class is None:
+        message_class = DECODERS.get((module_id, cmd, None))
+    if message_class is None and msg_type != MESSAGE_TYPE_NOTIFICATION and module_id != MODULE_NOTIFY:
+        message_class = base_pb2.ComResponse
+    return message_class
+
+
+# Antworten mit eigener Message
+register_decoder(MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS, camera_pb2.ResGetAllParams)
+register_decoder(MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_GET_ALL_PARAMS, camera_pb2.ResGetAllParams)
+register_decoder(MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_SYSTEM_WORKING_STATE, camera_pb2.ResSystemWorkingState)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_CHECK_GOT_DARK, astro_pb2.ResCheckDarkFrame)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST, astro_pb2.ResGetDarkFrameInfoList)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_DEL_DARK_FRAME_LIST, astro_pb2.ResDelDarkFrameList)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_START_ONE_CLICK_GOTO_DSO, astro_pb2.ResOneClickGoto)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_START_ONE_CLICK_GOTO_SOLAR_SYSTEM, astro_pb2.ResOneClickGoto)
+register_decoder(MODULE_ASTRO, CMD_ASTRO_START_EQ_SOLVING, astro_pb2.ResStartEqSolving)
+register_decoder(MODULE_MOTOR, CMD_STEP_MOTOR_RUN, motor_pb2.ResMotor)
+register_decoder(MODULE_MOTOR, CMD_STEP_MOTOR_STOP, motor_pb2.ResMotor)
+
+# Notifications (dwarf_api_doc.txt 4.16)
+NOTIFY_MESSAGES = {
+    CMD_NOTIFY_TELE_WIDI_PICTURE_MATCHING: notify_pb2.ResNotifyPictureMatching,
+    CMD_NOTIFY_ELE: notify_pb2.ComResWithInt,
+    CMD_NOTIFY_CHARGE: notify_pb2.ComResWithInt,
+    CMD_NOTIFY_SDCARD_INFO: notify_pb2.ResNotifySDcardInfo,
+    CMD_NOTIFY_TELE_RECORD_TIME: notify_pb2.ResNotifyRecordTime,
+    CMD_NOTIFY_TELE_TIMELAPSE_OUT_TIME: notify_pb2.ResNotifyTimeLapseOutTime,
+    CMD_NOTIFY_STATE_CAPTURE_RAW_DARK: notify_pb2.ResNotifyOperationState,
+    CMD_NOTIFY_PROGRASS_CAPTURE_RAW_DARK: notify_pb2.ResNotifyProgressCaptureRawDark,
+    CMD_NOTIFY_STATE_CAPTURE_RAW_LIVE_STACKING: notify_pb2.ResNotifyOperationState,
+    CMD_NOTIFY_PROGRASS_CAPTURE_RAW_LIVE_STACKING: notify_pb2.ResNotifyProgressCaptureRawLiveStacking,
+    CMD_NOTIFY_STATE_ASTRO_CALIBRATION: notify_pb2.ResNotifyStateAstroCalibration,
+    CMD_NOTIFY_STATE_ASTRO_GOTO: notify_pb2.ResNotifyStateAstroGoto,
+    CMD_NOTIFY_STATE_ASTRO_TRACKING: notify_pb2.ResNotifyStateAstroTracking,
+    CMD_NOTIFY_TELE_SET_PARAM: notify_pb2.ResNotifyParam,
+    CMD_NOTIFY_WIDE_SET_PARAM: notify_pb2.ResNotifyParam,
+    CMD_NOTIFY_TELE_FUNCTION_STATE: notify_pb2.ResNotifyCamFunctionState,
+    CMD_NOTIFY_WIDE_FUNCTION_STATE: notify_pb2.ResNotifyCamFunctionState,
+    CMD_NOTIFY_SET_FEATURE_PARAM: notify_pb2.ResNotifyParam,
+    CMD_NOTIFY_TELE_BURST_PROGRESS: notify_pb2.ResNotifyBurstProgress,
+    CMD_NOTIFY_PANORAMA_PROGRESS: notify_pb2.ResNotifyPanoramaProgress,
+    CMD_NOTIFY_WIDE_BURST_PROGRESS: notify_pb2.ResNotifyBurstProgress,
+    CMD_NOTIFY_RGB_STATE: notify_pb2.ResNotifyRgbState,
+    CMD_NOTIFY_POWER_IND_STATE: notify_pb2.ResNotifyPowerIndState,
+    CMD_NOTIFY_WS_HOST_SLAVE_MODE: notify_pb2.ResNotifyHostSlaveMode,
+    CMD_NOTIFY_MTP_STATE: notify_pb2.ResNotifyMTPState,
+    CMD_NOTIFY_TRACK_RESULT: notify_pb2.ResNotifyTrackResult,
+    CMD_NOTIFY_WIDE_TIMELAPSE_OUT_TIME: notify_pb2.ResNotifyTimeLapseOutTime,
+    CMD_NOTIFY_CPU_MODE: notify_pb2.ResNotifyCPUMode,
+    CMD_NOTIFY_STATE_ASTRO_TRACKING_SPECIAL: notify_pb2.ResNotifyStateAstroTrackingSpecial,
+    CMD_NOTIFY_POWER_OFF: notify_pb2.ResNotifyPowerOff,
+    CMD_NOTIFY_ALBUM_UPDATE: notify_pb2.ResNotifyAlbumUpdate,
+    CMD_NOTIFY_SENTRY_MODE_STATE: notify_pb2.ResNotifyStateSentryMode,
+    CMD_NOTIFY_SENTRY_MODE_TRACK_RESULT: notify_pb2.ResNotifyTrackResult,
+    CMD_NOTIFY_STATE_ASTRO_ONE_CLICK_GOTO: notify_pb2.ResNotifyOneClickGotoState,
+    CMD_NOTIFY_STREAM_TYPE: notify_pb2.ResNotifyStreamType,
+    CMD_NOTIFY_WIDE_RECORD_TIME: notify_pb2.ResNotifyRecordTime,
+    CMD_NOTIFY_STATE_WIDE_CAPTURE_RAW_LIVE_STACKING: notify_pb2.ResNotifyOperationState,
+    CMD_NOTIFY_PROGRASS_WIDE_CAPTURE_RAW_LIVE_STACKING: notify_pb2.ResNotifyProgressCaptureRawLiveStacking,
+    CMD_NOTIFY_MULTI_TRACK_RESULT: notify_pb2.ResNotifyMultiTrackResult,
+    CMD_NOTIFY_EQ_SOLVING_STATE: notify_pb2.ResNotifyEqSolvingState,
+    CMD_NOTIFY_UFO_MODE_STATE: notify_pb2.ResNotifyStateSentryMode,
+    CMD_NOTIFY_TELE_LONG_EXP_PROGRESS: notify_pb2.ResNotifyLongExpPhotoProgress,
+    CMD_NOTIFY_WIDE_LONG_EXP_PROGRESS: notify_pb2.ResNotifyLongExpPhotoProgress,
+    CMD_NOTIFY_TEMPERATURE: notify_pb2.ResNotifyTemperature,
+    CMD_NOTIFY_STATE_CAPTURE_WIDE_RAW_DARK: notify_pb2.ResNotifyOperationState,
+    CMD_NOTIFY_SKY_SEACHER_STATE: notify_pb2.ResNotifySkySeacherState,
+}
+
+for _cmd, _message_class in NOTIFY_MESSAGES.items():
+    register_decoder(MODULE_NOTIFY, _cmd, _message_class)
+
+
+# ============================================================================
+# Packet
+# ============================================================================
+
+class DwarfPacket:
+    """
+    Empfangenes WsPacket mit lazy Dekodierung
+
+    packet.data wird erst beim ersten Zugriff auf .message/.code geparst
+    (genau einmal, mit der registrierten pb2-Klasse). Dict-artiger Zugriff
+    (.get("code"), ["module_id"]) bleibt für bestehende Callbacks erhalten.
+    """
+
+    __slots__ = ("module_id", "cmd", "type", "data", "_message", "_decoded")
+
+    _LEGACY_KEYS = ("module_id", "cmd", "type", "data", "code")
+
+    def __init__(self, module_id: int, cmd: int, msg_type: int, data: bytes):
+        self.module_id = module_id
+        self.cmd = cmd
+        self.type = msg_type
+        self.data = data
+        self._message = None
+        self._decoded = False
+
+    @classmethod
+    def from_ws_packet(cls, packet) -> "DwarfPacket":
+        """Aus geparstem base_pb2.WsPacket erstellen"""
+        return cls(packet.module_id, packet.cmd, packet.type, packet.data)
+
+    @property
+    def is_notification(self) -> bool:
+        return self.type == MESSAGE_TYPE_NOTIFICATION or self.module_id == MODULE_NOTIFY
+
+    @property
+    def message(self):
+        """Dekodierte pb2-Message (None wenn unbekannt oder nicht parsebar)"""
+        if not self._decoded:
+            self._decoded = True
+            message_class = get_decoder(self.module_id, self.cmd, self.type)
+            if message_class is not None:
+                message = message_class()
+                try:
+                    message.ParseFromString(self.data)
+                    self._message = message
+                except Exception as e:
+                    logger.debug(f"Could not parse Module={self.module_id}, CMD={self.cmd} as {message_class.__name__}: {e}")
+        return self._message
+
+    @property
+    def code(self) -> Optional[int]:
+        """Fehlercode der Antwort (None wenn die Message kein code-Feld hat)"""
+        message = self.message
+        if message is None or "code" not in message.DESCRIPTOR.fields_by_name:
+            return None
+        return message.code
+
+    def to_dict(self) -> dict:
+        """
+        Kompakte JSON-Darstellung (z.B. für /api/device/events)
+        Felder mit Default-Wert werden weggelassen, unbekannte Pakete ohne msg
+        """
+        result = {"module": self.module_id, "cmd": self.cmd, "type": self.type}
+        message = self.message
+        if message is not None:
+            result["msg"] = json_format.MessageToDict(message, preserving_proto_field_name=True)
+        return result
+
+    def get(self, key: str, default=None):
+        """Dict-Kompatibilität für register_message_callback-Callbacks"""
+        if key not in self._LEGACY_KEYS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in self._LEGACY_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        return f"DwarfPacket(module_id={self.module_id}, cmd={self.cmd}, type={self.type}, {len(self.data)} bytes)"
@@ -0,0 +1,392 @@
+"""
+DWARF II Sequences
+Mehrschrittige Abläufe (z.B. Kamera öffnen -> IR-Pass -> Kalibrieren ->
+GOTO -> Live-Stacking) laufen auf dem Server statt Schritt für Schritt
+aus dem Browser. Ein Schritt ist fertig, wenn das Gerät ihn per
+Notification als abgeschlossen meldet (SEQUENCE_COMPLETION) und die
+Antwort einen Erfolgs-Code hat, sonst mit der Antwort - keine festen
+Wartezeiten.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .dwarf_connection import connection_manager
+from .dwarfii_astro import (
+    message_astro_calibration_start,
+    message_astro_goto_dso,
+    message_astro_goto_solar,
+    message_astro_stacking_start,
+    message_astro_stacking_stop,
+)
+from .dwarfii_camera import message_camera_tele_open_camera, message_camera_tele_close_camera
+from .dwarfii_codec import encode_varint
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+# Status von Sequenz und Schritt
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_SUCCESS = "success"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+STATUS_SKIPPED = "skipped"
+
+
+def _message_single_int(value: int) -> bytes:
+    """Message mit genau einem int-Feld (Feld 1, varint; negative Werte wie int64)"""
+    return b"\x08" + encode_varint(value & 0xFFFFFFFFFFFFFFFF)
+
+
+# ============================================================================
+# Aktionen: Name -> (module_id, cmd, Payload aus params)
+# ============================================================================
+
+SEQUENCE_ACTIONS: Dict[str, tuple] = {
+    "open_tele_camera": (
+        MODULE_CAMERA_TELE, CMD_CAMERA_TELE_OPEN_CAMERA,
+        lambda params: message_camera_tele_open_camera(binning=int(params.get("binning", 0)))
+    ),
+    "close_tele_camera": (
+        MODULE_CAMERA_TELE, CMD_CAMERA_TELE_CLOSE_CAMERA,
+        lambda params: message_camera_tele_close_camera()
+    ),
+    "set_ircut": (  # value: 0 = Cut, 1 = Pass (Astro)
+        MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_IRCUT,
+        lambda params: _message_single_int(int(params["value"]))
+    ),
+    "calibrate": (
+        MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION,
+        lambda params: message_astro_calibration_start()
+    ),
+    "goto_dso": (
+        MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO,
+        lambda params: message_astro_goto_dso(
+            float(params["ra"]), float(params["dec"]), params.get("target_name", "")
+        )
+    ),
+    "goto_solar": (
+        MODULE_ASTRO, CMD_ASTRO_START_GOTO_SOLAR_SYSTEM,
+        lambda params: message_astro_goto_solar(
+            int(params["index"]), float(params["lat"]), float(params["lon"]), params.get("target_name", "")
+        )
+    ),
+    "start_live_stacking": (
+        MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING,
+        lambda params: message_astro_stacking_start()
+    ),
+    "stop_live_stacking": (
+        MODULE_ASTRO, CMD_ASTRO_STOP_CAPTURE_RAW_LIVE_STACKING,
+        lambda params: message_astro_stacking_stop()
+    ),
+}
+
+
+# ============================================================================
+# Schritt und Sequenz
+# ============================================================================
+
+class SequenceStep:
+    """
+    Ein Befehl der Sequenz samt Abschlussbedingung
+
+    spec: {"action", "params"} oder {"module_id", "cmd", "payload" (bytes)};
+    optional "name", "timeout", "notify_cmd"/"done_states"/"fail_states"
+    (überschreiben SEQUENCE_COMPLETION) und "ok_codes".
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        action = spec.get("action")
+        if action is not None:
+            if action not in SEQUENCE_ACTIONS:
+                raise ValueError(f"Unbekannte Aktion: {action}")
+            self.module_id, self.cmd, build = SEQUENCE_ACTIONS[action]
+            try:
+                self.payload = build(spec.get("params") or {})
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Aktion {action}: ungültige Parameter ({e})")
+        elif spec.get("module_id") is not None and spec.get("cmd") is not None:
+            self.module_id = spec["module_id"]
+            self.cmd = spec["cmd"]
+            self.payload = spec.get("payload") or b""
+        else:
+            raise ValueError("Schritt braucht 'action' oder 'module_id' und 'cmd'")
+
+        key = (self.module_id, self.cmd)
+        self.name = spec.get("name") or action or f"{self.module_id}/{self.cmd}"
+        self.timeout = spec.get("timeout") or SEQUENCE_STEP_TIMEOUT.get(key, SEQUENCE_STEP_TIMEOUT_DEFAULT)
+        self.ok_codes = set(spec.get("ok_codes") or SEQUENCE_OK_CODES.get(key, {0}))
+
+        self.completion = SEQUENCE_COMPLETION.get(key)
+        if spec.get("notify_cmd") is not None:
+            self.completion = (
+                spec["notify_cmd"],
+                set(spec.get("done_states") or ()),
+                set(spec.get("fail_states") or ())
+            )
+        self.cancel_cmd = STOP_COMMANDS.get(key)
+
+        self.status = STATUS_PENDING
+        self.code: Optional[int] = None
+        self.state: Optional[int] = None
+        self.message: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def finish(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.message = message
+        self.finished_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round(((self.finished_at or time.monotonic()) - self.started_at) * 1000.0, 1)
+        return {
+            "name": self.name,
+            "module_id": self.module_id,
+            "cmd": self.cmd,
+            "status": self.status,
+            "code": self.code,
+            "state": self.state,
+            "message": self.message,
+            "waits_for": self.completion[0] if self.completion else None,
+            "elapsed_ms": elapsed,
+        }
+
+
+class DwarfSequence:
+    """Ablauf einer Schrittliste auf einem Gerät (als asyncio-Task)"""
+
+    def __init__(self, sequence_id: int, ip: str, steps: List[SequenceStep], name: str = ""):
+        self.id = sequence_id
+        self.ip = ip
+        self.name = name
+        self.steps = steps
+        self.status = STATUS_PENDING
+        self.current: Optional[int] = None
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.send_stop_on_cancel = True
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.status in (STATUS_PENDING, STATUS_RUNNING)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def cancel(self, send_stop: bool = True) -> bool:
+        """Laufende Sequenz abbrechen (sendet ggf. den Stopp-Befehl des aktuellen Schritts)"""
+        if not self.is_running or self._task is None:
+            return False
+        self.send_stop_on_cancel = send_stop
+        self._task.cancel()
+        return True
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        self.status = STATUS_RUNNING
+        step = None
+        try:
+            ws_handler = await connection_manager.get_connection(self.ip)
+            if not ws_handler.is_connected():
+                raise ConnectionError(f"Verbindung zu {self.ip} fehlgeschlagen")
+
+            for index, step in enumerate(self.steps):
+                self.current = index
+                logger.info(f"▶️ Sequenz {self.id}: Schritt {index + 1}/{len(self.steps)} {step.name}")
+                if not await self._run_step(ws_handler, step):
+                    self._finish(STATUS_ERROR)
+                    return
+            self._finish(STATUS_SUCCESS)
+        except asyncio.CancelledError:
+            if step is not None and step.status == STATUS_RUNNING:
+                step.finish(STATUS_CANCELLED)
+                if step.cancel_cmd is not None and self.send_stop_on_cancel:
+                    await self._send_stop(step)
+            self._finish(STATUS_CANCELLED)
+        except Exception as e:
+            if step is not None and step.status == STATUS_RUNNING:
+                step.finish(STATUS_ERROR, str(e))
+            logger.error(f"Sequenz {self.id} fehlgeschlagen: {e}")
+            self._finish(STATUS_ERROR)
+
+    async def _run_step(self, ws_handler, step: SequenceStep) -> bool:
+        """Befehl senden und auf Antwort bzw. Abschluss-Notification warten"""
+        step.status = STATUS_RUNNING
+        step.started_at = time.monotonic()
+
+        subscription = None
+        state_task = None
+        if step.completion is not None:
+            # Vor dem Senden abonnieren, damit keine Notification verloren geht
+            subscription = ws_handler.events.subscribe(
+                cmds=[step.completion[0]],
+                notifications_only=True,
+                name=f"sequence:{self.id}"
+            )
+            state_task = asyncio.create_task(self._wait_state(step, subscription))
+
+        future = None
+        try:
+            future = ws_handler.send_command(step.module_id, step.cmd, step.payload, timeout=step.timeout)
+            waiters = {future} if state_task is None else {future, state_task}
+            deadline = time.monotonic() + step.timeout
+            responded = False  # Antwort mit Erfolgs-Code da
+            reached = state_task is None  # "fertig"-Zustand gemeldet
+            while waiters:
+                done, _ = await asyncio.wait(
+                    waiters, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if reached:
+                        step.finish(STATUS_ERROR, f"Keine Antwort {SEQUENCE_RESPONSE_GRACE}s nach Zustand {step.state}")
+                    else:
+                        step.finish(STATUS_ERROR, f"Timeout nach {step.timeout}s")
+                    return False
+
+                if future in done:
+                    waiters.discard(future)
+                    try:
+                        packet = future.result()
+                    except asyncio.TimeoutError:
+                        step.finish(STATUS_ERROR, f"Keine Antwort nach {step.timeout}s")
+                        return False
+                    except ConnectionError as e:
+                        step.finish(STATUS_ERROR, str(e))
+                        return False
+                    step.code = packet.code
+                    if step.code not in step.ok_codes:
+                        step.finish(STATUS_ERROR, f"Fehler (Code {step.code})")
+                        return False
+                    responded = True
+
+                if state_task in done:
+                    waiters.discard(state_task)
+                    if not state_task.result():
+                        step.finish(STATUS_ERROR, f"Gerät meldet Zustand {step.state}")
+                        return False
+                    reached = True
+                    if not responded:
+                        # Notification vor der Antwort (z.B. Kalibrierung beendet):
+                        # Erfolg erst mit dem Antwort-Code
+                        deadline = min(deadline, time.monotonic() + SEQUENCE_RESPONSE_GRACE)
+
+                if responded and reached:
+                    step.finish(STATUS_SUCCESS)
+                    return True
+            return False
+        finally:
+            if state_task is not None and not state_task.done():
+                state_task.cancel()
+            if subscription is not None:
+                subscription.close()
+            if future is not None and not future.done():
+                # Schritt abgebrochen oder fehlgeschlagen - Antwort nicht mehr abwarten
+                future.cancel()
+
+    async def _wait_state(self, step: SequenceStep, subscription) -> bool:
+        """True bei "fertig"-Zustand, False bei "fehlgeschlagen" oder Verbindungsende"""
+        _, done_states, fail_states = step.completion
+        while True:
+            packet = await subscription.get()
+            if packet is None:
+                return False
+            state = getattr(packet.message, "state", None)
+            step.state = state
+            if state in done_states:
+                return True
+            if state in fail_states:
+                return False
+
+    async def _send_stop(self, step: SequenceStep):
+        try:
+            await connection_manager.execute(self.ip, step.module_id, step.cancel_cmd, b"", timeout=STOP_COMMAND_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Stopp für Sequenz {self.id} fehlgeschlagen: {e}")
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.monotonic()
+        for step in self.steps:
+            if step.status == STATUS_PENDING:
+                step.status = STATUS_SKIPPED
+        logger.info(f"⏹️ Sequenz {self.id} beendet: {status}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = sum(1 for step in self.steps if step.status == STATUS_SUCCESS)
+        return {
+            "id": self.id,
+            "ip": self.ip,
+            "name": self.name,
+            "status": self.status,
+            "current_step": self.current,
+            "progress": round(finished / len(self.steps), 3) if self.steps else 1.0,
+            "elapsed_ms": round(((self.finished_at or time.monotonic()) - self.created_at) * 1000.0, 1),
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+# ============================================================================
+# Verwaltung
+# ============================================================================
+
+class SequenceManager:
+    """Laufende und zuletzt beendete Sequenzen (max. eine laufende pro Gerät)"""
+
+    def __init__(self):
+        self.sequences: "OrderedDict[int, DwarfSequence]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def start(self, ip: str, step_specs: List[Dict[str, Any]], name: str = "") -> DwarfSequence:
+        """
+        Sequenz anlegen und starten
+
+        Raises:
+            ValueError: ungültige Schrittliste
+            RuntimeError: auf dem Gerät läuft bereits eine Sequenz
+        """
+        if not step_specs:
+            raise ValueError("Sequenz ohne Schritte")
+        steps = [SequenceStep(spec) for spec in step_specs]
+        for sequence in self.sequences.values():
+            if sequence.ip == ip and sequence.is_running:
+                raise RuntimeError(f"Auf {ip} läuft bereits Sequenz {sequence.id}")
+
+        sequence = DwarfSequence(next(self._ids), ip, steps, name)
+        self.sequences[sequence.id] = sequence
+        self._prune()
+        sequence.start()
+        return sequence
+
+    def get(self, sequence_id: int) -> Optional[DwarfSequence]:
+        return self.sequences.get(sequence_id)
+
+    def list(self, ip: Optional[str] = None) -> List[DwarfSequence]:
+        return [sequence for sequence in self.sequences.values() if ip is None or sequence.ip == ip]
+
+    def _prune(self):
+        finished = [sid for sid, sequence in self.sequences.items() if not sequence.is_running]
+        for sid in finished[:max(0, len(finished) - SEQUENCE_HISTORY)]:
+            del self.sequences[sid]
+
+    async def shutdown(self):
+        """Server-Shutdown: Tasks beenden, Gerät läuft weiter (kein Stopp-Befehl)"""
+        running = [sequence for sequence in self.sequences.values() if sequence.is_running]
+        for sequence in running:
+            sequence.cancel(send_stop=False)
+        for sequence in running:
+            await sequence.wait()
+
+
+# Globale Instanz
+sequence_manager = SequenceManager()
@@ -0,0 +1,269 @@
+"""
+DWARF II Device State
+Gerätezustand im Speicher, aktuell gehalten über Notifications
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any
+
+from ..services.proto import camera_pb2
+from ..utils.constants import *
+from .dwarfii_packet import DwarfPacket
+
+logger = logging.getLogger(__name__)
+
+
+# ResGetAllParams-Felder, die an die API gehen
+TELE_PARAM_FIELDS = (
+    "exp_mode", "exp_index", "gain_mode", "gain_index", "ircut_value",
+    "wb_mode", "wb_index_type", "wb_index", "brightness", "contrast",
+    "hue", "saturation", "sharpness", "jpg_quality",
+)
+
+
+def params_from_message(message) -> Dict[str, int]:
+    """ResGetAllParams -> Dict"""
+    return {field: getattr(message, field) for field in TELE_PARAM_FIELDS}
+
+
+class DwarfDeviceState:
+    """
+    Letzter bekannter Zustand eines Geräts
+
+    Wird beim Verbinden einmal mit CMD_CAMERA_TELE_GET_ALL_PARAMS gefüllt und
+    danach aus dem Notification-Stream (Parameter-Echo, Akku, SD-Karte,
+    Temperatur, Funktionsstatus) sowie aus Antworten anderer Aufrufer
+    aktualisiert. Lese-Endpoints antworten daraus ohne Geräte-Roundtrip.
+    """
+
+    def __init__(self, ip: str):
+        self.ip = ip
+
+        # Kamera-Parameter (Tele) wie ResGetAllParams
+        self.tele_params: Dict[str, int] = {}
+        # Parameter-Echo roh nach CommonParam.id
+        self.tele_params_by_id: Dict[int, Dict[str, Any]] = {}
+        self.wide_params_by_id: Dict[int, Dict[str, Any]] = {}
+
+        self.battery: Optional[int] = None
+        self.charging: Optional[int] = None
+        self.sdcard: Optional[Dict[str, int]] = None
+        self.temperature: Optional[int] = None
+        self.function_state: Dict[str, Dict[int, int]] = {"tele": {}, "wide": {}}
+        self.darkframe: Optional[Dict[str, Any]] = None
+        self.device_info: Optional[Dict[str, Any]] = None
+
+        # Abschnitt -> time.monotonic() der letzten Aktualisierung
+        self.updated: Dict[str, float] = {}
+
+        self._subscription = None
+        self._ws_handler = None
+        self._task: Optional[asyncio.Task] = None
+        self._prime_task: Optional[asyncio.Task] = None
+
+        # (module_id, cmd) -> Methode
+        self._handlers = {
+            (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS): self._on_all_params,
+            (MODULE_ASTRO, CMD_ASTRO_CHECK_GOT_DARK): self._on_check_dark,
+            (MODULE_NOTIFY, CMD_NOTIFY_TELE_SET_PARAM): self._on_tele_param,
+            (MODULE_NOTIFY, CMD_NOTIFY_WIDE_SET_PARAM): self._on_wide_param,
+            (MODULE_NOTIFY, CMD_NOTIFY_ELE): self._on_battery,
+            (MODULE_NOTIFY, CMD_NOTIFY_CHARGE): self._on_charge,
+            (MODULE_NOTIFY, CMD_NOTIFY_SDCARD_INFO): self._on_sdcard,
+            (MODULE_NOTIFY, CMD_NOTIFY_TEMPERATURE): self._on_temperature,
+            (MODULE_NOTIFY, CMD_NOTIFY_TELE_FUNCTION_STATE): self._on_tele_function_state,
+            (MODULE_NOTIFY, CMD_NOTIFY_WIDE_FUNCTION_STATE): self._on_wide_function_state,
+            (MODULE_NOTIFY, CMD_NOTIFY_STATE_CAPTURE_RAW_DARK): self._on_dark_capture,
+        }
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    def attach(self, ws_handler):
+        """
+        An eine (neue) Verbindung hängen und Zustand einmal abfragen
+        Bereits bekannte Werte bleiben bis zur nächsten Aktualisierung gültig
+        """
+        self.detach()
+        self.clear_device_info()
+        self._subscription = ws_handler.events.subscribe(
+            cmds={cmd for _, cmd in self._handlers},
+            maxsize=1024,
+            name=f"state:{self.ip}"
+        )
+        self._task = asyncio.create_task(self._consume(self._subscription))
+        self._prime_task = asyncio.create_task(self.prime(ws_handler))
+
+        # Nach einem Reconnect neu abfragen (Änderungen während des Ausfalls);
+        # Geräte-Infos (Name/SSID) können sich dabei geändert haben
+        def on_connect_state(connected: bool):
+            self.clear_device_info()
+            if connected and self._subscription is not None:
+                self._prime_task = asyncio.create_task(self.prime(ws_handler))
+
+        ws_handler.register_connect_callback(f"state:{self.ip}", on_connect_state)
+        self._ws_handler = ws_handler
+
+    def detach(self):
+        """Von der Verbindung lösen"""
+        if self._ws_handler is not None:
+            self._ws_handler.unregister_connect_callback(f"state:{self.ip}")
+            self._ws_handler = None
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+        self.clear_device_info()
+        for task in (self._task, self._prime_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._task = None
+        self._prime_task = None
+
+    def subscription(self):
+        """Eigenes Bus-Abonnement (zählt nicht als externer Abonnent)"""
+        return self._subscription
+
+    @property
+    def attached(self) -> bool:
+        """Hängt an einer Verbindung (nur dann wird device_info bei Wechseln verworfen)"""
+        return self._ws_handler is not None
+
+    async def prime(self, ws_handler):
+        """Kamera-Parameter einmalig vom Gerät holen"""
+        try:
+            result = await ws_handler.send_command(
+                MODULE_CAMERA_TELE,
+                CMD_CAMERA_TELE_GET_ALL_PARAMS,
+                camera_pb2.ReqGetAllParams().SerializeToString(),
+                timeout=5.0
+            )
+            self.apply(result)
+            logger.info(f"📋 Gerätezustand für {self.ip} geladen")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Gerätezustand für {self.ip} nicht geladen: {e}")
+
+    async def _consume(self, subscription):
+        async for packet in subscription:
+            self.apply(packet)
+
+    # ========================================================================
+    # Updates
+    # ========================================================================
+
+    def apply(self, packet: DwarfPacket):
+        """Paket in den Zustand übernehmen (unbekannte Pakete werden ignoriert)"""
+        handler = self._handlers.get((packet.module_id, packet.cmd))
+        if handler is None:
+            return
+        message = packet.message
+        if message is None:
+            return
+        try:
+            handler(message)
+        except Exception as e:
+            logger.debug(f"State update failed for CMD={packet.cmd}: {e}")
+
+    def _touch(self, section: str):
+        self.updated[section] = time.monotonic()
+
+    def _on_all_params(self, message):
+        if message.code != 0:
+            return
+        self.tele_params = params_from_message(message)
+        self._touch("tele_params")
+
+    def _on_check_dark(self, message):
+        if message.code != 0:
+            return
+        self.darkframe = {"code": message.code, "progress": message.progress / 100.0}
+        self._touch("darkframe")
+
+    def _on_dark_capture(self, message):
+        # Neue Darkframes: letzten Check verwerfen
+        self.darkframe = None
+        self.updated.pop("darkframe", None)
+
+    def _apply_param_echo(self, message, by_id: Dict[int, Dict[str, Any]], params: Optional[Dict[str, int]]):
+        for param in message.param:
+            by_id[param.id] = {
+                "auto_mode": param.auto_mode,
+                "mode_index": param.mode_index,
+                "index": param.index,
+                "continue_value": param.continue_value,
+            }
+            fields = PARAM_ID_FIELDS.get(param.id)
+            if params is not None and fields:
+                mode_field, index_field = fields
+                params[mode_field] = param.auto_mode
+                params[index_field] = param.index
+
+    def _on_tele_param(self, message):
+        self._apply_param_echo(message, self.tele_params_by_id, self.tele_params if self.tele_params else None)
+        self._touch("tele_params")
+
+    def _on_wide_param(self, message):
+        self._apply_param_echo(message, self.wide_params_by_id, None)
+        self._touch("wide_params")
+
+    def _on_battery(self, message):
+        self.battery = message.value
+        self._touch("battery")
+
+    def _on_charge(self, message):
+        self.charging = message.value
+        self._touch("charging")
+
+    def _on_sdcard(self, message):
+        self.sdcard = {"available_size": message.available_size, "total_size": message.total_size}
+        self._touch("sdcard")
+
+    def _on_temperature(self, message):
+        self.temperature = message.temperature
+        self._touch("temperature")
+
+    def _on_tele_function_state(self, message):
+        self.function_state["tele"][message.function_id] = message.state
+        self._touch("function_state")
+
+    def _on_wide_function_state(self, message):
+        self.function_state["wide"][message.function_id] = message.state
+        self._touch("function_state")
+
+    def set_device_info(self, info: Dict[str, Any]):
+        """HTTP-Antwort von /getDeviceInfo übernehmen"""
+        self.device_info = info
+        self._touch("device_info")
+
+    def clear_device_info(self):
+        """Geräte-Infos verwerfen (Umbenennen, Reset, Verbindungswechsel)"""
+        self.device_info = None
+        self.updated.pop("device_info", None)
+
+    # ========================================================================
+    # Lesen
+    # ========================================================================
+
+    def age(self, section: str) -> Optional[float]:
+        """Sekunden seit der letzten Aktualisierung (None: nie)"""
+        updated = self.updated.get(section)
+        return None if updated is None else time.monotonic() - updated
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Gesamter Zustand (für Diagnose)"""
+        return {
+            "ip": self.ip,
+            "tele_params": self.tele_params,
+            "tele_params_by_id": self.tele_params_by_id,
+            "wide_params_by_id": self.wide_params_by_id,
+            "battery": self.battery,
+            "charging": self.charging,
+            "sdcard": self.sdcard,
+            "temperature": self.temperature,
+            "function_state": self.function_state,
+            "darkframe": self.darkframe,
+            "age": {section: round(self.age(section), 3) for section in self.updated},
+        }
@@ -0,0 +1,77 @@
+"""
+DWARF II Packet Trace
+Ringpuffer der zuletzt gesendeten/empfangenen Paket-Header und gesampeltes
+Paket-Logging. Im Hot-Path wird nur ein Tupel angehängt; formatiert wird
+erst beim Abruf (dump) bzw. wenn eine Log-Zeile wirklich ausgegeben wird.
+"""
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from ..utils.constants import PACKET_TRACE_SIZE, PACKET_LOG_SAMPLE_DEFAULT, TRACE_RX
+
+logger = logging.getLogger("app.lib.dwarfii_api.packets")
+
+
+class PacketTrace:
+    """
+    Die letzten N Paket-Header einer Verbindung
+
+    Einträge: (Zeit, Richtung, module_id, cmd, type, Bytes)
+
+    Logging pro Paket (strukturiert über extra=):
+    - DEBUG aktiv: jedes Paket
+    - sample_every=N: jedes N-te Paket auf INFO (0 = aus)
+    """
+
+    def __init__(self, size: int = PACKET_TRACE_SIZE, sample_every: int = PACKET_LOG_SAMPLE_DEFAULT):
+        self.entries = deque(maxlen=size)
+        self.sample_every = sample_every
+        self.count = 0
+
+    def resize(self, size: int):
+        """Puffergröße ändern (neueste Einträge bleiben erhalten)"""
+        if size != self.entries.maxlen:
+            self.entries = deque(self.entries, maxlen=size)
+
+    def record(self, direction: str, module_id: int, cmd: int, msg_type: int, length: int):
+        """Paket-Header merken (O(1), ohne String-Formatierung)"""
+        self.entries.append((time.time(), direction, module_id, cmd, msg_type, length))
+        self.count += 1
+        if self.sample_every and self.count % self.sample_every == 0:
+            level = logging.INFO
+        elif logger.isEnabledFor(logging.DEBUG):
+            level = logging.DEBUG
+        else:
+            return
+        logger.log(
+            level,
+            "📦 %s Module=%d CMD=%d Type=%d (%d bytes)",
+            "⬅️" if direction == TRACE_RX else "➡️", module_id, cmd, msg_type, length,
+            extra={"dwarf_packet": {
+                "direction": direction, "module_id": module_id, "cmd": cmd,
+                "type": msg_type, "bytes": length
+            }}
+        )
+
+    def dump(
+        self,
+        limit: Optional[int] = None,
+        module_id: Optional[int] = None,
+        cmd: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Einträge (älteste zuerst), optional gefiltert und auf die letzten limit begrenzt"""
+        entries = [
+            entry for entry in self.entries
+            if (module_id is None or entry[2] == module_id) and (cmd is None or entry[3] == cmd)
+        ]
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return [
+            {"time": timestamp, "direction": direction, "module_id": module, "cmd": command, "type": msg_type, "bytes": length}
+            for timestamp, direction, module, command, msg_type, length in entries
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {"recorded": self.count, "buffered": len(self.entries), "size": self.entries.maxlen, "sample_every": self.sample_every}
@@ -25,8 +25,15 @@ async def lifespan(app: FastAPI):
     # Startup
     await init_db()
     yield
-    # Shutdown
-    pass
+    # Shutdown: Sequenzen beenden, laufende Gerätebefehle abwarten, dann Verbindungen (WebSocket + HTTP) schließen
+    from .lib.dwarf_connection import connection_manager
+    from .lib.dwarfii_sequence import sequence_manager
+    from .services.dwarf_client import http_clients
+    from .services.thumbnail_generator import thumbnail_generator
+    await sequence_manager.shutdown()
+    await thumbnail_generator.close()
+    await connection_manager.drain(settings.dwarf_pool_drain_timeout)
+    await http_clients.close_all()
 
 
 app = FastAPI(
@@ -48,7 +55,7 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
 # API-Router
-from .api import device, camera, album, astro, focus, motor, system, scanner, tracking, panorama, camera_params
+from .api import device, camera, album, astro, focus, motor, system, scanner, tracking, panorama, camera_params, sequence
 app.include_router(device.router, prefix="/api/device", tags=["device"])
 app.include_router(camera.router, prefix="/api/camera", tags=["camera"])
 app.include_router(camera_params.router, prefix="/api/camera/params", tags=["camera-params"])
@@ -60,6 +67,7 @@ app.include_router(system.router, prefix="/api/system", tags=["system"])
 app.include_router(scanner.router, prefix="/api/scanner", tags=["scanner"])
 app.include_router(tracking.router, prefix="/api/tracking", tags=["tracking"])
 app.include_router(panorama.router, prefix="/api/panorama", tags=["panorama"])
+app.include_router(sequence.router, prefix="/api/sequence", tags=["sequence"])
 
 
 @app.get("/")
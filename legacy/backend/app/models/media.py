@@ -1,21 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
 
 
 class Media(Base):
-    """Medien-Datei"""
+    """
+    Medien-Datei
+    Lokaler Index des Geräte-Albums (services/album_index.py):
+    created_at = modificationTime vom Gerät, info = Original-Eintrag aus mediaInfos
+    """
     __tablename__ = "media"
+    __table_args__ = (
+        UniqueConstraint("device_ip", "file_path", name="uq_media_device_path"),
+        # Keyset-Paginierung: neueste zuerst, optional pro Typ
+        Index("ix_media_device_created", "device_ip", "created_at", "file_path"),
+        Index("ix_media_device_type_created", "device_ip", "media_type", "created_at", "file_path"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=True)
+    device_ip = Column(String, nullable=False)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=True, index=True)
     media_type = Column(Integer, nullable=False)  # 0: Alle, 1: Foto, 2: Video, etc.
     file_name = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     thumbnail_path = Column(String, nullable=True)
     file_size = Column(String, nullable=True)
+    info = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    synced_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
     session = relationship("Session", backref="media")
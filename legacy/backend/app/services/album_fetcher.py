@@ -0,0 +1,145 @@
+"""
+DWARF II Album-Fetcher
+Liest das Album parallel in Seiten: mediaCounts zuerst, daraus die Seiten,
+dann bis zu ALBUM_FETCH_CONCURRENCY gleichzeitige mediaInfos-Abfragen. Die
+Seitengröße passt sich der Antwortzeit des Geräts an.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .dwarf_client import DwarfHTTPClient
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+
+class AlbumFetcher:
+    """
+    Paralleles, seitenweises Lesen des Albums eines Geräts
+
+    Seiten werden in Geräte-Reihenfolge (neueste zuerst) geliefert, auch wenn
+    spätere Seiten früher ankommen. Seitengrößen sind Zweierpotenz-Vielfache
+    von ALBUM_FETCH_PAGE_SIZE_MIN, damit jede Seite als pageIndex * pageSize
+    adressierbar bleibt, wenn die Größe unterwegs wechselt.
+
+    Verwendung:
+        fetcher = AlbumFetcher(http_clients.get(ip))
+        async for item in fetcher.iter_items(MEDIA_TYPE_ASTRO):
+            ...
+    """
+
+    def __init__(
+        self,
+        client: DwarfHTTPClient,
+        concurrency: int = ALBUM_FETCH_CONCURRENCY,
+        page_size: int = ALBUM_FETCH_PAGE_SIZE_START,
+        target_latency: float = ALBUM_FETCH_TARGET_LATENCY,
+        retries: int = ALBUM_FETCH_RETRIES
+    ):
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.page_size = page_size
+        self.target_latency = target_latency
+        self.retries = retries
+        self.requests = 0
+        self.failures = 0
+
+    async def counts(self) -> Dict[int, int]:
+        """Anzahl pro Medientyp (MEDIA_TYPE_ALL = gesamt)"""
+        response = await self.client.get_media_counts()
+        self.requests += 1
+        if response.get("code") != 0:
+            raise RuntimeError(f"mediaCounts fehlgeschlagen (code={response.get('code')})")
+        return {item["mediaType"]: item["count"] for item in response.get("data") or []}
+
+    async def iter_pages(self, media_type: int, total: Optional[int] = None) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Seiten als (Offset, Einträge) in Geräte-Reihenfolge
+
+        total: Anzahl laut mediaCounts (None = vorher abfragen). Eine kurze
+        Seite vor dem Ende (Dateien inzwischen gelöscht) beendet den Durchlauf.
+        """
+        if total is None:
+            total = (await self.counts()).get(media_type, 0)
+
+        in_flight: Dict[asyncio.Task, Tuple[int, int]] = {}
+        results: Dict[int, Tuple[int, List[Dict[str, Any]]]] = {}
+        next_offset = 0
+        yield_offset = 0
+        try:
+            while yield_offset < total:
+                # Nachschieben, solange Slots frei und nicht zu viel ungelieferte Seiten gepuffert
+                while next_offset < total and len(in_flight) < self.concurrency and len(results) < self.concurrency:
+                    size = self._size_for(next_offset)
+                    task = asyncio.create_task(self._fetch(media_type, next_offset, size))
+                    in_flight[task] = (next_offset, size)
+                    next_offset += size
+
+                if yield_offset not in results:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        offset, size = in_flight.pop(task)
+                        results[offset] = (size, task.result())
+                    continue
+
+                size, items = results.pop(yield_offset)
+                yield yield_offset, items
+                if len(items) < size:
+                    break
+                yield_offset += size
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def iter_items(self, media_type: int, total: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Einträge einzeln in Geräte-Reihenfolge
+
+        Kommen während des Lesens neue Aufnahmen hinzu, verschieben sich die
+        Seiten - doppelt gelieferte Einträge werden übersprungen.
+        """
+        seen = set()
+        async for _, items in self.iter_pages(media_type, total):
+            for item in items:
+                file_path = item.get("filePath")
+                if file_path in seen:
+                    continue
+                seen.add(file_path)
+                yield item
+
+    def _size_for(self, offset: int) -> int:
+        """Größte Seitengröße <= page_size, an der offset ausgerichtet ist"""
+        size = self.page_size
+        while size > ALBUM_FETCH_PAGE_SIZE_MIN and offset % size:
+            size //= 2
+        return size
+
+    def _adapt(self, size: int, elapsed: float):
+        """Schnelle Antworten: größere Seiten; langsame: kleinere (Gerät entlasten)"""
+        if elapsed > self.target_latency:
+            self.page_size = max(self.page_size // 2, ALBUM_FETCH_PAGE_SIZE_MIN)
+        elif elapsed < self.target_latency / 2 and size >= self.page_size:
+            self.page_size = min(self.page_size * 2, ALBUM_FETCH_PAGE_SIZE_MAX)
+
+    async def _fetch(self, media_type: int, offset: int, size: int) -> List[Dict[str, Any]]:
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                response = await self.client.get_media_list(media_type=media_type, page_index=offset // size, page_size=size)
+                self.requests += 1
+                if response.get("code") != 0:
+                    raise RuntimeError(f"mediaInfos fehlgeschlagen (code={response.get('code')})")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                if attempt == self.retries:
+                    raise
+                self.page_size = max(self.page_size // 2, ALBUM_FETCH_PAGE_SIZE_MIN)
+                logger.warning(f"⚠️ Album-Seite {offset}+{size} von {self.client.ip}: {e} - neuer Versuch")
+                await asyncio.sleep(0.2 * (attempt + 1))
+                continue
+            self._adapt(size, time.perf_counter() - start)
+            return response.get("data") or []
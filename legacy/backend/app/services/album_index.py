@@ -0,0 +1,391 @@
+"""
+DWARF II Album-Index
+Spiegelt die Album-Metadaten des Geräts in die Tabelle media: Vollabgleich
+beim ersten Verbinden, danach inkrementell bei CMD_NOTIFY_ALBUM_UPDATE.
+/api/album/list und /counts lesen aus dem Index (Keyset-Paginierung), statt
+bei jedem Seitenaufruf mediaInfos am Gerät abzufragen.
+"""
+import asyncio
+import base64
+import calendar
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from .album_fetcher import AlbumFetcher
+from .dwarf_client import DwarfHTTPClient, http_clients
+from ..config import settings
+from ..database import async_session_maker
+from ..models.media import Media
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+ALBUM_MEDIA_TYPES = (MEDIA_TYPE_PHOTO, MEDIA_TYPE_VIDEO, MEDIA_TYPE_BURST, MEDIA_TYPE_ASTRO, MEDIA_TYPE_PANORAMA)
+_UPDATED_COLUMNS = ("media_type", "file_name", "thumbnail_path", "file_size", "info", "created_at", "synced_at")
+
+
+def _to_datetime(timestamp) -> datetime:
+    return datetime.utcfromtimestamp(int(timestamp or 0))
+
+
+def encode_cursor(created_at: datetime, file_path: str) -> str:
+    """Position nach dem letzten Eintrag einer Seite (undurchsichtig für Clients)"""
+    raw = f"{calendar.timegm(created_at.timetuple())}|{file_path}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Raises:
+        ValueError: Cursor ungültig
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, file_path = raw.split("|", 1)
+        return _to_datetime(int(timestamp)), file_path
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Ungültiger Cursor: {cursor}") from e
+
+
+def _row(ip: str, media_type: int, item: Dict[str, Any], stamp: datetime) -> Dict[str, Any]:
+    """mediaInfos-Eintrag -> Zeile (Typ aus der Abfrage, nicht aus dem Eintrag)"""
+    file_size = item.get("fileSize")
+    return {
+        "device_ip": ip,
+        "media_type": media_type,
+        "file_name": item.get("fileName") or "",
+        "file_path": item["filePath"],
+        "thumbnail_path": item.get("thumbnailPath"),
+        "file_size": None if file_size is None else str(file_size),
+        "info": item,
+        "created_at": _to_datetime(item.get("modificationTime")),
+        "synced_at": stamp,
+    }
+
+
+class AlbumIndex:
+    """
+    Lokaler Album-Index pro Gerät
+
+    Abgleich pro Medientyp (Gerät liefert neueste zuerst):
+    - voll: alle Seiten parallel holen (AlbumFetcher), nicht mehr gesehene
+      Einträge löschen
+    - inkrementell: Seiten holen, bis bekannte Einträge auftauchen; stimmt die
+      Anzahl danach nicht mit mediaCounts überein (gelöschte Dateien), wird
+      der Typ voll abgeglichen
+
+    Abgleiche eines Geräts laufen nacheinander (Lock); Notifications werden
+    ALBUM_SYNC_DEBOUNCE Sekunden gesammelt (Serienaufnahmen).
+    """
+
+    def __init__(self):
+        self.synced_at: Dict[str, float] = {}  # ip -> monotonic() des letzten Abgleichs
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._pending: Dict[str, Set[int]] = {}
+        self._wakeup: Dict[str, asyncio.Event] = {}
+        self._subscriptions: Dict[str, Any] = {}
+        self._handlers: Dict[str, Any] = {}
+        self._tasks: Dict[str, List[asyncio.Task]] = {}
+
+    # ========================================================================
+    # Lesen (Endpoints)
+    # ========================================================================
+
+    async def ensure_synced(self, ip: str, fresh: bool = False):
+        """
+        Vor dem Lesen: beim ersten Mal voll abgleichen, ohne Notifications
+        (keine WebSocket-Verbindung) nach ALBUM_UNWATCHED_MAX_AGE inkrementell
+
+        Ist das Gerät nicht erreichbar, bleibt ein schon abgeglichener Index
+        lesbar (Fehler in stats["last_error"]); nur ohne Abgleich wird geworfen.
+        """
+        synced_at = self.synced_at.get(ip)
+        if not fresh and synced_at is not None:
+            if ip in self._handlers or time.monotonic() - synced_at < ALBUM_UNWATCHED_MAX_AGE:
+                return
+        started = time.monotonic()
+        async with self._lock(ip):
+            if self.synced_at.get(ip, 0.0) >= started:
+                return  # während des Wartens abgeglichen
+            try:
+                await self._sync(ip, {MEDIA_TYPE_ALL}, full=ip not in self.synced_at)
+            except Exception as e:
+                if ip not in self.synced_at:
+                    raise
+                self._stats(ip)["last_error"] = str(e)
+                logger.warning(f"⚠️ Album-Abgleich für {ip} fehlgeschlagen, liefere lokalen Index: {e}")
+
+    async def counts_by_type(self, ip: str) -> Dict[int, int]:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Media.media_type, func.count()).where(Media.device_ip == ip).group_by(Media.media_type)
+            )
+            return {media_type: count for media_type, count in result.all()}
+
+    async def counts(self, ip: str) -> List[Dict[str, int]]:
+        """Anzahl pro Typ im Format von /album/list/mediaCounts"""
+        by_type = await self.counts_by_type(ip)
+        return [{"mediaType": MEDIA_TYPE_ALL, "count": sum(by_type.values())}] + [
+            {"mediaType": media_type, "count": by_type.get(media_type, 0)} for media_type in ALBUM_MEDIA_TYPES
+        ]
+
+    async def list_page(
+        self,
+        ip: str,
+        media_type: int = MEDIA_TYPE_ALL,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        page_index: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Eine Seite (neueste zuerst) als mediaInfos-Einträge
+
+        cursor (next_cursor der vorigen Seite) nutzt den Index direkt;
+        page_index ohne cursor bleibt für alte Clients erhalten (OFFSET).
+
+        Returns:
+            (Einträge, next_cursor oder None auf der letzten Seite)
+
+        Raises:
+            ValueError: Cursor ungültig
+        """
+        stmt = select(Media.info, Media.created_at, Media.file_path).where(Media.device_ip == ip)
+        if media_type != MEDIA_TYPE_ALL:
+            stmt = stmt.where(Media.media_type == media_type)
+        if cursor:
+            stmt = stmt.where(tuple_(Media.created_at, Media.file_path) < tuple_(*decode_cursor(cursor)))
+        elif page_index:
+            stmt = stmt.offset(page_index * page_size)
+        stmt = stmt.order_by(Media.created_at.desc(), Media.file_path.desc()).limit(page_size + 1)
+
+        async with async_session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            last = rows[page_size - 1]
+            next_cursor = encode_cursor(last.created_at, last.file_path)
+        return [row.info for row in rows[:page_size]], next_cursor
+
+    async def remove(self, ip: str, file_paths: Iterable[str]):
+        """Einträge sofort entfernen (eigene Löschungen, Notification folgt)"""
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        async with async_session_maker() as session:
+            await session.execute(delete(Media).where(Media.device_ip == ip, Media.file_path.in_(file_paths)))
+            await session.commit()
+
+    # ========================================================================
+    # Abgleich
+    # ========================================================================
+
+    def _lock(self, ip: str) -> asyncio.Lock:
+        lock = self._locks.get(ip)
+        if lock is None:
+            lock = self._locks[ip] = asyncio.Lock()
+        return lock
+
+    def _stats(self, ip: str) -> Dict[str, Any]:
+        stats = self.stats.get(ip)
+        if stats is None:
+            stats = self.stats[ip] = {
+                "full_syncs": 0, "incremental_syncs": 0, "type_resyncs": 0,
+                "device_requests": 0, "rows_written": 0, "last_sync_ms": None, "last_error": None
+            }
+        return stats
+
+    async def _sync(self, ip: str, media_types: Set[int], full: bool):
+        """Abgleich der angegebenen Typen (MEDIA_TYPE_ALL = alle), Lock wird vom Aufrufer gehalten"""
+        stats = self._stats(ip)
+        start = time.perf_counter()
+        client = http_clients.get(ip)
+        response = await client.get_media_counts()
+        stats["device_requests"] += 1
+        if response.get("code") != 0:
+            raise RuntimeError(f"mediaCounts fehlgeschlagen (code={response.get('code')})")
+        device_counts = {
+            item["mediaType"]: item["count"] for item in response.get("data") or []
+            if item.get("mediaType") != MEDIA_TYPE_ALL
+        }
+        local_counts = await self.counts_by_type(ip)
+
+        if full or MEDIA_TYPE_ALL in media_types:
+            types = sorted(set(device_counts) | set(local_counts))
+        else:
+            types = sorted(media_types)
+        for media_type in types:
+            await self._sync_type(
+                ip, client, media_type, device_counts.get(media_type, 0), local_counts.get(media_type, 0), full
+            )
+
+        self.synced_at[ip] = time.monotonic()
+        stats["full_syncs" if full else "incremental_syncs"] += 1
+        stats["last_sync_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+        stats["last_error"] = None
+        logger.info(
+            f"🖼️ Album-Index {ip}: {'voll' if full else 'inkrementell'} abgeglichen "
+            f"({sum(device_counts.values())} Medien, {stats['last_sync_ms']:.0f} ms)"
+        )
+
+    async def _sync_type(
+        self, ip: str, client: DwarfHTTPClient, media_type: int, device_count: int, local_count: int, full: bool
+    ):
+        stamp = datetime.utcnow()
+        if device_count == 0:
+            if local_count:
+                await self._store(ip, media_type, [], stamp, replace=True)
+            return
+
+        if not full:
+            # Neue Einträge stehen vorne - holen, bis bekannte auftauchen
+            new_items = []
+            page_index = 0
+            while True:
+                items = await self._fetch_page(ip, client, media_type, page_index)
+                known = await self._known_paths(ip, [item.get("filePath") for item in items])
+                unknown = [item for item in items if item.get("filePath") not in known]
+                new_items.extend(unknown)
+                if len(unknown) < len(items) or len(items) < ALBUM_SYNC_PAGE_SIZE:
+                    break
+                page_index += 1
+            if local_count + len(new_items) == device_count:
+                await self._store(ip, media_type, new_items, stamp)
+                return
+            # Anzahl passt nicht (gelöschte Dateien): Typ voll abgleichen
+            self._stats(ip)["type_resyncs"] += 1
+
+        # Alle Seiten parallel holen und seitenweise schreiben, danach nicht mehr gesehene löschen
+        fetcher = AlbumFetcher(client)
+        async for _, items in fetcher.iter_pages(media_type, total=device_count):
+            await self._store(ip, media_type, items, stamp)
+        self._stats(ip)["device_requests"] += fetcher.requests
+        await self._store(ip, media_type, [], stamp, replace=True)
+
+    async def _fetch_page(self, ip: str, client: DwarfHTTPClient, media_type: int, page_index: int) -> List[Dict[str, Any]]:
+        response = await client.get_media_list(media_type=media_type, page_index=page_index, page_size=ALBUM_SYNC_PAGE_SIZE)
+        self._stats(ip)["device_requests"] += 1
+        if response.get("code") != 0:
+            raise RuntimeError(f"mediaInfos fehlgeschlagen (code={response.get('code')})")
+        return response.get("data") or []
+
+    async def _known_paths(self, ip: str, file_paths: List[str]) -> Set[str]:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Media.file_path).where(Media.device_ip == ip, Media.file_path.in_(file_paths))
+            )
+            return set(result.scalars().all())
+
+    async def _store(self, ip: str, media_type: int, items: List[Dict[str, Any]], stamp: datetime, replace: bool = False):
+        """Einträge einfügen/aktualisieren; replace: ältere Zeilen des Typs löschen"""
+        rows = [_row(ip, media_type, item, stamp) for item in items if item.get("filePath")]
+        async with async_session_maker() as session:
+            if rows:
+                stmt = insert(Media)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["device_ip", "file_path"],
+                    set_={column: stmt.excluded[column] for column in _UPDATED_COLUMNS}
+                )
+                await session.execute(stmt, rows)
+            if replace:
+                await session.execute(
+                    delete(Media).where(Media.device_ip == ip, Media.media_type == media_type, Media.synced_at < stamp)
+                )
+            await session.commit()
+        self._stats(ip)["rows_written"] += len(rows)
+
+    # ========================================================================
+    # Lifecycle (Notifications)
+    # ========================================================================
+
+    def request_sync(self, ip: str, media_type: int = MEDIA_TYPE_ALL):
+        """Abgleich vormerken (läuft nach ALBUM_SYNC_DEBOUNCE im Worker)"""
+        wakeup = self._wakeup.get(ip)
+        if wakeup is None:
+            return
+        self._pending.setdefault(ip, set()).add(media_type)
+        wakeup.set()
+
+    def attach(self, ip: str, ws_handler):
+        """An eine (neue) Verbindung hängen: Vollabgleich beim ersten Mal, dann Notifications"""
+        if not settings.dwarf_album_sync:
+            return
+        self.detach(ip)
+        subscription = ws_handler.events.subscribe(cmds=[CMD_NOTIFY_ALBUM_UPDATE], maxsize=64, name=f"album:{ip}")
+        self._subscriptions[ip] = subscription
+        self._wakeup[ip] = asyncio.Event()
+        self._tasks[ip] = [
+            asyncio.create_task(self._consume(ip, subscription)),
+            asyncio.create_task(self._worker(ip)),
+        ]
+
+        # Während eines Ausfalls verpasste Notifications: alle Typen prüfen
+        def on_connect_album(connected: bool):
+            if connected:
+                self.request_sync(ip)
+
+        ws_handler.register_connect_callback(f"album:{ip}", on_connect_album)
+        self._handlers[ip] = ws_handler
+        self.request_sync(ip)
+
+    def detach(self, ip: str):
+        """Von der Verbindung lösen (Index bleibt, gilt danach ALBUM_UNWATCHED_MAX_AGE)"""
+        ws_handler = self._handlers.pop(ip, None)
+        if ws_handler is not None:
+            ws_handler.unregister_connect_callback(f"album:{ip}")
+        subscription = self._subscriptions.pop(ip, None)
+        if subscription is not None:
+            subscription.close()
+        for task in self._tasks.pop(ip, []):
+            if not task.done():
+                task.cancel()
+        self._wakeup.pop(ip, None)
+        self._pending.pop(ip, None)
+
+    def subscription(self, ip: str):
+        """Eigenes Bus-Abonnement (zählt nicht als externer Abonnent)"""
+        return self._subscriptions.get(ip)
+
+    async def _consume(self, ip: str, subscription):
+        async for packet in subscription:
+            message = packet.message  # Decoder aus dwarfii_packet (CMD_NOTIFY_ALBUM_UPDATE)
+            if message is None:
+                logger.warning(f"⚠️ Album-Update von {ip} nicht dekodierbar ({len(packet.data)} Bytes) - übersprungen")
+                continue
+            logger.debug(f"🖼️ Album-Update {ip}: Typ {message.media_type}")
+            self.request_sync(ip, message.media_type)
+
+    async def _worker(self, ip: str):
+        wakeup = self._wakeup[ip]
+        while True:
+            await wakeup.wait()
+            await asyncio.sleep(ALBUM_SYNC_DEBOUNCE)
+            wakeup.clear()
+            media_types = self._pending.pop(ip, set()) or {MEDIA_TYPE_ALL}
+            try:
+                async with self._lock(ip):
+                    await self._sync(ip, media_types, full=ip not in self.synced_at)
+            except Exception as e:
+                self._stats(ip)["last_error"] = str(e)
+                logger.warning(f"⚠️ Album-Abgleich für {ip} fehlgeschlagen: {e}")
+
+    # ========================================================================
+    # Diagnose
+    # ========================================================================
+
+    def get_stats(self, ip: str) -> Dict[str, Any]:
+        synced_at = self.synced_at.get(ip)
+        return {
+            **self._stats(ip),
+            "watched": ip in self._handlers,
+            "age_s": None if synced_at is None else round(time.monotonic() - synced_at, 1),
+        }
+
+
+# Globale Instanz
+album_index = AlbumIndex()
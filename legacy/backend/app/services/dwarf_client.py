@@ -2,12 +2,38 @@
 DWARF II HTTP-Client
 Kommunikation über HTTP REST API
 """
+import logging
 import httpx
-from typing import Optional, Dict, Any, AsyncIterator
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+from ..config import settings
+from ..utils.constants import HTTP_CLASS_METADATA, HTTP_CLASS_BULK, HTTP_CLIENT_CLASSES, HTTP_STREAM_READ_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+def _create_client(endpoint_class: str) -> httpx.AsyncClient:
+    """httpx-Client mit Keep-Alive-Pool und Timeouts der Endpoint-Klasse"""
+    config = HTTP_CLIENT_CLASSES[endpoint_class]
+    limits = httpx.Limits(
+        max_connections=config["max_connections"],
+        max_keepalive_connections=config["max_connections"],
+        keepalive_expiry=settings.dwarf_http_keepalive_expiry
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config["read"], connect=config["connect"], pool=config["pool"]),
+        # retries: nur Verbindungsaufbau erneut versuchen (schwaches WLAN des Geräts)
+        transport=httpx.AsyncHTTPTransport(limits=limits, retries=1)
+    )
 
 
 class DwarfHTTPClient:
-    """HTTP-Client für DWARF II Teleskop"""
+    """
+    HTTP-Client für DWARF II Teleskop
+
+    Zwei Verbindungs-Pools pro Gerät: client (Metadaten) und bulk (Downloads,
+    Uploads, Streams). Router holen geteilte Instanzen über http_clients.get()
+    statt pro Request einen neuen Client (und neue TCP-Verbindungen) zu öffnen.
+    """
     
     def __init__(self, ip: str, port: int = 8082, jpg_port: int = 8092):
         self.ip = ip
@@ -15,11 +41,20 @@ class DwarfHTTPClient:
         self.jpg_port = jpg_port
         self.base_url = f"http://{ip}:{port}"
         self.jpg_url = f"http://{ip}:{jpg_port}"
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = _create_client(HTTP_CLASS_METADATA)
+        self.bulk = _create_client(HTTP_CLASS_BULK)
+        self.stream_timeout = httpx.Timeout(
+            HTTP_STREAM_READ_TIMEOUT, connect=HTTP_CLIENT_CLASSES[HTTP_CLASS_BULK]["connect"]
+        )
+    
+    @property
+    def is_closed(self) -> bool:
+        return self.client.is_closed or self.bulk.is_closed
     
     async def close(self):
-        """Client schließen"""
+        """Client schließen (beide Pools)"""
         await self.client.aclose()
+        await self.bulk.aclose()
     
     # ========================================================================
     # Geräte-Informationen
@@ -73,7 +108,7 @@ class DwarfHTTPClient:
         """Firmware hochladen"""
         files = {"fiwmwareFileName": firmware_file}
         data = {"md5": md5}
-        response = await self.client.post(
+        response = await self.bulk.post(
             f"{self.base_url}/uploadFirmware",
             files=files,
             data=data
@@ -143,9 +178,25 @@ class DwarfHTTPClient:
     
     async def download_log(self) -> bytes:
         """Log-Datei herunterladen"""
-        response = await self.client.get(f"{self.base_url}/downloadLog")
+        response = await self.bulk.get(f"{self.base_url}/downloadLog")
         return response.content
     
+    # ========================================================================
+    # Album-Dateien
+    # ========================================================================
+    
+    def get_file_url(self, path: str) -> str:
+        """URL einer Album-Datei (filePath/thumbnailPath aus mediaInfos)"""
+        return f"{self.jpg_url}{path}"
+    
+    async def get_file(self, path: str, endpoint_class: str = HTTP_CLASS_BULK) -> httpx.Response:
+        """
+        Album-Datei herunterladen (Thumbnails: endpoint_class=metadata,
+        damit sie nicht hinter großen Downloads warten)
+        """
+        client = self.client if endpoint_class == HTTP_CLASS_METADATA else self.bulk
+        return await client.get(self.get_file_url(path))
+    
     # ========================================================================
     # Bild-Streams
     # ========================================================================
@@ -161,7 +212,7 @@ class DwarfHTTPClient:
         endpoint = "mainstream" if camera == "tele" else "secondstream"
         url = f"{self.jpg_url}/{endpoint}"
         
-        async with self.client.stream("GET", url) as response:
+        async with self.bulk.stream("GET", url, timeout=self.stream_timeout) as response:
             async for chunk in response.aiter_bytes():
                 yield chunk
     
@@ -176,3 +227,55 @@ class DwarfHTTPClient:
         """
         channel = "ch0" if camera == "tele" else "ch1"
         return f"rtsp://{self.ip}/{channel}/stream0"
+
+
+# ============================================================================
+# Registry: ein geteilter Client pro Gerät
+# ============================================================================
+
+class DwarfHTTPClientPool:
+    """
+    Geteilte DwarfHTTPClient-Instanzen pro (IP, Port)
+
+    Verbindungen bleiben über Requests hinweg offen (Keep-Alive), statt bei
+    jedem Request neu aufgebaut zu werden. Geschlossen wird im App-Lifespan
+    (close_all) - Router rufen close() auf geteilten Clients nicht auf.
+    """
+    
+    def __init__(self):
+        self.clients: Dict[Tuple[str, int], DwarfHTTPClient] = {}
+        self.stats = {"created": 0, "reused": 0}
+    
+    def get(self, ip: str, port: Optional[int] = None) -> DwarfHTTPClient:
+        """Geteilten Client für das Gerät holen (bei Bedarf anlegen)"""
+        key = (ip, port or settings.dwarf_http_port)
+        client = self.clients.get(key)
+        if client is not None and not client.is_closed:
+            self.stats["reused"] += 1
+            return client
+        client = DwarfHTTPClient(ip, key[1], settings.dwarf_jpg_port)
+        self.clients[key] = client
+        self.stats["created"] += 1
+        logger.info(f"🌐 HTTP-Client für {ip}:{key[1]} angelegt")
+        return client
+    
+    async def close(self, ip: str):
+        """Alle Clients eines Geräts schließen"""
+        for key in [key for key in self.clients if key[0] == ip]:
+            await self.clients.pop(key).close()
+    
+    async def close_all(self):
+        """Alle Clients schließen (Shutdown)"""
+        clients = list(self.clients.values())
+        self.clients.clear()
+        for client in clients:
+            await client.close()
+        if clients:
+            logger.info(f"🌐 {len(clients)} HTTP-Client(s) geschlossen")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "devices": [f"{ip}:{port}" for ip, port in self.clients]}
+
+
+# Globale Instanz
+http_clients = DwarfHTTPClientPool()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: notify.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cnotify.proto\x12\x05\x64warf\"l\n\x18ResNotifyPictureMatching\x12\t\n\x01x\x18\x01 \x01(\r\x12\t\n\x01y\x18\x02 \x01(\r\x12\r\n\x05width\x18\x03 \x01(\r\x12\x0e\n\x06height\x18\x04 \x01(\r\x12\r\n\x05value\x18\x05 \x01(\x01\x12\x0c\n\x04\x63ode\x18\x06 \x01(\x05\"\x1e\n\rComResWithInt\x12\r\n\x05value\x18\x01 \x01(\x05\"O\n\x13ResNotifySDcardInfo\x12\x16\n\x0e\x61vailable_size\x18\x01 \x01(\r\x12\x12\n\ntotal_size\x18\x02 \x01(\r\x12\x0c\n\x04\x63ode\x18\x03 \x01(\x05\"*\n\x13ResNotifyRecordTime\x12\x13\n\x0brecord_time\x18\x01 \x01(\x05\"S\n\x19ResNotifyTimeLapseOutTime\x12\x10\n\x08interval\x18\x01 \x01(\x05\x12\x10\n\x08out_time\x18\x02 \x01(\x05\x12\x12\n\ntotal_time\x18\x03 \x01(\x05\"?\n\x17ResNotifyOperationState\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState\"K\n\x1fResNotifyProgressCaptureRawDark\x12\x10\n\x08progress\x18\x01 \x01(\x05\x12\x16\n\x0eremaining_time\x18\x02 \x01(\x05\"\xc3\x01\n\'ResNotifyProgressCaptureRawLiveStacking\x12\x13\n\x0btotal_count\x18\x01 \x01(\x05\x12\x19\n\x11update_count_type\x18\x02 \x01(\x05\x12\x15\n\rcurrent_count\x18\x03 \x01(\x05\x12\x15\n\rstacked_count\x18\x04 \x01(\x05\x12\x11\n\texp_index\x18\x05 \x01(\x05\x12\x12\n\ngain_index\x18\x06 \x01(\x05\x12\x13\n\x0btarget_name\x18\x07 \x01(\t\"_\n\x1eResNotifyStateAstroCalibration\x12 \n\x05state\x18\x01 \x01(\x0e\x32\x11.dwarf.AstroState\x12\x1b\n\x13plate_solving_times\x18\x02 \x01(\x05\";\n\x17ResNotifyStateAstroGoto\x12 \n\x05state\x18\x01 \x01(\x0e\x32\x11.dwarf.AstroState\"X\n\x1bResNotifyStateAstroTracking\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState\x12\x13\n\x0btarget_name\x18\x02 \x01(\t\"n\n\"ResNotifyStateAstroTrackingSpecial\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState\x12\x13\n\x0btarget_name\x18\x02 \x01(\t\x12\r\n\x05index\x18\x03 \x01(\x05\"x\n\x0b\x43ommonParam\x12\x0f\n\x07hasAuto\x18\x01 \x01(\x08\x12\x11\n\tauto_mode\x18\x02 \x01(\x05\x12\n\n\x02id\x18\x03 \x01(\x05\x12\x12\n\nmode_index\x18\x04 \x01(\x05\x12\r\n\x05index\x18\x05 \x01(\x05\x12\x16\n\x0e\x63ontinue_value\x18\x06 \x01(\x01\"3\n\x0eResNotifyParam\x12!\n\x05param\x18\x01 \x03(\x0b\x32\x12.dwarf.CommonParam\"V\n\x19ResNotifyCamFunctionState\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState\x12\x13\n\x0b\x66unction_id\x18\x02 \x01(\r\"F\n\x16ResNotifyBurstProgress\x12\x13\n\x0btotal_count\x18\x01 \x01(\r\x12\x17\n\x0f\x63ompleted_count\x18\x02 \x01(\r\"I\n\x19ResNotifyPanoramaProgress\x12\x13\n\x0btotal_count\x18\x01 \x01(\x05\x12\x17\n\x0f\x63ompleted_count\x18\x02 \x01(\x05\"\"\n\x11ResNotifyRgbState\x12\r\n\x05state\x18\x01 \x01(\x05\"\'\n\x16ResNotifyPowerIndState\x12\r\n\x05state\x18\x01 \x01(\x05\"&\n\x16ResNotifyHostSlaveMode\x12\x0c\n\x04mode\x18\x01 \x01(\x05\"!\n\x11ResNotifyMTPState\x12\x0c\n\x04mode\x18\x01 \x01(\x05\"N\n\x14ResNotifyTrackResult\x12\t\n\x01x\x18\x01 \x01(\x05\x12\t\n\x01y\x18\x02 \x01(\x05\x12\t\n\x01w\x18\x03 \x01(\x05\x12\t\n\x01h\x18\x04 \x01(\x05\x12\n\n\x02id\x18\x05 \x01(\x05\"I\n\x19ResNotifyMultiTrackResult\x12,\n\x07results\x18\x01 \x03(\x0b\x32\x1b.dwarf.ResNotifyTrackResult\" \n\x10ResNotifyCPUMode\x12\x0c\n\x04mode\x18\x01 \x01(\x05\"\x13\n\x11ResNotifyPowerOff\"*\n\x14ResNotifyAlbumUpdate\x12\x12\n\nmedia_type\x18\x01 \x01(\x05\"A\n\x18ResNotifyStateSentryMode\x12%\n\x05state\x18\x01 \x01(\x0e\x32\x16.dwarf.SentryModeState\"B\n\x1aResNotifyOneClickGotoState\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState\":\n\x13ResNotifyStreamType\x12\x13\n\x0bstream_type\x18\x01 \x01(\x05\x12\x0e\n\x06\x63\x61m_id\x18\x02 \x01(\x05\"\xa7\x01\n\x17ResNotifyEqSolvingState\x12\x33\n\x04step\x18\x01 \x01(\x0e\x32%.dwarf.ResNotifyEqSolvingState.Action\x12$\n\x05state\x18\x02 \x01(\x0e\x32\x15.dwarf.OperationState\"1\n\x06\x41\x63tion\x12\x0f\n\x0bUNSPECIFIED\x10\x00\x12\t\n\x05\x46OCUS\x10\x01\x12\x0b\n\x07SOLVING\x10\x02\"`\n\x1dResNotifyLongExpPhotoProgress\x12\x13\n\x0b\x66unction_id\x18\x01 \x01(\r\x12\x12\n\ntotal_time\x18\x02 \x01(\x01\x12\x16\n\x0e\x65xposured_time\x18\x03 \x01(\x01\"9\n\x14ResNotifyTemperature\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x13\n\x0btemperature\x18\x02 \x01(\x05\"@\n\x18ResNotifySkySeacherState\x12$\n\x05state\x18\x01 \x01(\x0e\x32\x15.dwarf.OperationState*\x82\x01\n\x0eOperationState\x12\x18\n\x14OPERATION_STATE_IDLE\x10\x00\x12\x1b\n\x17OPERATION_STATE_RUNNING\x10\x01\x12\x1c\n\x18OPERATION_STATE_STOPPING\x10\x02\x12\x1b\n\x17OPERATION_STATE_STOPPED\x10\x03*\x8d\x01\n\nAstroState\x12\x14\n\x10\x41STRO_STATE_IDLE\x10\x00\x12\x17\n\x13\x41STRO_STATE_RUNNING\x10\x01\x12\x18\n\x14\x41STRO_STATE_STOPPING\x10\x02\x12\x17\n\x13\x41STRO_STATE_STOPPED\x10\x03\x12\x1d\n\x19\x41STRO_STATE_PLATE_SOLVING\x10\x04*\xc8\x01\n\x0fSentryModeState\x12\x1a\n\x16SENTRY_MODE_STATE_IDLE\x10\x00\x12\x1a\n\x16SENTRY_MODE_STATE_INIT\x10\x01\x12\x1c\n\x18SENTRY_MODE_STATE_DETECT\x10\x02\x12\x1b\n\x17SENTRY_MODE_STATE_TRACK\x10\x03\x12\"\n\x1eSENTRY_MODE_STATE_TRACK_FINISH\x10\x04\x12\x1e\n\x1aSENTRY_MODE_STATE_STOPPING\x10\x05\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'notify_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _OPERATIONSTATE._serialized_start=2480
+  _OPERATIONSTATE._serialized_end=2610
+  _ASTROSTATE._serialized_start=2613
+  _ASTROSTATE._serialized_end=2754
+  _SENTRYMODESTATE._serialized_start=2757
+  _SENTRYMODESTATE._serialized_end=2957
+  _RESNOTIFYPICTUREMATCHING._serialized_start=23
+  _RESNOTIFYPICTUREMATCHING._serialized_end=131
+  _COMRESWITHINT._serialized_start=133
+  _COMRESWITHINT._serialized_end=163
+  _RESNOTIFYSDCARDINFO._serialized_start=165
+  _RESNOTIFYSDCARDINFO._serialized_end=244
+  _RESNOTIFYRECORDTIME._serialized_start=246
+  _RESNOTIFYRECORDTIME._serialized_end=288
+  _RESNOTIFYTIMELAPSEOUTTIME._serialized_start=290
+  _RESNOTIFYTIMELAPSEOUTTIME._serialized_end=373
+  _RESNOTIFYOPERATIONSTATE._serialized_start=375
+  _RESNOTIFYOPERATIONSTATE._serialized_end=438
+  _RESNOTIFYPROGRESSCAPTURERAWDARK._serialized_start=440
+  _RESNOTIFYPROGRESSCAPTURERAWDARK._serialized_end=515
+  _RESNOTIFYPROGRESSCAPTURERAWLIVESTACKING._serialized_start=518
+  _RESNOTIFYPROGRESSCAPTURERAWLIVESTACKING._serialized_end=713
+  _RESNOTIFYSTATEASTROCALIBRATION._serialized_start=715
+  _RESNOTIFYSTATEASTROCALIBRATION._serialized_end=810
+  _RESNOTIFYSTATEASTROGOTO._serialized_start=812
+  _RESNOTIFYSTATEASTROGOTO._serialized_end=871
+  _RESNOTIFYSTATEASTROTRACKING._serialized_start=873
+  _RESNOTIFYSTATEASTROTRACKING._serialized_end=961
+  _RESNOTIFYSTATEASTROTRACKINGSPECIAL._serialized_start=963
+  _RESNOTIFYSTATEASTROTRACKINGSPECIAL._serialized_end=1073
+  _COMMONPARAM._serialized_start=1075
+  _COMMONPARAM._serialized_end=1195
+  _RESNOTIFYPARAM._serialized_start=1197
+  _RESNOTIFYPARAM._serialized_end=1248
+  _RESNOTIFYCAMFUNCTIONSTATE._serialized_start=1250
+  _RESNOTIFYCAMFUNCTIONSTATE._serialized_end=1336
+  _RESNOTIFYBURSTPROGRESS._serialized_start=1338
+  _RESNOTIFYBURSTPROGRESS._serialized_end=1408
+  _RESNOTIFYPANORAMAPROGRESS._serialized_start=1410
+  _RESNOTIFYPANORAMAPROGRESS._serialized_end=1483
+  _RESNOTIFYRGBSTATE._serialized_start=1485
+  _RESNOTIFYRGBSTATE._serialized_end=1519
+  _RESNOTIFYPOWERINDSTATE._serialized_start=1521
+  _RESNOTIFYPOWERINDSTATE._serialized_end=1560
+  _RESNOTIFYHOSTSLAVEMODE._serialized_start=1562
+  _RESNOTIFYHOSTSLAVEMODE._serialized_end=1600
+  _RESNOTIFYMTPSTATE._serialized_start=1602
+  _RESNOTIFYMTPSTATE._serialized_end=1635
+  _RESNOTIFYTRACKRESULT._serialized_start=1637
+  _RESNOTIFYTRACKRESULT._serialized_end=1715
+  _RESNOTIFYMULTITRACKRESULT._serialized_start=1717
+  _RESNOTIFYMULTITRACKRESULT._serialized_end=1790
+  _RESNOTIFYCPUMODE._serialized_start=1792
+  _RESNOTIFYCPUMODE._serialized_end=1824
+  _RESNOTIFYPOWEROFF._serialized_start=1826
+  _RESNOTIFYPOWEROFF._serialized_end=1845
+  _RESNOTIFYALBUMUPDATE._serialized_start=1847
+  _RESNOTIFYALBUMUPDATE._serialized_end=1889
+  _RESNOTIFYSTATESENTRYMODE._serialized_start=1891
+  _RESNOTIFYSTATESENTRYMODE._serialized_end=1956
+  _RESNOTIFYONECLICKGOTOSTATE._serialized_start=1958
+  _RESNOTIFYONECLICKGOTOSTATE._serialized_end=2024
+  _RESNOTIFYSTREAMTYPE._serialized_start=2026
+  _RESNOTIFYSTREAMTYPE._serialized_end=2084
+  _RESNOTIFYEQSOLVINGSTATE._serialized_start=2087
+  _RESNOTIFYEQSOLVINGSTATE._serialized_end=2254
+  _RESNOTIFYEQSOLVINGSTATE_ACTION._serialized_start=2205
+  _RESNOTIFYEQSOLVINGSTATE_ACTION._serialized_end=2254
+  _RESNOTIFYLONGEXPPHOTOPROGRESS._serialized_start=2256
+  _RESNOTIFYLONGEXPPHOTOPROGRESS._serialized_end=2352
+  _RESNOTIFYTEMPERATURE._serialized_start=2354
+  _RESNOTIFYTEMPERATURE._serialized_end=2411
+  _RESNOTIFYSKYSEACHERSTATE._serialized_start=2413
+  _RESNOTIFYSKYSEACHERSTATE._serialized_end=2477
+# @@protoc_insertion_point(module_scope)
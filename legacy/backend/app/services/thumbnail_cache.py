@@ -0,0 +1,279 @@
+"""
+DWARF II Thumbnail-Cache
+Inhaltsadressierter Platten-Cache für Album-Thumbnails. Blobs liegen unter
+objects/<sha256[:2]>/<sha256>, Verweise (Gerät + thumbnailPath) unter
+refs/<key[:2]>/<key> und enthalten nur den Hash - gleiche Bilder (z.B. dasselbe
+Gerät über AP- und STA-IP) liegen einmal auf der Platte. Größenlimit mit
+LRU-Verdrängung; gleichzeitige Anfragen für dasselbe Thumbnail teilen sich
+einen Download.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.constants import THUMBNAIL_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+def _write_atomic(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _remove(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ThumbnailCache:
+    """
+    Thumbnails auf der Platte, begrenzt auf max_bytes
+
+    LRU-Reihenfolge = Reihenfolge in _refs (älteste zuerst); beim Start aus
+    den Änderungszeiten der Verweis-Dateien wiederhergestellt (Treffer
+    setzen sie per utime neu). Ein Blob wird gelöscht, wenn kein Verweis
+    mehr auf ihn zeigt.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "joined": 0, "deduplicated": 0, "evicted": 0, "uncacheable": 0}
+        self._refs: "OrderedDict[str, str]" = OrderedDict()  # Verweis -> sha256
+        self._blobs: Dict[str, int] = {}  # sha256 -> Bytes
+        self._refcount: Dict[str, int] = {}
+        self._fetching: Dict[str, asyncio.Task] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def ref_key(ip: str, path: str, variant: str = "") -> str:
+        """variant trennt lokal erzeugte Vorschauen vom Thumbnail des Geräts"""
+        name = f"{ip}|{path}|{variant}" if variant else f"{ip}|{path}"
+        return hashlib.sha1(name.encode()).hexdigest()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.directory, "refs", key[:2], key)
+
+    # ========================================================================
+    # Lesen
+    # ========================================================================
+
+    async def lookup(self, ip: str, path: str, variant: str = "") -> Optional[str]:
+        """sha256 eines gecachten Thumbnails (für If-None-Match) ohne Datei zu lesen"""
+        await self._ensure_loaded()
+        return self._refs.get(self.ref_key(ip, path, variant))
+
+    async def read(self, ip: str, path: str, variant: str = "") -> Optional[Tuple[str, bytes]]:
+        """(sha256, Inhalt) nur aus dem Cache, None wenn nicht vorhanden"""
+        await self._ensure_loaded()
+        return await self._read_cached(self.ref_key(ip, path, variant))
+
+    async def _read_cached(self, key: str) -> Optional[Tuple[str, bytes]]:
+        digest = self._refs.get(key)
+        if digest is None:
+            return None
+        try:
+            content = await asyncio.to_thread(_read, self._blob_path(digest))
+        except FileNotFoundError:
+            # von außen gelöscht: Verweis entfernen, neu laden
+            await asyncio.to_thread(_remove, self._drop_ref(key))
+            return None
+        self._touch(key)
+        self.stats["hits"] += 1
+        return digest, content
+
+    async def get(
+        self,
+        ip: str,
+        path: str,
+        fetch: Callable[[], Awaitable[bytes]],
+        variant: str = ""
+    ) -> Tuple[str, bytes]:
+        """
+        Thumbnail aus dem Cache oder über fetch() vom Gerät
+
+        Der Download läuft als eigener Task: bricht ein wartender Client ab,
+        bekommen die übrigen trotzdem das Bild.
+
+        Returns:
+            (sha256, Inhalt)
+        """
+        await self._ensure_loaded()
+        key = self.ref_key(ip, path, variant)
+        cached = await self._read_cached(key)
+        if cached is not None:
+            return cached
+
+        task = self._fetching.get(key)
+        if task is not None:
+            self.stats["joined"] += 1
+        else:
+            task = asyncio.ensure_future(self._download(key, fetch))
+            self._fetching[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        return await asyncio.shield(task)
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        self._fetching.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # gilt als abgeholt, auch wenn alle Wartenden weg sind
+
+    async def _download(self, key: str, fetch: Callable[[], Awaitable[bytes]]) -> Tuple[str, bytes]:
+        content = await fetch()
+        digest = hashlib.sha256(content).hexdigest()
+        self.stats["misses"] += 1
+        if len(content) > THUMBNAIL_MAX_BYTES:
+            self.stats["uncacheable"] += 1
+            return digest, content
+
+        if digest in self._blobs:
+            self.stats["deduplicated"] += 1
+            await asyncio.to_thread(_write_atomic, self._ref_path(key), digest.encode())
+        else:
+            def write():
+                _write_atomic(self._blob_path(digest), content)
+                _write_atomic(self._ref_path(key), digest.encode())
+            await asyncio.to_thread(write)
+        stale = self._add_ref(key, digest, len(content))
+        if stale:
+            await asyncio.to_thread(_remove, stale)
+        await self._evict()
+        return digest, content
+
+    # ========================================================================
+    # LRU / Buchhaltung
+    # ========================================================================
+
+    def _add_ref(self, key: str, digest: str, size: int) -> List[str]:
+        """Verweis setzen; liefert die zu löschenden Dateien (alter Blob bei neuem Inhalt)"""
+        paths = []
+        if self._refs.get(key) not in (None, digest):
+            # die Verweis-Datei ist schon neu geschrieben, nur den alten Blob löschen
+            paths = [path for path in self._drop_ref(key) if path != self._ref_path(key)]
+        if key not in self._refs:
+            self._refcount[digest] = self._refcount.get(digest, 0) + 1
+        if digest not in self._blobs:
+            self._blobs[digest] = size
+            self.total_bytes += size
+        self._refs[key] = digest
+        self._refs.move_to_end(key)
+        return paths
+
+    def _drop_ref(self, key: str) -> List[str]:
+        """Verweis entfernen; liefert die zu löschenden Dateien"""
+        digest = self._refs.pop(key)
+        paths = [self._ref_path(key)]
+        self._refcount[digest] -= 1
+        if self._refcount[digest] <= 0:
+            del self._refcount[digest]
+            self.total_bytes -= self._blobs.pop(digest, 0)
+            paths.append(self._blob_path(digest))
+        return paths
+
+    def _touch(self, key: str):
+        self._refs.move_to_end(key)
+        try:
+            os.utime(self._ref_path(key))
+        except FileNotFoundError:
+            pass
+
+    async def _evict(self):
+        """Am längsten ungenutzte Verweise entfernen, bis das Limit eingehalten ist"""
+        paths = []
+        while self.total_bytes > self.max_bytes and len(self._refs) > 1:
+            key = next(iter(self._refs))
+            paths.extend(self._drop_ref(key))
+            self.stats["evicted"] += 1
+        if paths:
+            await asyncio.to_thread(_remove, paths)
+
+    async def clear(self):
+        paths = []
+        for key in list(self._refs):
+            paths.extend(self._drop_ref(key))
+        await asyncio.to_thread(_remove, paths)
+
+    # ========================================================================
+    # Start: Bestand von der Platte lesen
+    # ========================================================================
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                refs, orphans = await asyncio.to_thread(self._scan)
+                for key, digest, size in refs:
+                    self._add_ref(key, digest, size)
+                await asyncio.to_thread(_remove, orphans)
+                self._loaded = True
+                if refs:
+                    logger.info(f"🖼️ Thumbnail-Cache: {len(refs)} Einträge, {self.total_bytes / 1e6:.1f} MB")
+                await self._evict()
+
+    def _scan(self) -> Tuple[List[Tuple[str, str, int]], List[str]]:
+        """Verweise (nach letzter Nutzung sortiert) und verwaiste Dateien"""
+        refs = []
+        referenced = set()
+        broken = []
+        refs_dir = os.path.join(self.directory, "refs")
+        for root, _, files in os.walk(refs_dir):
+            for name in files:
+                ref_path = os.path.join(root, name)
+                try:
+                    digest = _read(ref_path).decode()
+                    size = os.path.getsize(self._blob_path(digest))
+                    mtime = os.path.getmtime(ref_path)
+                except (OSError, UnicodeDecodeError):
+                    broken.append(ref_path)  # halb geschrieben oder Blob fehlt
+                    continue
+                refs.append((mtime, name, digest, size))
+                referenced.add(digest)
+        orphans = broken
+        for root, _, files in os.walk(os.path.join(self.directory, "objects")):
+            orphans.extend(os.path.join(root, name) for name in files if name not in referenced)
+        refs.sort()
+        return [(key, digest, size) for _, key, digest, size in refs], orphans
+
+    # ========================================================================
+    # Diagnose
+    # ========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["hits"] + self.stats["misses"] + self.stats["joined"]
+        return {
+            **self.stats,
+            "entries": len(self._refs),
+            "blobs": len(self._blobs),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(self.stats["hits"] / requests, 3) if requests else None,
+        }
+
+
+# Globale Instanz
+thumbnail_cache = ThumbnailCache(
+    settings.dwarf_thumbnail_cache_dir,
+    int(settings.dwarf_thumbnail_cache_max_mb * 1024 * 1024)
+)
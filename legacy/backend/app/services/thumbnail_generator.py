@@ -0,0 +1,287 @@
+"""
+DWARF II Vorschau-Generator
+Serienaufnahmen liefert das Gerät ohne Thumbnail ("thumbnailPath": "", siehe
+dwarf_api_doc.txt 3.3.8). Statt dem Browser das Originalbild zu schicken, lädt
+der Generator es einmal, verkleinert es in einem Prozess-Pool und legt die
+Vorschau im Thumbnail-Cache ab. JPEGs werden im Draft-Modus geöffnet: der
+Decoder liefert direkt 1/2, 1/4 oder 1/8 der Auflösung, statt das volle Bild
+zu dekodieren und danach zu skalieren.
+
+Reihenfolge: direkte Abrufe zuerst, dann die Einträge der zuletzt angezeigten
+Album-Seite (in Anzeige-Reihenfolge), dann ältere Seiten. Nur vorgemerkte
+Vorschauen von Seiten, die nicht mehr angezeigt werden, fallen weg.
+Fehlt die Datei auf dem Gerät, wird das THUMBNAIL_MISSING_TTL Sekunden lang
+gemerkt, statt sie bei jeder Album-Liste erneut anzufordern.
+
+Pillow ist optional: ohne Pillow (oder mit DWARF_THUMBNAIL_WORKERS=0) ist
+der Generator nicht verfügbar, das Frontend zeigt dann das Typ-Symbol.
+"""
+import asyncio
+import heapq
+import io
+import itertools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional, siehe requirements.txt
+    Image = None
+
+from .dwarf_client import http_clients
+from .thumbnail_cache import thumbnail_cache
+from ..config import settings
+from ..utils.constants import *
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_REQUEST = 0  # Browser wartet auf genau dieses Bild
+PRIORITY_VISIBLE = 1  # auf einer angezeigten Album-Seite
+
+
+def render_thumbnail(content: bytes, size: int = THUMBNAIL_GENERATE_SIZE, quality: int = THUMBNAIL_GENERATE_QUALITY) -> bytes:
+    """Originalbild -> JPEG-Vorschau, längste Kante size (läuft im Prozess-Pool)"""
+    with Image.open(io.BytesIO(content)) as image:
+        # nur JPEG: Dekodieren in 1/2..1/8 der Auflösung, mindestens so groß wie die Vorschau
+        scale = size / max(image.size)
+        image.draft("RGB", (max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+        preview = ImageOps.exif_transpose(image)
+        preview.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if preview.mode != "RGB":
+            preview = preview.convert("RGB")
+        output = io.BytesIO()
+        preview.save(output, "JPEG", quality=quality)
+        return output.getvalue()
+
+
+def preview_source(item: Dict[str, Any]) -> Optional[str]:
+    """Datei, aus der für einen Album-Eintrag ohne Geräte-Thumbnail die Vorschau entsteht"""
+    if item.get("thumbnailPath"):
+        return None
+    images = item.get("images") or []
+    path = images[0].get("filePath") if images else item.get("filePath")
+    if path and path.lower().endswith(THUMBNAIL_GENERATE_IMAGE_TYPES):
+        return path
+    return None
+
+
+class _Job:
+    """Eine zu erzeugende Vorschau"""
+
+    __slots__ = ("ip", "path", "priority", "future", "started")
+
+    def __init__(self, ip: str, path: str, priority: tuple):
+        self.ip = ip
+        self.path = path
+        self.priority = priority
+        self.future = asyncio.get_running_loop().create_future()
+        self.started = False
+
+
+class ThumbnailGenerator:
+    """
+    Priorisierte Warteschlange vor einem ProcessPoolExecutor
+
+    Verwendung:
+        await thumbnail_generator.prioritize(ip, items)   # nach /api/album/list
+        digest, content = await thumbnail_generator.get(ip, path)
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.stats = {
+            "requested": 0, "prefetched": 0, "rendered": 0, "dropped": 0, "failed": 0, "missing": 0,
+            "source_bytes": 0, "preview_bytes": 0
+        }
+        self._jobs: Dict[Tuple[str, str], _Job] = {}
+        self._missing: Dict[Tuple[str, str], float] = {}  # (ip, path) -> gültig bis (monotonic)
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+        self._page = 0  # Zähler angezeigter Album-Seiten
+        self._ready: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def available(self) -> bool:
+        return Image is not None and self.workers > 0
+
+    async def get(self, ip: str, path: str) -> Tuple[str, bytes]:
+        """
+        Vorschau für path aus dem Cache oder als nächstes erzeugen
+
+        Raises:
+            FileNotFoundError: Datei auf dem Gerät nicht vorhanden
+        """
+        if self._is_missing(ip, path):
+            self.stats["missing"] += 1
+            raise FileNotFoundError(path)
+        cached = await thumbnail_cache.read(ip, path, THUMBNAIL_GENERATED_VARIANT)
+        if cached is not None:
+            return cached
+        self.stats["requested"] += 1
+        job = self._schedule(ip, path, (PRIORITY_REQUEST, 0, 0))
+        return await asyncio.shield(job.future)
+
+    async def prioritize(self, ip: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Vorschauen der gerade angezeigten Seite vormerken - vor allen älteren
+        Seiten; vorgemerkte Einträge von mehr als THUMBNAIL_PREFETCH_PAGES
+        Seiten zurück werden verworfen
+        """
+        if not self.available:
+            return 0
+        self._page += 1
+        self._forget_missing()
+        count = 0
+        for index, item in enumerate(items):
+            path = preview_source(item)
+            if path is None or (ip, path) in self._missing:
+                continue
+            if await thumbnail_cache.lookup(ip, path, THUMBNAIL_GENERATED_VARIANT) is not None:
+                continue
+            self._schedule(ip, path, (PRIORITY_VISIBLE, -self._page, index))
+            count += 1
+        self.stats["prefetched"] += count
+        self._drop_stale()
+        return count
+
+    # ========================================================================
+    # Warteschlange
+    # ========================================================================
+
+    def _schedule(self, ip: str, path: str, priority: tuple) -> _Job:
+        key = (ip, path)
+        job = self._jobs.get(key)
+        if job is None:
+            job = _Job(ip, path, priority)
+            self._jobs[key] = job
+        elif job.started or job.priority <= priority:
+            return job
+        else:
+            job.priority = priority  # vorziehen; alter Heap-Eintrag wird beim Entnehmen übersprungen
+        heapq.heappush(self._heap, (priority, next(self._order), key))
+        self._start_workers()
+        self._ready.set()
+        return job
+
+    def _next_job(self) -> Optional[_Job]:
+        while self._heap:
+            priority, _, key = heapq.heappop(self._heap)
+            job = self._jobs.get(key)
+            if job is not None and not job.started and job.priority == priority:
+                return job
+        return None
+
+    def _drop_stale(self):
+        oldest_page = self._page - THUMBNAIL_PREFETCH_PAGES
+        for key, job in list(self._jobs.items()):
+            if not job.started and job.priority[0] == PRIORITY_VISIBLE and -job.priority[1] <= oldest_page:
+                del self._jobs[key]
+                job.future.cancel()
+                self.stats["dropped"] += 1
+
+    def _is_missing(self, ip: str, path: str) -> bool:
+        expires = self._missing.get((ip, path))
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        del self._missing[(ip, path)]
+        return False
+
+    def _forget_missing(self):
+        now = time.monotonic()
+        self._missing = {key: expires for key, expires in self._missing.items() if expires > now}
+
+    def _start_workers(self):
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            job.started = True
+            try:
+                result = await thumbnail_cache.get(
+                    job.ip, job.path, lambda job=job: self._render(job.ip, job.path), THUMBNAIL_GENERATED_VARIANT
+                )
+            except Exception as e:
+                if isinstance(e, FileNotFoundError):
+                    self._missing[(job.ip, job.path)] = time.monotonic() + THUMBNAIL_MISSING_TTL
+                self.stats["failed"] += 1
+                logger.warning(f"⚠️ Vorschau für {job.path} ({job.ip}) fehlgeschlagen: {e}")
+                if not job.future.done():
+                    job.future.set_exception(e)
+                    job.future.exception()  # gilt als abgeholt, auch ohne Wartende (vorgemerkt)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._jobs.pop((job.ip, job.path), None)
+
+    # ========================================================================
+    # Erzeugen
+    # ========================================================================
+
+    async def _render(self, ip: str, path: str) -> bytes:
+        response = await http_clients.get(ip).get_file(path)
+        if response.status_code == 404:
+            raise FileNotFoundError(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"Gerät antwortet mit {response.status_code}")
+        if self._pool is None:
+            # spawn: kein fork eines Prozesses mit laufender Event-Loop und Threads
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            preview = await asyncio.get_running_loop().run_in_executor(self._pool, render_thumbnail, response.content)
+        except BrokenProcessPool:
+            self._pool = None  # Worker abgestürzt: beim nächsten Mal neu starten
+            raise
+        self.stats["rendered"] += 1
+        self.stats["source_bytes"] += len(response.content)
+        self.stats["preview_bytes"] += len(preview)
+        return preview
+
+    async def close(self):
+        """Worker beenden, wartende Vorschauen abbrechen, Prozess-Pool schließen"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            job.future.cancel()
+        self._jobs.clear()
+        self._heap.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ========================================================================
+    # Diagnose
+    # ========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "available": self.available,
+            "workers": self.workers,
+            "queued": sum(1 for job in self._jobs.values() if not job.started),
+            "running": sum(1 for job in self._jobs.values() if job.started),
+            "missing_paths": len(self._missing),
+        }
+
+
+# Globale Instanz
+thumbnail_generator = ThumbnailGenerator(settings.dwarf_thumbnail_workers)
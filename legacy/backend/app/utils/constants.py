@@ -15,6 +15,13 @@ ERROR_CODES = {
     # Weitere Codes werden bei Bedarf hinzugefügt
 }
 
+# ============================================================================
+# Nachrichten-Typen (WsPacket.type)
+# ============================================================================
+MESSAGE_TYPE_REQUEST = 0
+MESSAGE_TYPE_RESPONSE = 1
+MESSAGE_TYPE_NOTIFICATION = 2
+
 # ============================================================================
 # Module IDs
 # ============================================================================
@@ -164,6 +171,334 @@ CMD_FOCUS_STOP_ASTRO_AUTO_FOCUS = 15005
 CMD_PANORAMA_START_GRID = 15500
 CMD_PANORAMA_STOP = 15501
 
+# ============================================================================
+# Notification Commands (MODULE_NOTIFY) - 15200-15499
+# ============================================================================
+CMD_NOTIFY_TELE_WIDI_PICTURE_MATCHING = 15200
+CMD_NOTIFY_ELE = 15201
+CMD_NOTIFY_CHARGE = 15202
+CMD_NOTIFY_SDCARD_INFO = 15203
+CMD_NOTIFY_TELE_RECORD_TIME = 15204
+CMD_NOTIFY_TELE_TIMELAPSE_OUT_TIME = 15205
+CMD_NOTIFY_STATE_CAPTURE_RAW_DARK = 15206
+CMD_NOTIFY_PROGRASS_CAPTURE_RAW_DARK = 15207
+CMD_NOTIFY_STATE_CAPTURE_RAW_LIVE_STACKING = 15208
+CMD_NOTIFY_PROGRASS_CAPTURE_RAW_LIVE_STACKING = 15209
+CMD_NOTIFY_STATE_ASTRO_CALIBRATION = 15210
+CMD_NOTIFY_STATE_ASTRO_GOTO = 15211
+CMD_NOTIFY_STATE_ASTRO_TRACKING = 15212
+CMD_NOTIFY_TELE_SET_PARAM = 15213
+CMD_NOTIFY_WIDE_SET_PARAM = 15214
+CMD_NOTIFY_TELE_FUNCTION_STATE = 15215
+CMD_NOTIFY_WIDE_FUNCTION_STATE = 15216
+CMD_NOTIFY_SET_FEATURE_PARAM = 15217
+CMD_NOTIFY_TELE_BURST_PROGRESS = 15218
+CMD_NOTIFY_PANORAMA_PROGRESS = 15219
+CMD_NOTIFY_WIDE_BURST_PROGRESS = 15220
+CMD_NOTIFY_RGB_STATE = 15221
+CMD_NOTIFY_POWER_IND_STATE = 15222
+CMD_NOTIFY_WS_HOST_SLAVE_MODE = 15223
+CMD_NOTIFY_MTP_STATE = 15224
+CMD_NOTIFY_TRACK_RESULT = 15225
+CMD_NOTIFY_WIDE_TIMELAPSE_OUT_TIME = 15226
+CMD_NOTIFY_CPU_MODE = 15227
+CMD_NOTIFY_STATE_ASTRO_TRACKING_SPECIAL = 15228
+CMD_NOTIFY_POWER_OFF = 15229
+CMD_NOTIFY_ALBUM_UPDATE = 15230
+CMD_NOTIFY_SENTRY_MODE_STATE = 15231
+CMD_NOTIFY_SENTRY_MODE_TRACK_RESULT = 15232
+CMD_NOTIFY_STATE_ASTRO_ONE_CLICK_GOTO = 15233
+CMD_NOTIFY_STREAM_TYPE = 15234
+CMD_NOTIFY_WIDE_RECORD_TIME = 15235
+CMD_NOTIFY_STATE_WIDE_CAPTURE_RAW_LIVE_STACKING = 15236
+CMD_NOTIFY_PROGRASS_WIDE_CAPTURE_RAW_LIVE_STACKING = 15237
+CMD_NOTIFY_MULTI_TRACK_RESULT = 15238
+CMD_NOTIFY_EQ_SOLVING_STATE = 15239
+CMD_NOTIFY_UFO_MODE_STATE = 15240
+CMD_NOTIFY_TELE_LONG_EXP_PROGRESS = 15241
+CMD_NOTIFY_WIDE_LONG_EXP_PROGRESS = 15242
+CMD_NOTIFY_TEMPERATURE = 15243
+CMD_NOTIFY_STATE_CAPTURE_WIDE_RAW_DARK = 15247
+CMD_NOTIFY_SKY_SEACHER_STATE = 15250
+
+# ============================================================================
+# Sende-Pacing (Pause in Sekunden nach dem Senden eines Befehls)
+# Das JS-Original wartet pauschal 0.1 s - hier nur für Befehle, die es brauchen
+# ============================================================================
+SEND_PACING_DEFAULT = 0.0
+SEND_PACING = {
+    # (MODULE_ID, CMD): Sekunden
+}
+
+# ============================================================================
+# Prioritäts-Lanes der Sende-Queue (höchste zuerst)
+# emergency: Stopps - sofort senden, vorbei an Pacing, Rate-Limit und Pipeline-Fenster
+# interactive: alles, was ein Benutzer direkt auslöst (Default)
+# bulk: Abfragen und Hintergrund-Synchronisation
+# ============================================================================
+SEND_LANE_EMERGENCY = "emergency"
+SEND_LANE_INTERACTIVE = "interactive"
+SEND_LANE_BULK = "bulk"
+SEND_LANES = (SEND_LANE_EMERGENCY, SEND_LANE_INTERACTIVE, SEND_LANE_BULK)
+SEND_LANE_DEFAULT = SEND_LANE_INTERACTIVE
+SEND_LANE_COMMANDS = {
+    # Stopps / Abbruch
+    (MODULE_MOTOR, CMD_STEP_MOTOR_STOP): SEND_LANE_EMERGENCY,
+    (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK_STOP): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_CALIBRATION): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_GOTO): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_ONE_CLICK_GOTO): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_CAPTURE_RAW_LIVE_STACKING): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_WIDE_CAPTURE_LIVE_STACKING): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_CAPTURE_RAW_DARK): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_CAPTURE_RAW_DARK_WITH_PARAM): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_TRACK_SPECIAL_TARGET): SEND_LANE_EMERGENCY,
+    (MODULE_ASTRO, CMD_ASTRO_STOP_EQ_SOLVING): SEND_LANE_EMERGENCY,
+    (MODULE_FOCUS, CMD_FOCUS_STOP_MANUAL_CONTINU_FOCUS): SEND_LANE_EMERGENCY,
+    (MODULE_FOCUS, CMD_FOCUS_STOP_ASTRO_AUTO_FOCUS): SEND_LANE_EMERGENCY,
+    (MODULE_TRACK, CMD_TRACK_STOP_TRACK): SEND_LANE_EMERGENCY,
+    (MODULE_TRACK, CMD_SENTRY_MODE_STOP): SEND_LANE_EMERGENCY,
+    (MODULE_PANORAMA, CMD_PANORAMA_STOP): SEND_LANE_EMERGENCY,
+    # Abfragen / Hintergrund
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS): SEND_LANE_BULK,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_SYSTEM_WORKING_STATE): SEND_LANE_BULK,
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_GET_ALL_PARAMS): SEND_LANE_BULK,
+    (MODULE_ASTRO, CMD_ASTRO_CHECK_GOT_DARK): SEND_LANE_BULK,
+    (MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST): SEND_LANE_BULK,
+    (MODULE_SYSTEM, CMD_SYSTEM_SET_TIME): SEND_LANE_BULK,
+    (MODULE_SYSTEM, CMD_SYSTEM_SET_TIME_ZONE): SEND_LANE_BULK,
+}
+
+# ============================================================================
+# Pipelining (max. unbeantwortete Befehle pro Gerät)
+# Befehle in PIPELINE_SERIAL_COMMANDS laufen exklusiv: sie warten bis alle
+# anderen beantwortet sind und nichts anderes wird gesendet, bis sie fertig sind.
+# Nur Befehle, die das Gerät schnell bestätigt - GOTO, Kalibrierung, Darkframes
+# und Autofokus antworten erst nach Sekunden bis Minuten und laufen im normalen
+# Fenster, sonst hingen Regler, Joystick und Fotos so lange fest.
+# ============================================================================
+PIPELINE_DEPTH_DEFAULT = 4
+PIPELINE_SERIAL_COMMANDS = {
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_OPEN_CAMERA),
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_CLOSE_CAMERA),
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_ALL_PARAMS),
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_OPEN_CAMERA),
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_CLOSE_CAMERA),
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_SET_ALL_PARAMS),
+    (MODULE_RGB_POWER, CMD_RGB_POWER_POWER_DOWN),
+    (MODULE_RGB_POWER, CMD_RGB_POWER_REBOOT),
+}
+
+# ============================================================================
+# Coalescing (latest wins): ein noch nicht gesendeter Befehl derselben
+# (MODULE_ID, CMD) wird durch den neuen ersetzt statt angehängt.
+# Pro Klasse: Befehle und max. Senderate (Befehle/s, 0 = unbegrenzt)
+# ============================================================================
+COALESCE_CLASSES = {
+    "joystick": {
+        (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK),
+        (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK_FIXED_ANGLE),
+    },
+    "focus": {
+        (MODULE_FOCUS, CMD_FOCUS_START_MANUAL_CONTINU_FOCUS),
+    },
+    "param": {
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_EXP),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_GAIN),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_BRIGHTNESS),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_CONTRAST),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_SATURATION),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_HUE),
+        (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_SHARPNESS),
+    },
+}
+COALESCE_MAX_RATE = {
+    "joystick": 20.0,
+    "focus": 10.0,
+    "param": 5.0,
+}
+
+# ============================================================================
+# Reconnect (Backoff in Sekunden, mit Jitter)
+# ============================================================================
+RECONNECT_DELAY_MIN = 0.5
+RECONNECT_DELAY_MAX = 30.0
+
+# ============================================================================
+# Heartbeat (Text "ping" -> "pong") und Latenz-Statistik
+# ============================================================================
+LATENCY_WINDOW_SIZE = 600  # letzte N Messwerte für Perzentile
+LATENCY_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+# ============================================================================
+# Paket-Trace: Ringpuffer der letzten Paket-Header pro Verbindung
+# Log-Zeilen pro Paket nur auf DEBUG oder jedes N-te Paket auf INFO
+# ============================================================================
+PACKET_TRACE_SIZE = 512  # letzte N Pakete (gesendet und empfangen)
+PACKET_LOG_SAMPLE_DEFAULT = 0  # jedes N-te Paket auf INFO loggen (0 = aus)
+TRACE_RX = "rx"
+TRACE_TX = "tx"
+
+# ============================================================================
+# Replay nach Verbindungsabbruch
+# REPLAY_ALWAYS: idempotent - auch gesendete, unbeantwortete Befehle erneut senden
+# REPLAY_UNSENT: nur Befehle nachholen, die noch nicht gesendet waren
+# REPLAY_DROP:   verwerfen (Bewegungen sind nach einem Ausfall veraltet)
+# ============================================================================
+REPLAY_ALWAYS = "always"
+REPLAY_UNSENT = "unsent"
+REPLAY_DROP = "drop"
+REPLAY_POLICY_DEFAULT = REPLAY_UNSENT
+REPLAY_POLICY = {
+    # Abfragen und absolute Parameter
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_ALL_PARAMS): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_SYSTEM_WORKING_STATE): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_EXP_MODE): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_EXP): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_GAIN_MODE): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_GAIN): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_BRIGHTNESS): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_CONTRAST): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_SATURATION): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_HUE): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_SHARPNESS): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_WB_MODE): REPLAY_ALWAYS,
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_IRCUT): REPLAY_ALWAYS,
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_GET_ALL_PARAMS): REPLAY_ALWAYS,
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_SET_ALL_PARAMS): REPLAY_ALWAYS,
+    (MODULE_ASTRO, CMD_ASTRO_CHECK_GOT_DARK): REPLAY_ALWAYS,
+    (MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST): REPLAY_ALWAYS,
+    (MODULE_SYSTEM, CMD_SYSTEM_SET_TIME): REPLAY_ALWAYS,
+    (MODULE_SYSTEM, CMD_SYSTEM_SET_TIME_ZONE): REPLAY_ALWAYS,
+    # Stopps sind idempotent und müssen ankommen
+    (MODULE_MOTOR, CMD_STEP_MOTOR_STOP): REPLAY_ALWAYS,
+    (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK_STOP): REPLAY_ALWAYS,
+    (MODULE_FOCUS, CMD_FOCUS_STOP_MANUAL_CONTINU_FOCUS): REPLAY_ALWAYS,
+    # Bewegungen
+    (MODULE_MOTOR, CMD_STEP_MOTOR_RUN): REPLAY_DROP,
+    (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK): REPLAY_DROP,
+    (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK_FIXED_ANGLE): REPLAY_DROP,
+    (MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_DUAL_CAMERA_LINKAGE): REPLAY_DROP,
+    (MODULE_FOCUS, CMD_FOCUS_MANUAL_SINGLE_STEP_FOCUS): REPLAY_DROP,
+    (MODULE_FOCUS, CMD_FOCUS_START_MANUAL_CONTINU_FOCUS): REPLAY_DROP,
+}
+
+# ============================================================================
+# Parameter-Echo (15213/15214): CommonParam.id -> Felder aus ResGetAllParams
+# IDs siehe params_config.json (http://IP:8082/getDefaultParamsConfig);
+# nicht gelistete IDs werden nur roh nach ID gespeichert
+# ============================================================================
+PARAM_ID_FIELDS = {
+    0: ("exp_mode", "exp_index"),    # Belichtung
+    1: ("gain_mode", "gain_index"),  # Gain
+}
+
+# ============================================================================
+# Sequenzen (Makros auf dem Server)
+# Zustände aus notify.proto (AstroState / OperationState)
+# ============================================================================
+ASTRO_STATE_IDLE = 0
+ASTRO_STATE_RUNNING = 1
+ASTRO_STATE_STOPPING = 2
+ASTRO_STATE_STOPPED = 3
+ASTRO_STATE_PLATE_SOLVING = 4
+
+OPERATION_STATE_IDLE = 0
+OPERATION_STATE_RUNNING = 1
+OPERATION_STATE_STOPPED = 3
+
+# Ein Schritt ist fertig, wenn nach dem Senden die Notification mit einem
+# "fertig"-Zustand kommt (ein "fehlgeschlagen"-Zustand bricht ab) UND die
+# Antwort einen Erfolgs-Code hat; ohne Eintrag ist der Schritt mit der
+# Antwort fertig. Kalibrierung und GOTO beantwortet das Gerät erst am Ende -
+# STOPPED/IDLE heißt dort nur "beendet", ob erfolgreich, sagt der Antwort-Code.
+# (module_id, cmd) -> (Notification-CMD, fertig, fehlgeschlagen)
+SEQUENCE_COMPLETION = {
+    (MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION): (
+        CMD_NOTIFY_STATE_ASTRO_CALIBRATION, {ASTRO_STATE_STOPPED, ASTRO_STATE_IDLE}, set()
+    ),
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO): (
+        CMD_NOTIFY_STATE_ASTRO_GOTO, {ASTRO_STATE_STOPPED, ASTRO_STATE_IDLE}, set()
+    ),
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_SOLAR_SYSTEM): (
+        CMD_NOTIFY_STATE_ASTRO_GOTO, {ASTRO_STATE_STOPPED, ASTRO_STATE_IDLE}, set()
+    ),
+    (MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING): (
+        CMD_NOTIFY_STATE_CAPTURE_RAW_LIVE_STACKING, {OPERATION_STATE_RUNNING}, {OPERATION_STATE_STOPPED}
+    ),
+}
+
+# Passender Stopp-Befehl (gleiches Modul) für lang laufende Befehle - gesendet
+# beim Abbruch eines Sequenz-Schritts oder wenn der HTTP-Client während des
+# Wartens die Verbindung trennt (connection_manager.execute_cancellable)
+STOP_COMMANDS = {
+    (MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION): CMD_ASTRO_STOP_CALIBRATION,
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO): CMD_ASTRO_STOP_GOTO,
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_SOLAR_SYSTEM): CMD_ASTRO_STOP_GOTO,
+    (MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING): CMD_ASTRO_STOP_CAPTURE_RAW_LIVE_STACKING,
+    (MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_DARK): CMD_ASTRO_STOP_CAPTURE_RAW_DARK,
+    (MODULE_ASTRO, CMD_ASTRO_START_ONE_CLICK_GOTO_DSO): CMD_ASTRO_STOP_ONE_CLICK_GOTO,
+    (MODULE_ASTRO, CMD_ASTRO_START_ONE_CLICK_GOTO_SOLAR_SYSTEM): CMD_ASTRO_STOP_ONE_CLICK_GOTO,
+    (MODULE_ASTRO, CMD_ASTRO_START_EQ_SOLVING): CMD_ASTRO_STOP_EQ_SOLVING,
+    (MODULE_FOCUS, CMD_FOCUS_START_ASTRO_AUTO_FOCUS): CMD_FOCUS_STOP_ASTRO_AUTO_FOCUS,
+}
+STOP_COMMAND_TIMEOUT = 5.0  # Sekunden für die Antwort auf einen Stopp-Befehl
+
+# Antwort-Codes, die als Erfolg zählen (Default: nur 0)
+SEQUENCE_OK_CODES = {
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_OPEN_CAMERA): {0, 374},  # 374: bereits geöffnet
+}
+
+SEQUENCE_STEP_TIMEOUT_DEFAULT = 30.0  # Sekunden pro Schritt
+SEQUENCE_RESPONSE_GRACE = 5.0  # Sekunden: Antwort nach der Abschluss-Notification noch abwarten
+SEQUENCE_STEP_TIMEOUT = {
+    (MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION): 180.0,
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO): 300.0,
+    (MODULE_ASTRO, CMD_ASTRO_START_GOTO_SOLAR_SYSTEM): 300.0,
+}
+SEQUENCE_HISTORY = 20  # abgeschlossene Sequenzen, die abrufbar bleiben
+
+# ============================================================================
+# Antwort-Cache für Lesebefehle
+# Einträge gelten CACHE_TTL Sekunden und werden vorher verworfen, sobald eine
+# passende Notification oder die Antwort auf einen eigenen Set-Befehl kommt.
+# HTTP-Abfragen (Port 8082) laufen unter CACHE_MODULE_HTTP mit dem Pfad als cmd.
+# ============================================================================
+CACHE_MODULE_HTTP = "http"
+
+CACHE_TTL = {
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS): 30.0,
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_GET_ALL_PARAMS): 30.0,
+    (MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST): 300.0,
+    (CACHE_MODULE_HTTP, "getDefaultParamsConfig"): 3600.0,
+    (CACHE_MODULE_HTTP, "firmwareVersion"): 3600.0,
+}
+
+_CACHE_TELE_PARAMS = (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS)
+_CACHE_WIDE_PARAMS = (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_GET_ALL_PARAMS)
+_CACHE_DARK_LIST = (MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST)
+
+# Auslöser (module_id, cmd) -> ungültige Cache-Einträge (module_id, cmd)
+CACHE_INVALIDATED_BY = {
+    (MODULE_NOTIFY, CMD_NOTIFY_TELE_SET_PARAM): (_CACHE_TELE_PARAMS,),
+    (MODULE_NOTIFY, CMD_NOTIFY_WIDE_SET_PARAM): (_CACHE_WIDE_PARAMS,),
+    (MODULE_CAMERA_WIDE, CMD_CAMERA_WIDE_SET_ALL_PARAMS): (_CACHE_WIDE_PARAMS,),
+    (MODULE_NOTIFY, CMD_NOTIFY_STATE_CAPTURE_RAW_DARK): (_CACHE_DARK_LIST,),
+    (MODULE_ASTRO, CMD_ASTRO_DEL_DARK_FRAME_LIST): (_CACHE_DARK_LIST,),
+}
+CACHE_INVALIDATED_BY.update({
+    (MODULE_CAMERA_TELE, cmd): (_CACHE_TELE_PARAMS,)
+    for cmd in (
+        CMD_CAMERA_TELE_SET_EXP_MODE, CMD_CAMERA_TELE_SET_EXP,
+        CMD_CAMERA_TELE_SET_GAIN_MODE, CMD_CAMERA_TELE_SET_GAIN,
+        CMD_CAMERA_TELE_SET_BRIGHTNESS, CMD_CAMERA_TELE_SET_CONTRAST,
+        CMD_CAMERA_TELE_SET_SATURATION, CMD_CAMERA_TELE_SET_HUE,
+        CMD_CAMERA_TELE_SET_SHARPNESS, CMD_CAMERA_TELE_SET_WB_MODE,
+        CMD_CAMERA_TELE_SET_IRCUT, CMD_CAMERA_TELE_SET_ALL_PARAMS,
+    )
+})
+
 # ============================================================================
 # Fehlercodes - HTTP
 # ============================================================================
@@ -253,3 +588,52 @@ ONE_CLICK_GOTO_STEP_SKY_DETECTION = 10
 ONE_CLICK_GOTO_STEP_FOCUS = 20
 ONE_CLICK_GOTO_STEP_CALIBRATION = 30
 ONE_CLICK_GOTO_STEP_GOTO = 40
+
+# ============================================================================
+# HTTP-Client pro Gerät (Keep-Alive-Pools, services/dwarf_client.py)
+# metadata: JSON-Abfragen (Album-Listen, Info, Konfiguration) - kurze Timeouts
+# bulk: Downloads, Uploads und JPG-Streams - eigener Pool, damit große
+# Übertragungen die Metadaten-Abfragen nicht blockieren
+# ============================================================================
+
+HTTP_CLASS_METADATA = "metadata"
+HTTP_CLASS_BULK = "bulk"
+
+HTTP_CLIENT_CLASSES = {
+    # connect/read: Sekunden, pool: Warten auf eine freie Verbindung
+    HTTP_CLASS_METADATA: {"connect": 3.0, "read": 10.0, "pool": 10.0, "max_connections": 4},
+    HTTP_CLASS_BULK: {"connect": 5.0, "read": 120.0, "pool": 30.0, "max_connections": 4},
+}
+HTTP_STREAM_READ_TIMEOUT = None  # JPG-Streams: kein Lese-Timeout zwischen Frames
+
+# ============================================================================
+# Album-Index (lokale Kopie der Album-Metadaten in der Tabelle media)
+# ============================================================================
+
+ALBUM_SYNC_PAGE_SIZE = 100  # Einträge pro mediaInfos-Abfrage beim inkrementellen Abgleich
+ALBUM_SYNC_DEBOUNCE = 1.0  # Sekunden: Album-Notifications sammeln (Serienaufnahmen)
+ALBUM_UNWATCHED_MAX_AGE = 30.0  # Sekunden: ohne Notifications (keine WS-Verbindung) so lange gültig
+ALBUM_LIST_MAX_PAGE_SIZE = 500
+
+# Paralleles Abrufen (services/album_fetcher.py): Seitengrößen verdoppeln bzw.
+# halbieren sich (Seiten bleiben dadurch an pageIndex * pageSize ausgerichtet)
+ALBUM_FETCH_CONCURRENCY = 3  # gleichzeitige mediaInfos-Abfragen pro Gerät
+ALBUM_FETCH_PAGE_SIZE_MIN = 25
+ALBUM_FETCH_PAGE_SIZE_START = 50
+ALBUM_FETCH_PAGE_SIZE_MAX = 200
+ALBUM_FETCH_TARGET_LATENCY = 0.5  # Sekunden pro Abfrage; schneller = größere Seiten, langsamer = kleinere
+ALBUM_FETCH_RETRIES = 2
+
+# Thumbnail-Proxy (/api/album/thumbnail): Album-Dateien haben Zeitstempel im
+# Namen und ändern sich unter demselben Pfad nicht - Browser dürfen lange cachen
+THUMBNAIL_CACHE_CONTROL = "private, max-age=31536000, immutable"
+THUMBNAIL_MAX_BYTES = 4 * 1024 * 1024  # größere Antworten werden nicht gecacht
+
+# Lokale Vorschauen für Einträge ohne Thumbnail auf dem Gerät (Serienaufnahmen:
+# "thumbnailPath": ""), erzeugt aus dem Originalbild im Prozess-Pool
+THUMBNAIL_GENERATE_SIZE = 320  # längste Kante in Pixeln
+THUMBNAIL_GENERATE_QUALITY = 80
+THUMBNAIL_GENERATED_VARIANT = f"generated-{THUMBNAIL_GENERATE_SIZE}"  # Cache-Schlüssel neben dem Geräte-Thumbnail
+THUMBNAIL_GENERATE_IMAGE_TYPES = (".jpg", ".jpeg", ".png")
+THUMBNAIL_PREFETCH_PAGES = 2  # Vorschauen älterer Seiten verwerfen, solange sie nur vorgemerkt sind
+THUMBNAIL_MISSING_TTL = 60.0  # Sekunden: Datei fehlt auf dem Gerät -> nicht bei jeder Album-Liste neu versuchen
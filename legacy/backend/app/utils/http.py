@@ -0,0 +1,27 @@
+"""
+HTTP-Hilfsfunktionen für Endpoints
+"""
+from typing import Optional
+
+from starlette.requests import Request
+
+from ..config import settings
+
+
+async def wait_disconnected(request: Request):
+    """
+    Kehrt zurück, sobald der HTTP-Client die Verbindung getrennt hat
+
+    Wartet ereignisgesteuert auf die ASGI-Nachricht "http.disconnect" (kein
+    Polling). Der Request-Body muss bereits gelesen sein - bei FastAPI-Endpoints
+    mit Body-Modell ist das vor dem Aufruf des Endpoints geschehen.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def resolve_stop_on_disconnect(override: Optional[bool] = None) -> bool:
+    """Query-Override oder Einstellung dwarf_stop_on_disconnect"""
+    return settings.dwarf_stop_on_disconnect if override is None else override
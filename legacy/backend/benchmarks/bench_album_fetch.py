@@ -0,0 +1,97 @@
+"""
+Benchmark: komplettes Album aufzählen - sequenziell vs. AlbumFetcher
+
+Simuliertes Gerät mit --items Medien (viele Astro-/Serienaufnahmen): jede
+mediaInfos-Abfrage kostet --latency plus --item-latency pro Eintrag, das
+Gerät bearbeitet höchstens --device-slots Abfragen gleichzeitig. Verglichen
+werden sequenzielles Blättern (pageSize 20 wie bisher, und 100) mit dem
+parallelen AlbumFetcher (mediaCounts zuerst, begrenzte Parallelität,
+adaptive Seitengröße). Gemessen: Gesamtzeit, Zeit bis zur ersten Seite,
+Abfragen; geprüft wird die Reihenfolge.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_album_fetch.py [--items 1500] [--latency 0.04] [--item-latency 0.002]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.album_fetcher import AlbumFetcher
+from app.services.dwarf_client import http_clients
+from app.utils.constants import *
+from benchmarks.fake_dwarf_http import FakeDwarfHTTP, make_album
+
+DEVICE_IP = "127.0.0.1"
+PORT = 18082
+
+
+async def sequential(client, page_size: int):
+    """Bisheriger Weg: Seite für Seite, bis eine Seite kürzer ist"""
+    page_index = 0
+    while True:
+        response = await client.get_media_list(media_type=MEDIA_TYPE_ALL, page_index=page_index, page_size=page_size)
+        items = response["data"]
+        yield items
+        if len(items) < page_size:
+            return
+        page_index += 1
+
+
+async def fetcher_pages(client):
+    fetcher = AlbumFetcher(client)
+    async for _, items in fetcher.iter_pages(MEDIA_TYPE_ALL):
+        yield items
+    print(f"    Seitengröße am Ende {fetcher.page_size}, Fehlversuche {fetcher.failures}")
+
+
+async def run(label: str, device: FakeDwarfHTTP, pages, expected: list):
+    device.requests = 0
+    paths = []
+    first = None
+    start = time.perf_counter()
+    async for items in pages:
+        if first is None:
+            first = time.perf_counter() - start
+        paths.extend(item["filePath"] for item in items)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label:26s} {elapsed * 1000:7.0f} ms  erste Seite {first * 1000:5.0f} ms  "
+        f"{device.requests:3d} Abfragen  Reihenfolge {'OK' if paths == expected else 'FEHLER'}"
+    )
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1500)
+    parser.add_argument("--latency", type=float, default=0.04)
+    parser.add_argument("--item-latency", type=float, default=0.002)
+    parser.add_argument("--device-slots", type=int, default=2)
+    args = parser.parse_args()
+
+    device = await FakeDwarfHTTP(
+        host=DEVICE_IP, port=PORT, latency=args.latency, item_latency=args.item_latency,
+        album=make_album(args.items), max_concurrent=args.device_slots
+    ).start()
+    expected = [item["filePath"] for item in device.album]
+    client = http_clients.get(DEVICE_IP, PORT)
+    try:
+        print(
+            f"{args.items} Medien, {args.latency * 1000:.0f} ms + {args.item_latency * 1000:.1f} ms/Eintrag pro Abfrage, "
+            f"Gerät bearbeitet {args.device_slots} gleichzeitig"
+        )
+        baseline = await run("sequenziell pageSize 20", device, sequential(client, 20), expected)
+        await run("sequenziell pageSize 100", device, sequential(client, 100), expected)
+        parallel = await run(f"AlbumFetcher ({ALBUM_FETCH_CONCURRENCY} parallel)", device, fetcher_pages(client), expected)
+        print(f"  Faktor gegenüber pageSize 20: {baseline / parallel:.1f}x")
+    finally:
+        await http_clients.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark: Aufnahme-Setup als Einzelbefehle vs. Batch
+
+Schickt die typische Befehlsfolge vor einer Aufnahme (Kamera öffnen, IR-Cut,
+Belichtungsmodus, Belichtung, Gain-Modus, Gain, Weißabgleich) einmal als
+nacheinander abgewartete Einzelbefehle (wie getrennte HTTP-Calls) und einmal
+über connection_manager.execute_batch mit dem Öffnen als Barriere.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_batch.py [--latency 0.05] [--runs 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarf_connection import connection_manager
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+SETUP = [
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_OPEN_CAMERA, "barrier": True},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_IRCUT},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_EXP_MODE},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_EXP, "after": [2]},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_GAIN_MODE},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_GAIN, "after": [4]},
+    {"module_id": MODULE_CAMERA_TELE, "cmd": CMD_CAMERA_TELE_SET_WB_MODE},
+]
+
+
+async def sequential() -> float:
+    start = time.perf_counter()
+    for command in SETUP:
+        await connection_manager.execute(DEVICE_IP, command["module_id"], command["cmd"])
+    return time.perf_counter() - start
+
+
+async def batch() -> float:
+    start = time.perf_counter()
+    results = await connection_manager.execute_batch(DEVICE_IP, SETUP)
+    assert all(result["status"] == "success" for result in results), results
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=args.latency).start()
+    try:
+        await connection_manager.get_connection(DEVICE_IP)
+        await asyncio.sleep(0.5)
+        print(f"{len(SETUP)} Setup-Befehle, Gerätelatenz {args.latency * 1000:.0f} ms, {args.runs} Durchläufe")
+        for label, run in (("Einzeln", sequential), ("Batch", batch)):
+            times = [await run() for _ in range(args.runs)]
+            print(f"  {label:8s} min {min(times) * 1000:7.1f} ms  max {max(times) * 1000:7.1f} ms")
+    finally:
+        await connection_manager.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
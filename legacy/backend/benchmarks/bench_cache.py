@@ -0,0 +1,93 @@
+"""
+Benchmark: Dashboard-Refresh mit und ohne Antwort-Cache
+
+Ein Dashboard fragt bei jedem Refresh Kamera-Parameter und Darkframe-Liste ab.
+Zwischendurch ändert der Benutzer einen Parameter (Set-Befehl) und nimmt
+Darks auf (Notification 15206). Gezählt werden die Lesebefehle, die das Gerät
+tatsächlich erreichen, und ob nach jeder Änderung frisch abgefragt wird.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_cache.py [--refreshes 200] [--latency 0.01]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarf_connection import DwarfConnectionManager
+from app.lib.dwarfii_cache import response_cache
+from app.services.proto import notify_pb2
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+READS = (
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_GET_ALL_PARAMS),
+    (MODULE_ASTRO, CMD_ASTRO_GET_DARK_FRAME_LIST),
+)
+
+
+async def run(manager, device: FakeDwarf, cached: bool, nb_refreshes: int):
+    """(Lesebefehle am Gerät, Laufzeit s, veraltete Antworten nach Änderungen)"""
+    response_cache.invalidate(DEVICE_IP)
+    before = len(device.commands)
+    stale = 0
+    start = time.perf_counter()
+    for i in range(nb_refreshes):
+        if i % 50 == 25:
+            # Benutzer ändert einen Parameter bzw. nimmt Darks auf
+            await manager.execute(DEVICE_IP, MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_IRCUT, b"", timeout=5.0)
+            await manager.execute(DEVICE_IP, MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_DARK, b"", timeout=5.0)
+            await asyncio.sleep(0.05)  # Notification abwarten
+            reads_before = len(device.commands)
+            await asyncio.gather(*(
+                manager.execute(DEVICE_IP, module_id, cmd, b"", timeout=5.0, fresh=not cached)
+                for module_id, cmd in READS
+            ))
+            stale += len(READS) - (len(device.commands) - reads_before)
+            continue
+        await asyncio.gather(*(
+            manager.execute(DEVICE_IP, module_id, cmd, b"", timeout=5.0, fresh=not cached)
+            for module_id, cmd in READS
+        ))
+    elapsed = time.perf_counter() - start
+    reads = sum(1 for command in device.commands[before:] if command in READS)
+    return reads, elapsed, stale
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=args.latency).start()
+    device.notifications[(MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_DARK)] = [
+        (0.01, CMD_NOTIFY_STATE_CAPTURE_RAW_DARK, notify_pb2.ResNotifyOperationState(state=OPERATION_STATE_STOPPED)),
+    ]
+    manager = DwarfConnectionManager()
+    try:
+        await manager.get_connection(DEVICE_IP)
+        await asyncio.sleep(0.1)  # Zustandsabfrage beim Verbinden abwarten
+        print(f"{args.refreshes} Dashboard-Refreshes ({len(READS)} Lesebefehle), Gerätelatenz {args.latency * 1000:.0f} ms")
+        for cached in (False, True):
+            reads, elapsed, stale = await run(manager, device, cached, args.refreshes)
+            label = "Cache" if cached else "ohne"
+            print(f"  {label:6s} Gerät-Lesebefehle {reads:5d}  Laufzeit {elapsed * 1000:8.0f} ms  veraltet nach Änderung {stale}")
+        stats = response_cache.stats()
+        print(f"  Trefferquote {stats['hit_ratio']}")
+        for label, counter in stats["commands"].items():
+            print(f"    {label:10s} {counter}")
+    finally:
+        await manager.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: Joystick-Nachlauf mit und ohne Coalescing
+
+Simuliert einen Joystick, der mit hoher Rate neue Vektoren schickt, gegen ein
+Gerät, das Befehle nacheinander bearbeitet. Gemessen wird der Nachlauf: Zeit
+vom letzten Stick-Wert bis zu dessen Antwort, und wie viele Pakete gesendet wurden.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_coalesce.py [--updates 200] [--hz 100] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_api import WebSocketHandler
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+
+async def run(device: FakeDwarf, coalesce: bool, nb_updates: int, hz: float):
+    """Nachlauf (s) und Anzahl gesendeter Pakete"""
+    ws_handler = WebSocketHandler(DEVICE_IP)
+    ws_handler.ping_interval = 0
+    if not coalesce:
+        ws_handler.coalesce_commands = {}
+    await ws_handler.open()
+
+    received_before = device.received
+    futures = []
+    for i in range(nb_updates):
+        futures.append(ws_handler.send_command(
+            MODULE_MOTOR, CMD_STEP_MOTOR_SERVICE_JOYSTICK, i.to_bytes(2, "little"), timeout=120.0
+        ))
+        await asyncio.sleep(1.0 / hz)
+
+    last_update = time.perf_counter()
+    await futures[-1]
+    lag = time.perf_counter() - last_update
+    await asyncio.gather(*futures, return_exceptions=True)
+
+    await ws_handler.close()
+    return lag, device.received - received_before
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--hz", type=float, default=100.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=args.latency, serial=True).start()
+    try:
+        print(f"{args.updates} Joystick-Werte mit {args.hz:.0f} Hz, Gerätelatenz {args.latency * 1000:.0f} ms (seriell)")
+        for coalesce in (False, True):
+            lag, sent = await run(device, coalesce, args.updates, args.hz)
+            label = "Coalescing" if coalesce else "FIFO"
+            print(f"  {label:10s} Nachlauf {lag * 1000:8.0f} ms  gesendet {sent:4d}")
+    finally:
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
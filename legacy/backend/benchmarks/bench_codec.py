@@ -0,0 +1,122 @@
+"""
+Benchmark: WsPacket kodieren/dekodieren - base_pb2 vs. dwarfii_codec
+
+Senden: bisheriger Weg (WsPacket bauen + SerializeToString) gegen den
+vorkodierten Header-Präfix, mit und ohne Payload. Empfangen: WsPacket parsen
++ DwarfPacket gegen peek_packet(). Vorab wird geprüft, dass beide Wege
+byte-identische Pakete bzw. gleiche Felder liefern.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_codec.py [--iterations 200000]
+    PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python python benchmarks/bench_codec.py
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_astro import message_astro_goto_dso
+from google.protobuf.internal import api_implementation
+
+from app.lib.dwarfii_codec import NATIVE_PROTOBUF, encode_packet, peek_packet
+from app.lib.dwarfii_packet import DwarfPacket
+from app.services.proto import base_pb2
+from app.utils.constants import *
+
+
+def encode_pb2(module_id: int, cmd: int, data: bytes, client_id: str = "") -> bytes:
+    """Bisheriger Weg aus WebSocketHandler.create_packet"""
+    packet = base_pb2.WsPacket()
+    packet.major_version = 2
+    packet.minor_version = 0
+    packet.device_id = 1
+    packet.module_id = module_id
+    packet.cmd = cmd
+    packet.type = 0
+    packet.data = data
+    packet.client_id = client_id
+    return packet.SerializeToString()
+
+
+def decode_pb2(data: bytes) -> DwarfPacket:
+    packet = base_pb2.WsPacket()
+    packet.ParseFromString(data)
+    return DwarfPacket.from_ws_packet(packet)
+
+
+def decode_codec(data: bytes) -> DwarfPacket:
+    module_id, cmd, msg_type, start, end = peek_packet(data)
+    return DwarfPacket(module_id, cmd, msg_type, data[start:end])
+
+
+def verify():
+    """Byte-Gleichheit über zufällige Felder (inkl. mehrbyte-Varints und client_id)"""
+    rng = random.Random(1)
+    for _ in range(5000):
+        fields = dict(
+            major_version=rng.choice((0, 1, 2, 300)),
+            minor_version=rng.choice((0, 1, 200)),
+            device_id=rng.choice((0, 1, 2, 70000)),
+            module_id=rng.randrange(0, 20),
+            cmd=rng.randrange(0, 20000),
+            type=rng.randrange(0, 4),
+            data=bytes(rng.randrange(256) for _ in range(rng.choice((0, 1, 5, 127, 128, 300)))),
+            client_id=rng.choice(("", "abc", "client-ü" * 20)),
+        )
+        expected = base_pb2.WsPacket(**fields).SerializeToString()
+        encoded = encode_packet(
+            fields["major_version"], fields["minor_version"], fields["device_id"],
+            fields["module_id"], fields["cmd"], fields["data"], fields["client_id"], fields["type"]
+        )
+        assert encoded == expected, fields
+        decoded = decode_codec(expected)
+        assert (decoded.module_id, decoded.cmd, decoded.type, decoded.data) == (
+            fields["module_id"], fields["cmd"], fields["type"], fields["data"]
+        ), fields
+
+
+def timed(label: str, func, iterations: int) -> float:
+    """Bester von 5 Durchläufen (robust gegen Störungen durch andere Prozesse)"""
+    number = max(1, iterations // 5)
+    per_call = min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+    print(f"  {label:34s} {per_call:8.0f} ns/Paket")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    verify()
+    print("Byte-Gleichheit mit base_pb2: OK (5000 zufällige Pakete)")
+    print(f"Protobuf-Runtime: {api_implementation.Type()}")
+
+    payload = message_astro_goto_dso(10.68, 41.27, "M31")
+    response = base_pb2.WsPacket(
+        major_version=2, device_id=1, module_id=MODULE_ASTRO, cmd=CMD_ASTRO_START_GOTO_DSO, type=1,
+        data=base_pb2.ComResponse(code=0).SerializeToString()
+    ).SerializeToString()
+
+    print(f"Senden ohne Payload (CMD_CAMERA_TELE_PHOTOGRAPH), {n} Pakete")
+    old = timed("base_pb2", lambda: encode_pb2(MODULE_CAMERA_TELE, CMD_CAMERA_TELE_PHOTOGRAPH, b""), n)
+    new = timed("codec (vorkodiert)", lambda: encode_packet(2, 0, 1, MODULE_CAMERA_TELE, CMD_CAMERA_TELE_PHOTOGRAPH, b""), n)
+    print(f"  Faktor {old / new:.1f}x")
+
+    print(f"Senden mit Payload (GOTO DSO, {len(payload)} Bytes)")
+    old = timed("base_pb2", lambda: encode_pb2(MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO, payload), n)
+    new = timed("codec (Header-Präfix + Payload)", lambda: encode_packet(2, 0, 1, MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO, payload), n)
+    print(f"  Faktor {old / new:.1f}x")
+
+    print(f"Empfangen (Antwort, {len(response)} Bytes)")
+    old = timed("WsPacket.ParseFromString", lambda: decode_pb2(response), n)
+    new = timed("peek_packet", lambda: decode_codec(response), n)
+    print(f"  Faktor {old / new:.1f}x - unpack_packet nutzt {'base_pb2' if NATIVE_PROTOBUF else 'peek_packet'}")
+
+
+if __name__ == "__main__":
+    main()
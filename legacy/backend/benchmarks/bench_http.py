@@ -0,0 +1,101 @@
+"""
+Benchmark: Album-Browsing - neuer HTTP-Client pro Request vs. geteilter Pool
+
+Simuliert das Blättern im Album (Anzahl pro Typ + Seiten der Medien-Liste,
+nacheinander wie im Frontend) gegen ein simuliertes HTTP-Interface mit
+Verbindungsaufbau-Latenz (--connect-latency, WLAN des Geräts). Verglichen
+wird der bisherige Weg (DwarfHTTPClient pro Request, danach close) mit den
+geteilten Keep-Alive-Clients aus http_clients.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_http.py [--views 20] [--pages 4] [--connect-latency 0.03]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dwarf_client import DwarfHTTPClient, http_clients
+from benchmarks.fake_dwarf_http import FakeDwarfHTTP, make_album
+
+DEVICE_IP = "127.0.0.1"
+PORT = 18082
+
+
+class SingleRequestClient(DwarfHTTPClient):
+    """Bisheriger Konstruktor: ein httpx.AsyncClient ohne Pool-Einstellungen"""
+
+    def __init__(self, ip: str, port: int):
+        self.base_url = f"http://{ip}:{port}"
+        self.client = self.bulk = httpx.AsyncClient(timeout=30.0)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def browse(get_client, release, pages: int) -> float:
+    """Ein Album-Aufruf: Anzahl + pages Seiten; Millisekunden"""
+    start = time.perf_counter()
+    client = get_client()
+    try:
+        await client.get_media_counts()
+    finally:
+        await release(client)
+    for page_index in range(pages):
+        client = get_client()
+        try:
+            await client.get_media_list(media_type=0, page_index=page_index, page_size=20)
+        finally:
+            await release(client)
+    return (time.perf_counter() - start) * 1000.0
+
+
+async def run(label: str, device: FakeDwarfHTTP, get_client, release, views: int, pages: int):
+    device.connections = device.requests = 0
+    latencies = [await browse(get_client, release, pages) for _ in range(views)]
+    print(
+        f"  {label:26s} {statistics.median(latencies):7.1f} ms/Aufruf (Median)  "
+        f"erster {latencies[0]:6.1f} ms  {device.connections:3d} Verbindungen / {device.requests} Requests"
+    )
+    return statistics.median(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--views", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--connect-latency", type=float, default=0.03)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    device = await FakeDwarfHTTP(
+        host=DEVICE_IP, port=PORT, connect_latency=args.connect_latency, latency=args.latency, album=make_album(500)
+    ).start()
+
+    async def close(client):
+        await client.close()
+
+    async def keep(client):
+        pass
+
+    try:
+        print(
+            f"{args.views} Album-Aufrufe à {1 + args.pages} Requests, "
+            f"Verbindungsaufbau {args.connect_latency * 1000:.0f} ms, Request {args.latency * 1000:.0f} ms"
+        )
+        old = await run("Client pro Request", device, lambda: SingleRequestClient(DEVICE_IP, PORT), close, args.views, args.pages)
+        new = await run("geteilter Pool", device, lambda: http_clients.get(DEVICE_IP, PORT), keep, args.views, args.pages)
+        print(f"  Faktor {old / new:.1f}x")
+    finally:
+        await http_clients.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark: Stopp-Latenz hinter einer vollen Sende-Queue
+
+Reiht viele Parameter-Befehle ein und schickt dann CMD_STEP_MOTOR_STOP.
+Gemessen wird die Zeit vom Einreihen des Stopps bis zum Senden (Queue-Wartezeit
+der Lane) und bis zur Antwort - einmal mit einer FIFO-Lane, einmal mit Lanes.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_lanes.py [--queued 200] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_api import WebSocketHandler
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+
+async def run(lanes: bool, nb_queued: int):
+    """(Wartezeit bis Senden, Zeit bis Antwort) des Stopps in Sekunden"""
+    ws_handler = WebSocketHandler(DEVICE_IP)
+    ws_handler.ping_interval = 0
+    if not lanes:
+        ws_handler.command_lanes = {}
+    await ws_handler.open()
+
+    backlog = [
+        ws_handler.send_command(MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_IRCUT, b"", timeout=120.0)
+        for _ in range(nb_queued)
+    ]
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await ws_handler.send_command(MODULE_MOTOR, CMD_STEP_MOTOR_STOP, b"", timeout=120.0)
+    response = time.perf_counter() - start
+    lane = SEND_LANE_EMERGENCY if lanes else SEND_LANE_DEFAULT
+    wait = ws_handler.lane_wait[lane].last
+
+    await asyncio.gather(*backlog, return_exceptions=True)
+    await ws_handler.close()
+    return wait, response
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queued", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=args.latency).start()
+    try:
+        print(f"Stopp hinter {args.queued} Befehlen, Gerätelatenz {args.latency * 1000:.0f} ms")
+        for lanes in (False, True):
+            wait, response = await run(lanes, args.queued)
+            label = "Lanes" if lanes else "FIFO"
+            print(f"  {label:6s} bis Senden {wait * 1000:8.1f} ms  bis Antwort {response * 1000:8.1f} ms")
+    finally:
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Benchmark: CPU pro empfangenem Paket bei Notification-Strom
+
+Spielt Live-Stacking-Fortschritt (15209) direkt in _handle_message ein, mit
+Logging auf INFO in eine Datei (os.devnull). Verglichen werden: jedes Paket
+auf INFO (wie bisher), Sampling jedes 100. Pakets und nur Ringpuffer.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_logging.py [--packets 50000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_api import WebSocketHandler
+from app.services.proto import base_pb2, notify_pb2
+from app.utils.constants import *
+
+
+async def run(sample_every: int, packets: list) -> float:
+    """Mikrosekunden pro Paket"""
+    ws_handler = WebSocketHandler("127.0.0.1")
+    ws_handler.trace.sample_every = sample_every
+    start = time.process_time()
+    for data in packets:
+        await ws_handler._handle_message(data)
+    return (time.process_time() - start) / len(packets) * 1e6, ws_handler
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packets", type=int, default=50000)
+    args = parser.parse_args()
+
+    handler = logging.FileHandler(os.devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(name)s - %(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+    packets = [
+        base_pb2.WsPacket(
+            major_version=2, device_id=1, module_id=MODULE_NOTIFY,
+            cmd=CMD_NOTIFY_PROGRASS_CAPTURE_RAW_LIVE_STACKING, type=MESSAGE_TYPE_NOTIFICATION,
+            data=notify_pb2.ResNotifyProgressCaptureRawLiveStacking(
+                total_count=1000, update_count_type=2, current_count=i, stacked_count=i
+            ).SerializeToString()
+        ).SerializeToString()
+        for i in range(args.packets)
+    ]
+
+    print(f"{args.packets} Notifications, Logging INFO -> {os.devnull}")
+    for label, sample_every in (("jedes Paket (INFO)", 1), ("Sampling 1/100", 100), ("nur Ringpuffer", 0)):
+        per_packet, ws_handler = await run(sample_every, packets)
+        print(f"  {label:20s} {per_packet:7.2f} µs/Paket  Trace {len(ws_handler.trace.entries)} Einträge")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
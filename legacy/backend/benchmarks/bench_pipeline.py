@@ -0,0 +1,74 @@
+"""
+Benchmark: Pipelining-Tiefe (max_in_flight) gegen serielle Abarbeitung
+
+Schickt gemischte Befehle (Kamera-Parameter, System, RGB) über send_command()
+an ein simuliertes Gerät mit fester Antwortlatenz und misst die Gesamtzeit.
+Tiefe 1 entspricht dem alten Verhalten (ein Befehl nach dem anderen).
+
+Aufruf (aus backend/):
+    python benchmarks/bench_pipeline.py [--commands 100] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_api import WebSocketHandler
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+MIXED_COMMANDS = [
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_EXP),
+    (MODULE_CAMERA_TELE, CMD_CAMERA_TELE_SET_GAIN),
+    (MODULE_SYSTEM, CMD_SYSTEM_SET_TIME),
+    (MODULE_RGB_POWER, CMD_RGB_POWER_OPEN_RGB),
+]
+
+
+async def run(depth: int, nb_commands: int) -> float:
+    """Gesamtzeit für nb_commands Befehle bei gegebener Tiefe"""
+    ws_handler = WebSocketHandler(DEVICE_IP)
+    ws_handler.max_in_flight = depth
+    await ws_handler.open()
+
+    start = time.perf_counter()
+    futures = [
+        ws_handler.send_command(*MIXED_COMMANDS[i % len(MIXED_COMMANDS)], b"", timeout=60.0)
+        for i in range(nb_commands)
+    ]
+    await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - start
+
+    await ws_handler.close()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=args.latency).start()
+    try:
+        print(f"{args.commands} Befehle, Gerätelatenz {args.latency * 1000:.0f} ms")
+        serial = None
+        for depth in (1, 2, 4, 8):
+            elapsed = await run(depth, args.commands)
+            serial = serial or elapsed
+            label = "seriell" if depth == 1 else f"Tiefe {depth}"
+            print(f"  {label:10s} {elapsed:7.2f} s  {args.commands / elapsed:8.1f} Befehle/s  x{serial / elapsed:.1f}")
+    finally:
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""
+Benchmark: lokale Vorschauen für Serienaufnahmen (ohne Geräte-Thumbnail)
+
+1. Dekodieren: Originalbild (3840x2160 JPEG) voll dekodieren und verkleinern
+   vs. render_thumbnail (Draft-Modus, dekodiert direkt in reduzierter Größe).
+2. Blättern: Album nur aus Serienaufnahmen, --page-size Einträge pro Seite.
+   Der Nutzer öffnet Seite 1, blättert nach je --flip Sekunden weiter und
+   bleibt auf Seite 3; der Browser lädt deren Vorschauen (6 parallel).
+   Gemessen wird die Zeit bis alle Vorschauen von Seite 3 da sind -
+   Warteschlange in Ankunftsreihenfolge vs. ThumbnailGenerator (sichtbare
+   Seite zuerst, verlassene Seiten verworfen).
+3. /api/album/thumbnail?generate=1: ETag und 304.
+
+Braucht Pillow (requirements.txt).
+
+Aufruf (aus backend/):
+    python benchmarks/bench_thumbnail_generate.py [--page-size 12] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+PORT = 18082
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "dwarf_bench_thumbnail_generate")
+os.environ["DWARF_THUMBNAIL_CACHE_DIR"] = CACHE_DIR
+os.environ["DWARF_HTTP_PORT"] = str(PORT)
+os.environ["DWARF_JPG_PORT"] = str(PORT + 10)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import album
+from app.services.dwarf_client import http_clients
+from app.services.thumbnail_cache import thumbnail_cache
+from app.services.thumbnail_generator import Image, ThumbnailGenerator, preview_source, render_thumbnail, thumbnail_generator
+from app.utils.constants import *
+from benchmarks.fake_dwarf_http import FakeDwarfHTTP, make_album
+
+DEVICE_IP = "127.0.0.1"
+BROWSER_CONNECTIONS = 6
+PAGES = 3
+
+
+class FifoGenerator(ThumbnailGenerator):
+    """Vergleich: alles in Ankunftsreihenfolge, nichts wird verworfen"""
+
+    def __init__(self, workers: int):
+        super().__init__(workers)
+        self._fifo = itertools.count()
+
+    def _schedule(self, ip, path, priority):
+        return super()._schedule(ip, path, (0, next(self._fifo), 0))
+
+
+def make_photo() -> bytes:
+    """3840x2160 JPEG mit Verlauf und Rauschen (ähnliche Größe wie eine Aufnahme)"""
+    gradient = Image.radial_gradient("L").resize((3840, 2160))
+    noise = Image.effect_noise((3840, 2160), 8)
+    photo = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    output = io.BytesIO()
+    photo.save(output, "JPEG", quality=90)
+    return output.getvalue()
+
+
+def full_decode(content: bytes) -> bytes:
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((THUMBNAIL_GENERATE_SIZE, THUMBNAIL_GENERATE_SIZE), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=THUMBNAIL_GENERATE_QUALITY)
+        return output.getvalue()
+
+
+def bench_decode(photo: bytes, rounds: int = 5):
+    for label, render in (("voll dekodieren + verkleinern", full_decode), ("Draft-Modus (render_thumbnail)", render_thumbnail)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            preview = render(photo)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"  {label:32s} {elapsed * 1000:6.1f} ms/Bild  Vorschau {len(preview) / 1024:5.1f} KB")
+
+
+async def browse(generator: ThumbnailGenerator, pages: list, flip: float) -> float:
+    """Seiten 1..PAGES anzeigen; liefert Sekunden bis die letzte Seite vollständig ist"""
+    for page in pages[:-1]:
+        await generator.prioritize(DEVICE_IP, page)
+        await asyncio.sleep(flip)
+    visible = pages[-1]
+    start = time.perf_counter()
+    await generator.prioritize(DEVICE_IP, visible)
+    slots = asyncio.Semaphore(BROWSER_CONNECTIONS)
+
+    async def load(item):
+        async with slots:
+            await generator.get(DEVICE_IP, preview_source(item))
+
+    await asyncio.gather(*(load(item) for item in visible))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--flip", type=float, default=0.15)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow ist nicht installiert (pip install -r requirements.txt)")
+        return
+
+    photo = make_photo()
+    print(f"Originalbild: 3840x2160, {len(photo) / 1024:.0f} KB")
+    print("Dekodieren:")
+    bench_decode(photo)
+
+    # eine Seite mehr als angezeigt: deren Einträge starten den Prozess-Pool vor der Messung
+    bursts = [item for item in make_album(args.page_size * (PAGES + 1) * 5, burst_images=3) if item["mediaType"] == 3]
+    pages = [bursts[i * args.page_size:(i + 1) * args.page_size] for i in range(PAGES)]
+    files = {preview_source(item): photo for item in bursts}
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    device = await FakeDwarfHTTP(
+        host=DEVICE_IP, port=PORT, latency=args.latency, album=bursts, files=files, max_concurrent=2
+    ).start()
+
+    try:
+        print(f"Blättern: {PAGES} Seiten à {args.page_size} Serienaufnahmen, weiter nach {args.flip * 1000:.0f} ms, {thumbnail_generator.workers} Prozesse")
+        results = {}
+        for label, generator in (("Ankunftsreihenfolge", FifoGenerator(thumbnail_generator.workers)), ("sichtbare Seite zuerst", thumbnail_generator)):
+            # Prozess-Pool starten (alle Worker)
+            await asyncio.gather(*(generator.get(DEVICE_IP, preview_source(item)) for item in bursts[-generator.workers:]))
+            await thumbnail_cache.clear()
+            generator.stats = dict.fromkeys(generator.stats, 0)
+            device.requests = 0
+            elapsed = await browse(generator, pages, args.flip)
+            await asyncio.sleep(0.1)
+            stats = generator.get_stats()
+            results[label] = elapsed
+            print(
+                f"  {label:24s} Seite {PAGES} vollständig nach {elapsed * 1000:6.0f} ms  "
+                f"erzeugt {stats['rendered']:2d}, verworfen {stats['dropped']:2d}, Geräte-Abfragen {device.requests}"
+            )
+            if generator is not thumbnail_generator:
+                await generator.close()
+        print(f"  Faktor: {results['Ankunftsreihenfolge'] / results['sichtbare Seite zuerst']:.1f}x")
+        stats = thumbnail_generator.get_stats()
+        if stats["rendered"]:
+            print(
+                f"  Übertragung an den Browser: {stats['preview_bytes'] / stats['rendered'] / 1024:.1f} KB "
+                f"statt {stats['source_bytes'] / stats['rendered'] / 1024:.0f} KB pro Eintrag"
+            )
+
+        app = FastAPI()
+        app.include_router(album.router, prefix="/api/album")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://backend") as client:
+            params = {"ip": DEVICE_IP, "path": preview_source(pages[0][0]), "generate": 1}
+            first = await client.get("/api/album/thumbnail", params=params)
+            again = await client.get("/api/album/thumbnail", params=params, headers={"If-None-Match": first.headers["etag"]})
+            print(f"/api/album/thumbnail?generate=1: {first.status_code} {first.headers['content-type']}, mit If-None-Match {again.status_code}")
+    finally:
+        await thumbnail_generator.close()
+        await http_clients.close_all()
+        await device.stop()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark: Album-Thumbnails - direkt vom Gerät vs. /api/album/thumbnail
+
+Simuliertes Gerät (--latency pro Datei, höchstens --device-slots gleichzeitig)
+mit --items Medien. Ein "Browser" lädt alle Thumbnails mit 6 parallelen
+Verbindungen, dreimal hintereinander (Album öffnen, zurückblättern, erneut):
+einmal direkt vom Datei-Port des Geräts, einmal über den Proxy - beim dritten
+Durchgang mit If-None-Match wie ein Browser nach Ablauf seines Caches.
+Danach: 8 gleichzeitige Anfragen für dasselbe neue Thumbnail (Coalescing)
+und ein Neustart mit demselben Cache-Verzeichnis.
+
+Aufruf (aus backend/):
+    python benchmarks/bench_thumbnails.py [--items 120] [--latency 0.03]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+PORT = 18082
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "dwarf_bench_thumbnails")
+os.environ["DWARF_THUMBNAIL_CACHE_DIR"] = CACHE_DIR
+os.environ["DWARF_HTTP_PORT"] = str(PORT)
+os.environ["DWARF_JPG_PORT"] = str(PORT + 10)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import album
+from app.services.dwarf_client import http_clients
+from app.services.thumbnail_cache import ThumbnailCache, thumbnail_cache
+from benchmarks.fake_dwarf_http import FakeDwarfHTTP, make_album
+
+DEVICE_IP = "127.0.0.1"
+BROWSER_CONNECTIONS = 6
+
+
+async def browse(label: str, device: FakeDwarfHTTP, fetch, paths: list, etags: dict = None):
+    """Alle Thumbnails mit BROWSER_CONNECTIONS parallelen Abrufen laden"""
+    device.requests = 0
+    slots = asyncio.Semaphore(BROWSER_CONNECTIONS)
+    statuses = {}
+
+    async def load(path: str):
+        async with slots:
+            status = await fetch(path, etags)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(load(path) for path in paths))
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count}x {status}" for status, count in sorted(statuses.items()))
+    print(f"  {label:34s} {elapsed * 1000:6.0f} ms  {device.requests:4d} Geräte-Abfragen  ({summary})")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--device-slots", type=int, default=2)
+    args = parser.parse_args()
+
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    device = await FakeDwarfHTTP(
+        host=DEVICE_IP, port=PORT, latency=args.latency,
+        album=make_album(args.items), max_concurrent=args.device_slots
+    ).start()
+    paths = [item["thumbnailPath"] for item in device.album]
+
+    app = FastAPI()
+    app.include_router(album.router, prefix="/api/album")
+    proxy = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://backend")
+    direct = httpx.AsyncClient(base_url=f"http://{DEVICE_IP}:{PORT + 10}")
+    etags = {}
+
+    async def fetch_direct(path: str, _):
+        response = await direct.get(path)
+        return response.status_code
+
+    async def fetch_proxy(path: str, known: dict):
+        headers = {"If-None-Match": known[path]} if known and path in known else {}
+        response = await proxy.get("/api/album/thumbnail", params={"ip": DEVICE_IP, "path": path}, headers=headers)
+        if "etag" in response.headers:
+            etags[path] = response.headers["etag"]
+        return response.status_code
+
+    try:
+        print(f"{args.items} Thumbnails, {args.latency * 1000:.0f} ms pro Datei, Gerät bearbeitet {args.device_slots} gleichzeitig")
+        print("Direkt vom Gerät:")
+        baseline = 0.0
+        for view in range(1, 4):
+            baseline += await browse(f"Durchgang {view}", device, fetch_direct, paths)
+        print("Über /api/album/thumbnail:")
+        cached = await browse("Durchgang 1 (Cache leer)", device, fetch_proxy, paths)
+        cached += await browse("Durchgang 2 (Browser-Cache leer)", device, fetch_proxy, paths)
+        cached += await browse("Durchgang 3 (If-None-Match)", device, fetch_proxy, paths, etags)
+        print(f"  Faktor über drei Durchgänge: {baseline / cached:.1f}x")
+
+        device.album = make_album(1, start_time=1800000000)
+        new_path = device.album[0]["thumbnailPath"]
+        device.requests = 0
+        responses = await asyncio.gather(*(
+            proxy.get("/api/album/thumbnail", params={"ip": DEVICE_IP, "path": new_path}) for _ in range(8)
+        ))
+        print(
+            f"8 gleichzeitige Anfragen, neues Thumbnail: {device.requests} Geräte-Abfrage(n), "
+            f"gleicher Inhalt: {'ja' if len({r.content for r in responses}) == 1 else 'NEIN'}"
+        )
+        print(f"Cache: {thumbnail_cache.get_stats()}")
+
+        restarted = ThumbnailCache(CACHE_DIR, thumbnail_cache.max_bytes)
+        known = sum([await restarted.lookup(DEVICE_IP, path) is not None for path in paths])
+        print(f"Nach Neustart wiedergefunden: {known}/{len(paths)}")
+    finally:
+        await proxy.aclose()
+        await direct.aclose()
+        await http_clients.close_all()
+        await device.stop()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
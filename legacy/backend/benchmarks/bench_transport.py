@@ -0,0 +1,96 @@
+"""
+Benchmark: WebSocketHandler Durchsatz und Leerlauf-CPU
+
+Misst gegen ein simuliertes Gerät (fake_dwarf.py):
+  - Befehle pro Sekunde (senden bis Antwort empfangen)
+  - CPU-Last einer offenen, aber untätigen Verbindung
+
+Aufruf (aus backend/):
+    python benchmarks/bench_transport.py [--commands 200] [--idle 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarfii_api import WebSocketHandler
+from app.utils.constants import MODULE_CAMERA_TELE, CMD_CAMERA_TELE_PHOTOGRAPH
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+
+async def connect() -> WebSocketHandler:
+    ws_handler = WebSocketHandler(DEVICE_IP)
+    await ws_handler.open()
+    if not ws_handler.is_connected():
+        raise RuntimeError("Verbindung zum simulierten Gerät fehlgeschlagen")
+    return ws_handler
+
+
+async def bench_throughput(nb_commands: int) -> float:
+    """Befehle/s bei voller Queue"""
+    ws_handler = await connect()
+    done = asyncio.Event()
+    received = 0
+
+    def message_callback(txt_info, result_data):
+        nonlocal received
+        received += 1
+        if received >= nb_commands:
+            done.set()
+
+    ws_handler.register_message_callback("bench", message_callback)
+
+    packet = ws_handler.create_packet(MODULE_CAMERA_TELE, CMD_CAMERA_TELE_PHOTOGRAPH, b"")
+    start = time.perf_counter()
+    for _ in range(nb_commands):
+        ws_handler.send_packet(packet)
+    await asyncio.wait_for(done.wait(), timeout=nb_commands * 0.5 + 10)
+    elapsed = time.perf_counter() - start
+
+    ws_handler.unregister_message_callback("bench")
+    await ws_handler.close()
+    return nb_commands / elapsed
+
+
+async def bench_idle_cpu(seconds: float) -> float:
+    """CPU-Anteil (%) einer offenen Verbindung ohne Verkehr"""
+    ws_handler = await connect()
+    await asyncio.sleep(0.5)  # Startphase der Loops nicht mitmessen
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    await ws_handler.close()
+    return 100.0 * cpu / wall
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--idle", type=float, default=5.0)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP).start()
+    try:
+        throughput = await bench_throughput(args.commands)
+        idle_cpu = await bench_idle_cpu(args.idle)
+    finally:
+        await device.stop()
+
+    print(f"Durchsatz:      {throughput:8.1f} Befehle/s ({args.commands} Befehle)")
+    print(f"Leerlauf-CPU:   {idle_cpu:8.2f} % ({args.idle:.0f} s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Simuliertes DWARF II Gerät für Benchmarks
+Beantwortet jedes WsPacket mit einer ComResponse (Default code=0)
+"""
+import asyncio
+import logging
+import os
+import sys
+
+import websockets
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.proto import base_pb2
+from app.utils.constants import MODULE_NOTIFY, MESSAGE_TYPE_NOTIFICATION
+
+logger = logging.getLogger(__name__)
+
+
+class FakeDwarf:
+    """
+    Minimaler WebSocket-Server mit DWARF-Protokoll
+
+    Args:
+        host: Bind-Adresse (mehrere Geräte: 127.0.0.2, 127.0.0.3, ...)
+        port: WebSocket-Port des Geräts
+        latency: Verarbeitungszeit pro Befehl in Sekunden
+        serial: True = Befehle strikt nacheinander bearbeiten (wie die Firmware)
+        album_sync: Album-Abgleich beim Verbinden zulassen - nur zusammen mit
+            FakeDwarfHTTP sinnvoll (der Simulator hat kein HTTP-Interface)
+
+    frozen=True simuliert eine halbtote WLAN-Verbindung: der Socket bleibt
+    offen, aber nichts wird mehr beantwortet (auch kein "pong").
+
+    notifications[(module_id, cmd)] = [(Verzögerung, Notify-CMD, pb2-Message), ...]
+    schickt nach der Antwort auf den Befehl diese Notifications (z.B. GOTO-Zustände).
+    Befehle in late ((module_id, cmd)) werden erst nach ihren Notifications
+    beantwortet (wie Kalibrierung und GOTO), response_codes[(module_id, cmd)]
+    setzt den Antwort-Code (Default 0).
+    Befehle in ignored ((module_id, cmd)) bleiben unbeantwortet (Timeout-Pfade).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9900,
+        latency: float = 0.0,
+        serial: bool = False,
+        album_sync: bool = False
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.serial = serial
+        self.album_sync = album_sync
+        self.received = 0
+        self.connections = 0
+        self.commands = []  # (module_id, cmd) in Empfangsreihenfolge
+        self.notifications = {}
+        self.late = set()
+        self.response_codes = {}
+        self.ignored = set()
+        self.frozen = False
+        self.server = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        settings.dwarf_album_sync = self.album_sync
+        self.server = await websockets.serve(self._handler, self.host, self.port)
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handler(self, websocket):
+        self.connections += 1
+        try:
+            async for message in websocket:
+                if self.frozen:
+                    continue
+                if isinstance(message, str):
+                    if message == "ping":
+                        await websocket.send("pong")
+                    continue
+                self.received += 1
+                asyncio.create_task(self._respond(websocket, message))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _respond(self, websocket, message: bytes):
+        request = base_pb2.WsPacket()
+        request.ParseFromString(message)
+        self.commands.append((request.module_id, request.cmd))
+        if (request.module_id, request.cmd) in self.ignored:
+            return
+
+        if self.serial:
+            async with self._lock:
+                await asyncio.sleep(self.latency)
+        elif self.latency:
+            await asyncio.sleep(self.latency)
+
+        response = base_pb2.WsPacket()
+        response.major_version = request.major_version
+        response.minor_version = request.minor_version
+        response.device_id = request.device_id
+        response.module_id = request.module_id
+        response.cmd = request.cmd
+        response.type = 1
+        response.data = base_pb2.ComResponse(code=self.response_codes.get((request.module_id, request.cmd), 0)).SerializeToString()
+        late = (request.module_id, request.cmd) in self.late
+
+        try:
+            if not late:
+                await websocket.send(response.SerializeToString())
+            for delay, notify_cmd, notify_message in self.notifications.get((request.module_id, request.cmd), ()):
+                await asyncio.sleep(delay)
+                notification = base_pb2.WsPacket()
+                notification.module_id = MODULE_NOTIFY
+                notification.cmd = notify_cmd
+                notification.type = MESSAGE_TYPE_NOTIFICATION
+                notification.data = notify_message.SerializeToString()
+                await websocket.send(notification.SerializeToString())
+            if late:
+                await websocket.send(response.SerializeToString())
+        except websockets.exceptions.ConnectionClosed:
+            pass
@@ -0,0 +1,182 @@
+"""
+Simuliertes DWARF II HTTP-Interface für Benchmarks
+Album-Abfragen (Port 8082) und Dateien/Thumbnails (Port 8092)
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+ALBUM_DIRS = {1: "Normal_Photos", 2: "Videos", 3: "Burst", 4: "Astronomy", 5: "Panorama"}
+
+
+def make_album(count: int, start_time: int = 1696586442, burst_images: int = 0) -> list:
+    """
+    count Medien über alle Typen verteilt (neueste zuerst, wie das Gerät)
+
+    burst_images > 0: Serienaufnahmen wie vom Gerät - Verzeichnis mit
+    1.jpg..N.jpg unter "images", ohne Thumbnail ("thumbnailPath": "")
+    """
+    items = []
+    for i in range(count):
+        media_type = i % 5 + 1
+        name = f"DWARF_{start_time + i:d}"
+        directory = f"/sdcard/DWARF_II/{ALBUM_DIRS[media_type]}"
+        if media_type == 3 and burst_images:
+            items.append({
+                "fileName": name,
+                "filePath": f"{directory}/{name}",
+                "fileSize": 0,
+                "mediaType": media_type,
+                "modificationTime": start_time + i,
+                "thumbnailPath": "",
+                "burstImgCount": burst_images,
+                "images": [
+                    {"filePath": f"{directory}/{name}/{n}.jpg", "thumbnailPath": "", "fileSize": 0}
+                    for n in range(1, burst_images + 1)
+                ],
+            })
+            continue
+        items.append({
+            "basicParams": None,
+            "featureParams": None,
+            "fileName": f"{name}.jpeg",
+            "filePath": f"{directory}/{name}.jpeg",
+            "fileSize": "689.38 KB",
+            "mediaType": media_type,
+            "modificationTime": start_time + i,
+            "thumbnailPath": f"{directory}/Thumbnail/{name}.jpg",
+        })
+    items.sort(key=lambda item: item["modificationTime"], reverse=True)
+    return items
+
+
+class FakeDwarfHTTP:
+    """
+    Minimaler HTTP/1.1-Server mit Keep-Alive
+
+    Args:
+        host: Bind-Adresse
+        port: API-Port (Album, Info), port + 10 liefert Dateien (wie 8082/8092)
+        connect_latency: Verzögerung pro neuer TCP-Verbindung in Sekunden
+            (Verbindungsaufbau über das WLAN des Geräts)
+        latency: Verarbeitungszeit pro Request in Sekunden
+        item_latency: zusätzliche Zeit pro gelieferten mediaInfos-Eintrag
+        album: Medien-Liste (make_album)
+        files: Inhalt bestimmter Dateien (Pfad -> Bytes), sonst deterministische 4 KB
+        max_concurrent: gleichzeitig bearbeitete Requests (schwache Geräte-CPU)
+
+    connections/requests zählen neue Verbindungen bzw. Requests,
+    paths die abgefragten Pfade in Reihenfolge.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8082,
+        connect_latency: float = 0.0,
+        latency: float = 0.0,
+        item_latency: float = 0.0,
+        album: list = None,
+        files: dict = None,
+        max_concurrent: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.file_port = port + 10
+        self.connect_latency = connect_latency
+        self.latency = latency
+        self.item_latency = item_latency
+        self.album = album if album is not None else make_album(100)
+        self.files = files or {}
+        self.connections = 0
+        self.requests = 0
+        self.paths = []
+        self.servers = []
+        self._slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+    async def start(self):
+        for port in (self.port, self.file_port):
+            self.servers.append(await asyncio.start_server(self._handler, self.host, port))
+        return self
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+
+    async def _handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, content_type, payload = await self._dispatch(method, unquote(path), body)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: keep-alive\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        self.requests += 1
+        self.paths.append(path)
+        if self._slots is not None:
+            async with self._slots:
+                return await self._respond(method, path, body)
+        return await self._respond(method, path, body)
+
+    async def _respond(self, method: str, path: str, body: bytes):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if path == "/album/list/mediaCounts":
+            counts = {media_type: 0 for media_type in ALBUM_DIRS}
+            for item in self.album:
+                counts[item["mediaType"]] += 1
+            data = [{"mediaType": 0, "count": len(self.album)}] + [
+                {"mediaType": media_type, "count": count} for media_type, count in counts.items()
+            ]
+            return self._json({"code": 0, "data": data})
+        if path == "/album/list/mediaInfos":
+            request = json.loads(body or b"{}")
+            media_type = request.get("mediaType", 0)
+            items = [item for item in self.album if media_type in (0, item["mediaType"])]
+            page_size = request.get("pageSize", 0)
+            if page_size:
+                start = request.get("pageIndex", 0) * page_size
+                items = items[start:start + page_size]
+            if self.item_latency:
+                await asyncio.sleep(self.item_latency * len(items))
+            return self._json({"code": 0, "data": items})
+        if path in ("/deviceInfo", "/firmwareVersion", "/getDefaultParamsConfig"):
+            return self._json({"code": 0, "data": {"time": time.time()}})
+        if path in self.files:
+            return "200 OK", "image/jpeg", self.files[path]
+        if path.startswith("/sdcard/") or path.startswith("/DWARF_II/"):
+            # Datei/Thumbnail: deterministischer Inhalt je Pfad
+            return "200 OK", "image/jpeg", (path.encode() * 64)[:4096]
+        return "404 Not Found", "application/json", b'{"code": -1}'
+
+    @staticmethod
+    def _json(value) -> tuple:
+        return "200 OK", "application/json", json.dumps(value).encode()
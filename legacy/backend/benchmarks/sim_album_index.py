@@ -0,0 +1,126 @@
+"""
+Simulation: Album-Index - Geräte-Abfragen beim Blättern und beim Abgleich
+
+Spiegelt ein simuliertes Album (--items Medien) in eine temporäre SQLite-
+Datenbank, blättert dann per Keyset-Cursor durch alle Seiten und vergleicht
+Reihenfolge und Geräte-Abfragen mit dem direkten Weg (mediaInfos pro Seite).
+Danach: neue Aufnahmen und eine gelöschte Datei, gemeldet über
+CMD_NOTIFY_ALBUM_UPDATE - gezählt werden die Abfragen des inkrementellen
+Abgleichs.
+
+Aufruf (aus backend/):
+    python benchmarks/sim_album_index.py [--items 2000] [--page-size 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+DATABASE_FILE = os.path.join(tempfile.gettempdir(), "dwarf_sim_album_index.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DATABASE_FILE}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, init_db
+from app.lib.dwarf_connection import connection_manager
+from app.services.album_index import album_index
+from app.services.dwarf_client import http_clients
+from app.services.proto import base_pb2, notify_pb2
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+from benchmarks.fake_dwarf_http import FakeDwarfHTTP, make_album
+
+logging.basicConfig(level=logging.WARNING)
+engine.echo = False
+
+DEVICE_IP = "127.0.0.1"
+
+
+def newest_first(album: list) -> list:
+    return [item["filePath"] for item in sorted(album, key=lambda item: (item["modificationTime"], item["filePath"]), reverse=True)]
+
+
+async def browse_index(page_size: int) -> list:
+    paths, cursor = [], None
+    while True:
+        items, cursor = await album_index.list_page(DEVICE_IP, MEDIA_TYPE_ALL, page_size, cursor=cursor)
+        paths.extend(item["filePath"] for item in items)
+        if cursor is None:
+            return paths
+
+
+async def browse_device(page_size: int) -> list:
+    client = http_clients.get(DEVICE_IP)
+    paths, page_index = [], 0
+    while True:
+        response = await client.get_media_list(MEDIA_TYPE_ALL, page_index, page_size)
+        paths.extend(item["filePath"] for item in response["data"])
+        if len(response["data"]) < page_size:
+            return paths
+        page_index += 1
+
+
+async def notify_album_update(ws_handler, media_type: int):
+    await ws_handler._handle_message(base_pb2.WsPacket(
+        major_version=2, device_id=1, module_id=MODULE_NOTIFY, cmd=CMD_NOTIFY_ALBUM_UPDATE,
+        type=MESSAGE_TYPE_NOTIFICATION, data=notify_pb2.ResNotifyAlbumUpdate(media_type=media_type).SerializeToString()
+    ).SerializeToString())
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    if os.path.exists(DATABASE_FILE):
+        os.remove(DATABASE_FILE)
+    await init_db()
+    http_device = await FakeDwarfHTTP(host=DEVICE_IP, latency=0.005, album=make_album(args.items)).start()
+    ws_device = await FakeDwarf(host=DEVICE_IP, album_sync=True).start()
+    try:
+        start = time.perf_counter()
+        await album_index.ensure_synced(DEVICE_IP)
+        print(f"Vollabgleich: {args.items} Medien in {(time.perf_counter() - start) * 1000:.0f} ms, {http_device.requests} Geräte-Abfragen")
+
+        http_device.requests = 0
+        start = time.perf_counter()
+        direct = await browse_device(args.page_size)
+        print(f"Blättern direkt:  {len(direct)} Einträge, {http_device.requests:3d} Geräte-Abfragen, {(time.perf_counter() - start) * 1000:6.0f} ms")
+        http_device.requests = 0
+        start = time.perf_counter()
+        indexed = await browse_index(args.page_size)
+        print(f"Blättern Index:   {len(indexed)} Einträge, {http_device.requests:3d} Geräte-Abfragen, {(time.perf_counter() - start) * 1000:6.0f} ms")
+        print(f"  Reihenfolge wie am Gerät: {'ja' if indexed == newest_first(http_device.album) else 'NEIN'}")
+
+        ws_handler = await connection_manager.get_connection(DEVICE_IP)
+        await asyncio.sleep(ALBUM_SYNC_DEBOUNCE + 0.5)  # Abgleich nach dem Verbinden
+        new_photos = make_album(5, start_time=1800000000)
+        for item in new_photos:
+            item["mediaType"] = MEDIA_TYPE_PHOTO
+        deleted = http_device.album[len(http_device.album) // 2]
+        http_device.album = new_photos + [item for item in http_device.album if item is not deleted]
+        http_device.requests = 0
+        await notify_album_update(ws_handler, MEDIA_TYPE_PHOTO)
+        await notify_album_update(ws_handler, deleted["mediaType"])
+        await asyncio.sleep(ALBUM_SYNC_DEBOUNCE + 0.5)
+        indexed = await browse_index(args.page_size)
+        stats = album_index.get_stats(DEVICE_IP)
+        print(
+            f"Notification (+5 Fotos, 1 gelöscht): {http_device.requests} Geräte-Abfragen, "
+            f"Typ neu abgeglichen: {stats['type_resyncs']}, Index aktuell: {'ja' if indexed == newest_first(http_device.album) else 'NEIN'}"
+        )
+    finally:
+        await connection_manager.close_all()
+        await http_clients.close_all()
+        await ws_device.stop()
+        await http_device.stop()
+        await engine.dispose()
+        os.remove(DATABASE_FILE)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
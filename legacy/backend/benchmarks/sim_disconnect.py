@@ -0,0 +1,88 @@
+"""
+Simulation: Client verlässt die Seite während eines langen Gerätebefehls
+
+Ruft POST /api/astro/darkframe/capture (Timeout 30 s) direkt über ASGI auf,
+das simulierte Gerät antwortet nicht. Nach --leave-after Sekunden sendet der
+"Browser" http.disconnect. Gemessen wird, wann der Endpoint zurückkehrt und
+ob wartender Befehl (pending_commands/in_flight) und Stopp-Befehl passen -
+einmal mit stop_on_disconnect=false, einmal mit true.
+
+Aufruf (aus backend/):
+    python benchmarks/sim_disconnect.py [--leave-after 0.5]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+
+from app.api import astro
+from app.lib.dwarf_connection import connection_manager
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+
+async def leave_during_request(app: FastAPI, path: str, body: dict, leave_after: float) -> float:
+    """ASGI-Request senden, nach leave_after trennen; Sekunden bis der Endpoint fertig ist"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.split("?")[1].encode() if "?" in path else b"",
+        "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(leave_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leave-after", type=float, default=0.5)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(astro.router, prefix="/api/astro")
+    device = await FakeDwarf(host=DEVICE_IP).start()
+    device.ignored = {(MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_DARK)}
+    try:
+        ws_handler = await connection_manager.get_connection(DEVICE_IP)
+        for send_stop in (False, True):
+            device.commands.clear()
+            path = f"/api/astro/darkframe/capture?ip={DEVICE_IP}&stop_on_disconnect={str(send_stop).lower()}"
+            elapsed = await leave_during_request(app, path, {"reshoot": 0}, args.leave_after)
+            await asyncio.sleep(0.05)
+            counts = ws_handler.resource_counts()
+            stopped = (MODULE_ASTRO, CMD_ASTRO_STOP_CAPTURE_RAW_DARK) in device.commands
+            print(
+                f"stop_on_disconnect={str(send_stop).lower():5s} zurück nach {elapsed:5.2f} s (Timeout 30 s)  "
+                f"pending={counts['pending_commands']} in_flight={counts['in_flight']}  Stopp gesendet: {'ja' if stopped else 'nein'}"
+            )
+        print(f"Vom Client abgebrochen: {connection_manager.pool_stats['client_cancelled']}")
+    finally:
+        await connection_manager.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Simulation: Connection-Pool unter Last mit mehreren Geräten
+
+Startet mehrere simulierte Geräte (127.0.0.2, 127.0.0.3, ...) und feuert einen
+Burst gleichzeitiger Requests (get_connection + send_command) auf den Pool.
+Geprüft wird, dass pro Gerät genau eine WebSocket-Verbindung entsteht und alle
+Befehle beantwortet werden; danach Idle-Eviction, Pool-Limit und Drain.
+
+Aufruf (aus backend/):
+    python benchmarks/sim_pool.py [--devices 4] [--requests 400]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarf_connection import DwarfConnectionManager
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+
+async def request(manager, ip: str) -> bool:
+    """Ein API-Request: Verbindung holen und einen Befehl senden"""
+    ws_handler = await manager.get_connection(ip)
+    if not ws_handler.is_connected():
+        return False
+    result = await ws_handler.send_command(MODULE_SYSTEM, CMD_SYSTEM_SET_TIME, b"", timeout=30.0)
+    return result.code == 0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    devices = [
+        await FakeDwarf(host=f"127.0.0.{i + 2}", latency=0.01).start()
+        for i in range(args.devices)
+    ]
+    ips = [device.host for device in devices]
+    manager = DwarfConnectionManager()
+
+    try:
+        # Burst: alle Requests gleichzeitig, auf die Geräte verteilt
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(request(manager, ips[i % len(ips)]) for i in range(args.requests)),
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for result in results if result is True)
+        print(f"Burst: {args.requests} Requests auf {len(ips)} Geräte in {elapsed:.2f} s, {ok} erfolgreich")
+        for device in devices:
+            print(f"  {device.host}: {device.connections} WebSocket-Verbindung(en), {device.received} Pakete")
+
+        pool = getattr(manager, "pool_stats", None)
+        if pool is None:
+            print("Pool: keine Pool-Funktionen (Eviction/Limit/Drain) vorhanden")
+            return
+
+        # Idle-Eviction
+        manager.idle_timeout = 0.2
+        await asyncio.sleep(0.3)
+        await manager.check_health()
+        print(f"Idle-Eviction: {len(manager.get_metrics())} Verbindungen offen nach Health-Check")
+
+        # Pool-Limit: ältestes, untätiges Gerät wird verdrängt
+        manager.idle_timeout = 300.0
+        manager.max_connections = 2
+        for ip in ips:
+            await manager.get_connection(ip)
+            await asyncio.sleep(0.1)  # Zustandsabfrage nach dem Verbinden abwarten (sonst nicht untätig)
+        print(f"Limit 2: offen {sorted(manager.get_metrics())}")
+
+        # Drain: laufende Befehle werden noch beantwortet
+        ws_handler = await manager.get_connection(ips[-1])
+        pending = [ws_handler.send_command(MODULE_SYSTEM, CMD_SYSTEM_SET_TIME, b"", timeout=30.0) for _ in range(20)]
+        await manager.drain(timeout=5.0)
+        answered = sum(1 for future in pending if future.done() and not future.exception())
+        print(f"Drain: {answered}/{len(pending)} laufende Befehle beantwortet, {len(manager.get_metrics())} Verbindungen offen")
+        print(f"Pool-Statistik: {manager.pool_stats}")
+    finally:
+        await manager.close_all()
+        for device in devices:
+            await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Simulation: Sequenz-Engine gegen ein simuliertes Gerät
+
+Kamera öffnen -> IR-Pass -> Kalibrieren -> GOTO -> Live-Stacking. Das simulierte
+Gerät meldet Kalibrierung und GOTO erst nach einer Weile per Notification als
+beendet und antwortet erst danach; die Engine geht genau dann weiter (keine
+festen Wartezeiten). Danach wird eine zweite Sequenz während des GOTO
+abgebrochen - das Gerät muss CMD_ASTRO_STOP_GOTO bekommen. Zuletzt schlägt
+die Kalibrierung fehl (STOPPED, dann Code 11504): die Sequenz muss dort
+abbrechen, ohne Live-Stacking zu starten.
+
+Aufruf (aus backend/):
+    python benchmarks/sim_sequence.py [--calibration 0.8] [--goto 1.5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarf_connection import connection_manager
+from app.lib.dwarfii_sequence import sequence_manager
+from app.services.proto import notify_pb2
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.WARNING)
+
+DEVICE_IP = "127.0.0.1"
+
+STEPS = [
+    {"action": "open_tele_camera"},
+    {"action": "set_ircut", "params": {"value": 1}},
+    {"action": "calibrate"},
+    {"action": "goto_dso", "params": {"ra": 10.68, "dec": 41.27, "target_name": "M31"}},
+    {"action": "start_live_stacking"},
+]
+
+
+def print_sequence(sequence):
+    info = sequence.to_dict()
+    print(f"  Sequenz {info['id']}: {info['status']} nach {info['elapsed_ms']:.0f} ms")
+    for step in info["steps"]:
+        elapsed = "-" if step["elapsed_ms"] is None else f"{step['elapsed_ms']:.0f} ms"
+        print(f"    {step['name']:20s} {step['status']:10s} {elapsed:>8s}  Zustand {step['state']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calibration", type=float, default=0.8)
+    parser.add_argument("--goto", type=float, default=1.5)
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP, latency=0.02).start()
+    astro_state = notify_pb2.ResNotifyStateAstroGoto
+    device.notifications = {
+        (MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION): [
+            (0.05, CMD_NOTIFY_STATE_ASTRO_CALIBRATION, notify_pb2.ResNotifyStateAstroCalibration(state=ASTRO_STATE_RUNNING)),
+            (args.calibration, CMD_NOTIFY_STATE_ASTRO_CALIBRATION, notify_pb2.ResNotifyStateAstroCalibration(state=ASTRO_STATE_STOPPED)),
+        ],
+        (MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO): [
+            (0.05, CMD_NOTIFY_STATE_ASTRO_GOTO, astro_state(state=ASTRO_STATE_RUNNING)),
+            (args.goto, CMD_NOTIFY_STATE_ASTRO_GOTO, astro_state(state=ASTRO_STATE_STOPPED)),
+        ],
+        (MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING): [
+            (0.1, CMD_NOTIFY_STATE_CAPTURE_RAW_LIVE_STACKING, notify_pb2.ResNotifyOperationState(state=OPERATION_STATE_RUNNING)),
+        ],
+    }
+    device.late = {(MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION), (MODULE_ASTRO, CMD_ASTRO_START_GOTO_DSO)}
+
+    try:
+        print(f"Ablauf mit Kalibrierung {args.calibration * 1000:.0f} ms, GOTO {args.goto * 1000:.0f} ms:")
+        sequence = sequence_manager.start(DEVICE_IP, STEPS, "M31")
+        await sequence.wait()
+        print_sequence(sequence)
+
+        print("Abbruch während GOTO:")
+        device.commands.clear()
+        sequence = sequence_manager.start(DEVICE_IP, STEPS, "M31 (Abbruch)")
+        while sequence.current != 3:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        sequence.cancel()
+        await sequence.wait()
+        print_sequence(sequence)
+        stopped = (MODULE_ASTRO, CMD_ASTRO_STOP_GOTO) in device.commands
+        print(f"  CMD_ASTRO_STOP_GOTO gesendet: {'ja' if stopped else 'nein'}")
+
+        print("Kalibrierung fehlgeschlagen:")
+        device.commands.clear()
+        device.response_codes[(MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION)] = CODE_ASTRO_CALIBRATION_FAILED
+        sequence = sequence_manager.start(DEVICE_IP, STEPS, "M31 (Fehler)")
+        await sequence.wait()
+        print_sequence(sequence)
+        stacked = (MODULE_ASTRO, CMD_ASTRO_START_CAPTURE_RAW_LIVE_STACKING) in device.commands
+        print(f"  Live-Stacking gestartet: {'ja' if stacked else 'nein'}")
+    finally:
+        await connection_manager.close_all()
+        await device.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Soak-Test: Callbacks, Abonnenten und Speicher bleiben über viele Runden flach
+
+Jede Runde wiederholt typische Request-Muster gegen ein simuliertes Gerät,
+darunter alle Ausstiegswege: Antwort, Timeout (Gerät antwortet nicht),
+Exception im Block, abgebrochener Task (Client weg), Batch mit fehlgeschlagener
+Abhängigkeit, abgebrochene Sequenz. Nach jeder Runde werden die lebenden
+Callbacks/Abonnenten/wartenden Befehle gezählt. Endet mit Exit-Code 1, wenn
+eine Zahl wächst oder der Python-Speicher nach der Aufwärmphase (begrenzte
+Puffer wie Latenzfenster und Sequenz-Historie füllen sich) über --max-growth
+KiB steigt.
+
+Aufruf (aus backend/):
+    python benchmarks/soak_callbacks.py [--rounds 40] [--per-round 50]
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lib.dwarf_connection import connection_manager
+from app.lib.dwarfii_metrics import process_stats
+from app.lib.dwarfii_sequence import sequence_manager
+from app.utils.constants import *
+from benchmarks.fake_dwarf import FakeDwarf
+
+logging.basicConfig(level=logging.ERROR)
+
+DEVICE_IP = "127.0.0.1"
+COUNTED = ("message_callbacks", "error_callbacks", "connect_callbacks", "subscriptions", "pending_commands", "in_flight", "queued")
+
+
+async def scoped_callback_paths(ws_handler, i: int):
+    """with-Blöcke: normal, Timeout und Exception"""
+    done = asyncio.Event()
+
+    def on_message(_, packet):
+        if packet.cmd == CMD_SYSTEM_SET_TIME:
+            done.set()
+
+    with ws_handler.message_callback(f"soak:{i}", on_message):
+        ws_handler.send_command(MODULE_SYSTEM, CMD_SYSTEM_SET_TIME, b"", timeout=2.0)
+        await asyncio.wait_for(done.wait(), 2.0)
+
+    try:
+        with ws_handler.message_callback(f"soak-timeout:{i}", on_message):
+            await asyncio.wait_for(asyncio.Event().wait(), 0.01)
+    except asyncio.TimeoutError:
+        pass
+
+    try:
+        with ws_handler.message_callback(f"soak-error:{i}", on_message), \
+                ws_handler.events.subscribe(name=f"soak-error:{i}"):
+            raise RuntimeError("Fehler im Block")
+    except RuntimeError:
+        pass
+
+
+async def cancelled_wait(ws_handler, i: int):
+    """Wartender Request wird abgebrochen (Client hat die Seite verlassen)"""
+    async def handler():
+        with ws_handler.events.subscribe(cmds=[CMD_NOTIFY_STATE_ASTRO_GOTO], name=f"soak-cancel:{i}") as subscription:
+            await subscription.get()
+
+    task = asyncio.create_task(handler())
+    await asyncio.sleep(0)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def one_round(ws_handler, per_round: int):
+    for i in range(per_round):
+        await connection_manager.execute(DEVICE_IP, MODULE_SYSTEM, CMD_SYSTEM_SET_TIME, b"", timeout=2.0)
+        # Timeout: Gerät antwortet nicht
+        await connection_manager.execute(DEVICE_IP, MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION, b"", timeout=0.02)
+        await scoped_callback_paths(ws_handler, i)
+        await cancelled_wait(ws_handler, i)
+
+    # Batch: zweiter Befehl hängt am ersten, der ohne Antwort bleibt
+    await connection_manager.execute_batch(DEVICE_IP, [
+        {"module_id": MODULE_ASTRO, "cmd": CMD_ASTRO_START_CALIBRATION, "payload": b"", "timeout": 0.02},
+        {"module_id": MODULE_SYSTEM, "cmd": CMD_SYSTEM_SET_TIME, "payload": b"", "after": [0]},
+    ])
+
+    # Sequenz während eines Schritts ohne Antwort abbrechen
+    sequence = sequence_manager.start(DEVICE_IP, [{"action": "calibrate"}, {"action": "start_live_stacking"}])
+    await asyncio.sleep(0.01)
+    sequence.cancel(send_stop=True)
+    await sequence.wait()
+    await asyncio.sleep(0.05)  # späte Antworten/Timer auslaufen lassen
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--per-round", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=SEQUENCE_HISTORY + 5, help="Runden bis zur Speicher-Basislinie")
+    parser.add_argument("--max-growth", type=float, default=64.0, help="KiB Python-Speicher nach der Aufwärmphase")
+    args = parser.parse_args()
+
+    device = await FakeDwarf(host=DEVICE_IP).start()
+    device.ignored = {(MODULE_ASTRO, CMD_ASTRO_START_CALIBRATION)}
+    tracemalloc.start()
+    failed = False
+    try:
+        ws_handler = await connection_manager.get_connection(DEVICE_IP)
+        await asyncio.sleep(0.1)
+        baseline = None
+        memory_baseline = None
+        print(f"{'Runde':>5s} " + " ".join(f"{name[:12]:>12s}" for name in COUNTED) + f" {'Tasks':>6s} {'KiB':>8s}")
+        for round_index in range(1, args.rounds + 1):
+            await one_round(ws_handler, args.per_round)
+            device.commands.clear()  # Protokoll des Simulators, nicht des Servers
+            gc.collect()
+            counts = connection_manager.get_resource_counts()[DEVICE_IP]
+            stats = process_stats(count_objects=False)
+            traced_kib = stats["traced_bytes"] / 1024.0
+            print(f"{round_index:5d} " + " ".join(f"{counts[name]:12d}" for name in COUNTED) + f" {stats['tasks']:6d} {traced_kib:8.0f}")
+
+            snapshot = tuple(counts[name] for name in COUNTED)
+            if baseline is None:
+                baseline = snapshot
+            elif snapshot != baseline:
+                failed = True
+            if round_index == args.warmup:
+                memory_baseline = traced_kib
+
+        print(f"Abonnenten: {counts['subscribers']}")
+        if memory_baseline is not None:
+            growth = traced_kib - memory_baseline
+            print(f"Speicher seit Runde {args.warmup}: {growth:+.0f} KiB")
+            failed = failed or growth > args.max_growth
+        print("FEHLER: Zähler oder Speicher wachsen" if failed else "OK: Zähler und Speicher bleiben flach")
+    finally:
+        await connection_manager.close_all()
+        await device.stop()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
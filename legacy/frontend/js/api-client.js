@@ -60,6 +60,58 @@ class APIClient {
         return this.request(ENDPOINTS.DEVICE_LIST);
     }
 
+    /**
+     * Live-Events des Geräts abonnieren (Server-Sent Events)
+     * onEvent(kind, event) mit kind = 'notify' | 'response',
+     * event = { module, cmd, type, msg }
+     * Gibt die EventSource zurück (close() zum Beenden)
+     */
+    subscribeDeviceEvents(ip, onEvent, { cmds = null, notificationsOnly = false, maxRate = null } = {}) {
+        const params = new URLSearchParams({ ip });
+        if (cmds) params.set('cmds', cmds.join(','));
+        if (notificationsOnly) params.set('notifications_only', 'true');
+        if (maxRate !== null) params.set('max_rate', maxRate);
+
+        const source = new EventSource(`${this.baseURL}${ENDPOINTS.DEVICE_EVENTS}?${params}`);
+        for (const kind of ['notify', 'response']) {
+            source.addEventListener(kind, (e) => onEvent(kind, JSON.parse(e.data)));
+        }
+        source.onerror = (error) => console.error('Event-Stream Fehler:', error);
+        return source;
+    }
+
+    /**
+     * Mehrere Gerätebefehle in einem Request (pipelined)
+     * commands = [{ module_id, cmd, payload (hex), after, barrier }]
+     */
+    async executeBatch(ip, commands, skipOnError = true) {
+        return this.request(`${ENDPOINTS.DEVICE_BATCH}?ip=${ip}`, {
+            method: 'POST',
+            body: { commands, skip_on_error: skipOnError }
+        });
+    }
+
+    /**
+     * Mehrschrittigen Ablauf auf dem Server starten
+     * steps = [{ action, params }] (z.B. { action: 'goto_dso', params: { ra, dec } })
+     */
+    async startSequence(ip, steps, name = '') {
+        return this.request(`${ENDPOINTS.SEQUENCE_START}?ip=${ip}`, {
+            method: 'POST',
+            body: { name, steps }
+        });
+    }
+
+    async getSequence(id) {
+        return this.request(`${ENDPOINTS.SEQUENCE}/${id}`);
+    }
+
+    async cancelSequence(id, sendStop = true) {
+        return this.request(`${ENDPOINTS.SEQUENCE}/${id}/cancel?send_stop=${sendStop}`, {
+            method: 'POST'
+        });
+    }
+
     // Camera
     async openTeleCamera(ip, binning = false) {
         return this.request(`${ENDPOINTS.CAMERA_TELE_OPEN}?ip=${ip}`, {
@@ -97,17 +149,23 @@ class APIClient {
         return this.request(`${ENDPOINTS.ALBUM_COUNTS}?ip=${ip}`);
     }
 
-    async getAlbumList(ip, { media_type = 1, page_index = 0, page_size = 20 } = {}) {
+    async getAlbumList(ip, { media_type = 1, page_index = 0, page_size = 20, cursor = null } = {}) {
         return this.request(`${ENDPOINTS.ALBUM_LIST}?ip=${ip}`, {
             method: 'POST',
             body: {
                 media_type,
                 page_index,
-                page_size
+                page_size,
+                cursor
             }
         });
     }
 
+    getThumbnailUrl(ip, path, generate = false) {
+        const url = `${this.baseURL}${ENDPOINTS.ALBUM_THUMBNAIL}?ip=${ip}&path=${encodeURIComponent(path)}`;
+        return generate ? `${url}&generate=1` : url;
+    }
+
     // Astro
     async startCalibration(ip) {
         return this.request(`${ENDPOINTS.ASTRO_CALIBRATION_START}?ip=${ip}`, {
@@ -10,6 +10,11 @@ export const ENDPOINTS = {
     DEVICE_INFO: '/device/info',
     DEVICE_LIST: '/device/list',
     DEVICE_FIRMWARE: '/device/firmware',
+    DEVICE_EVENTS: '/device/events',
+    DEVICE_BATCH: '/device/batch',
+    SEQUENCE_START: '/sequence/start',
+    SEQUENCE_LIST: '/sequence/list',
+    SEQUENCE: '/sequence',
     
     // Camera
     CAMERA_TELE_OPEN: '/camera/tele/open',
@@ -23,6 +28,7 @@ export const ENDPOINTS = {
     ALBUM_COUNTS: '/album/counts',
     ALBUM_LIST: '/album/list',
     ALBUM_DELETE: '/album/delete',
+    ALBUM_THUMBNAIL: '/album/thumbnail',
     
     // Astro
     ASTRO_CALIBRATION_START: '/astro/calibration/start',
@@ -14,6 +14,7 @@ class App {
             mediaType: 1,
             pageIndex: 0,
             pageSize: 12,
+            cursors: [null],  // cursors[i]: next_cursor für Seite i (Keyset-Paginierung)
             hasMore: false
         };
         this.mediaTypeLabels = {
@@ -747,6 +748,7 @@ class App {
 
         if (resetPage) {
             this.albumState.pageIndex = 0;
+            this.albumState.cursors = [null];
         }
 
         pageInfoEl.textContent = `Seite ${this.albumState.pageIndex + 1}`;
@@ -758,13 +760,19 @@ class App {
                 api.getAlbumList(this.currentIP, {
                     media_type: this.albumState.mediaType,
                     page_index: this.albumState.pageIndex,
-                    page_size: this.albumState.pageSize
+                    page_size: this.albumState.pageSize,
+                    cursor: this.albumState.cursors[this.albumState.pageIndex] || null
                 })
             ]);
 
             this.renderAlbumCounts(countsResponse, countsEl);
             const items = this.extractAlbumItems(listResponse);
-            this.albumState.hasMore = items.length === this.albumState.pageSize;
+            if (listResponse && 'next_cursor' in listResponse) {
+                this.albumState.cursors[this.albumState.pageIndex + 1] = listResponse.next_cursor;
+                this.albumState.hasMore = Boolean(listResponse.next_cursor);
+            } else {
+                this.albumState.hasMore = items.length === this.albumState.pageSize;
+            }
             prevBtn.disabled = this.albumState.pageIndex === 0;
             nextBtn.disabled = !this.albumState.hasMore;
             this.renderAlbumList(items, listEl);
@@ -814,9 +822,13 @@ class App {
             const size = this.formatBytes(item.fileSize || item.file_size || 0);
             const timestamp = item.modificationTime || item.modification_time || item.createTime || null;
             const date = timestamp ? new Date(timestamp * 1000).toLocaleString() : '—';
+            const thumbnailUrl = this.getAlbumThumbnailUrl(item);
+            const thumb = thumbnailUrl
+                ? `<img src="${thumbnailUrl}" alt="" loading="lazy" style="width: 100%; display: block;" onerror="this.replaceWith('${this.getAlbumIcon()}')">`
+                : this.getAlbumIcon();
             return `
                 <div class="album-card">
-                    <div class="album-card-thumb">${this.getAlbumIcon()}</div>
+                    <div class="album-card-thumb">${thumb}</div>
                     <div class="album-card-meta">
                         <div class="album-card-title">${name}</div>
                         <div class="album-card-path">${path}</div>
@@ -827,6 +839,16 @@ class App {
         }).join('');
     }
 
+    getAlbumThumbnailUrl(item) {
+        const thumbnailPath = item.thumbnailPath || item.thumbnail_path || '';
+        if (thumbnailPath) {
+            return api.getThumbnailUrl(this.currentIP, thumbnailPath);
+        }
+        // Serienaufnahmen haben kein Thumbnail auf dem Gerät: Vorschau erzeugt das Backend
+        const source = item.images?.[0]?.filePath || item.filePath || item.file_path || '';
+        return /\.(jpe?g|png)$/i.test(source) ? api.getThumbnailUrl(this.currentIP, source, true) : null;
+    }
+
     getAlbumIcon() {
         const type = this.albumState.mediaType;
         switch (type) {